@@ -0,0 +1,395 @@
+# Backtest événementiel: rejeu de ticks à travers le chemin de décision live
+import contextlib
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from config import SYMBOL
+from execution import ExecutionEngine, NullLimiter
+from performance import batch_performance
+
+# Barres minute d'une année de séances (annualisation des métriques)
+MINUTE_PERIODS_PER_YEAR = 252 * 390
+# Ticks convertis en listes Python par lot (pas de scalaires NumPy par événement)
+BATCH_SIZE = 65536
+# Deltas des contrats .25 quand la source n'en fournit pas (dataset historique, export des cycles)
+DEFAULT_PUT_DELTA = -0.25
+DEFAULT_CALL_DELTA = 0.25
+TICK_COLUMNS = ('ts', 'price', 'put_iv', 'call_iv', 'put_delta', 'call_delta')
+
+
+class SimulatedBroker:
+    """Courtier simulé exposant les méthodes du client Alpaca utilisées par le chemin live
+
+    Les ordres au marché sont exécutés au premier tick du symbole arrivé
+    au moins latency secondes (temps des événements) après l'envoi, au
+    prix du tick dégradé de slippage_bps (achat plus cher, vente moins
+    cher), plus commission par action. Avec latency=0 l'exécution est
+    immédiate au dernier prix. Les ordres en attente d'un symbole sont
+    une file FIFO (latence constante).
+    """
+
+    def __init__(self, cash=100000.0, slippage_bps=1.0, latency=1.0, commission=0.0):
+        self.initial_cash = float(cash)
+        self.cash = float(cash)
+        self.slippage = slippage_bps / 1e4
+        self.latency = float(latency)
+        self.commission = float(commission)
+        self.now = 0.0
+        self.prices = {}
+        self.positions = {}
+        self.avg_price = {}
+        self.pending = {}
+        self.fills = []
+        self.orders_submitted = 0
+        self.costs = 0.0
+        self._ids = itertools.count(1)
+
+    # ---------- Événements ----------
+    def on_tick(self, symbol, ts, price):
+        """Avance l'horloge, met à jour le prix et exécute les ordres arrivés à échéance"""
+        self.now = ts
+        self.prices[symbol] = price
+        queue = self.pending.get(symbol)
+        while queue and queue[0][0] <= ts:
+            _, order, qty = queue.popleft()
+            self._fill(order, qty, ts, price)
+
+    def _fill(self, order, qty, ts, price):
+        fill_price = price * (1 + self.slippage) if qty > 0 else price * (1 - self.slippage)
+        fee = self.commission * abs(qty)
+        self.cash -= qty * fill_price + fee
+        self.costs += abs(qty) * abs(fill_price - price) + fee
+
+        current = self.positions.get(order.symbol, 0.0)
+        position = current + qty
+        if position == 0:
+            self.positions.pop(order.symbol, None)
+            self.avg_price.pop(order.symbol, None)
+        else:
+            if current == 0 or (current > 0) != (position > 0):
+                self.avg_price[order.symbol] = fill_price
+            elif (qty > 0) == (current > 0):
+                self.avg_price[order.symbol] = (current * self.avg_price[order.symbol] + qty * fill_price) / position
+            self.positions[order.symbol] = position
+
+        order.status = 'filled'
+        order.filled_qty = str(abs(qty))
+        order.filled_avg_price = str(fill_price)
+        order.filled_at = ts
+        self.fills.append({'ts': ts, 'symbol': order.symbol, 'order_id': order.id, 'side': order.side,
+                           'qty': abs(qty), 'price': price, 'fill_price': fill_price, 'fee': fee,
+                           'delay': ts - order.submitted_at})
+
+    def _queue(self, symbol, qty, side, order_type='market', time_in_force='day'):
+        order = SimpleNamespace(id=f"sim-{next(self._ids)}", symbol=symbol, qty=str(abs(qty)), side=side,
+                                type=order_type, time_in_force=time_in_force, status='accepted',
+                                submitted_at=self.now, filled_qty='0', filled_avg_price=None, filled_at=None)
+        self.orders_submitted += 1
+        if self.latency <= 0 and symbol in self.prices:
+            self._fill(order, qty, self.now, self.prices[symbol])
+        else:
+            self.pending.setdefault(symbol, deque()).append((self.now + self.latency, order, qty))
+        return order
+
+    def equity(self):
+        return self.cash + sum(q * self.prices.get(s, 0.0) for s, q in self.positions.items())
+
+    # ---------- API (sous-ensemble de tradeapi.REST) ----------
+    def submit_order(self, symbol, qty, side, type='market', time_in_force='day', **kwargs):
+        if type != 'market':
+            raise ValueError(f"Type d'ordre non simulé: {type}")
+        qty = float(qty)
+        if qty <= 0 or side not in ('buy', 'sell'):
+            raise ValueError(f"Ordre invalide: {side} {qty} {symbol}")
+        return self._queue(symbol, qty if side == 'buy' else -qty, side, type, time_in_force)
+
+    def close_position(self, symbol):
+        qty = self.positions.get(symbol, 0.0)
+        if not qty:
+            raise ValueError(f"position does not exist: {symbol}")
+        return self._queue(symbol, -qty, 'sell' if qty > 0 else 'buy')
+
+    def _position(self, symbol, qty):
+        price = self.prices.get(symbol, math.nan)
+        return SimpleNamespace(symbol=symbol, qty=str(qty), side='long' if qty > 0 else 'short',
+                               avg_entry_price=str(self.avg_price.get(symbol, math.nan)),
+                               current_price=str(price), market_value=str(qty * price))
+
+    def list_positions(self):
+        return [self._position(s, q) for s, q in self.positions.items()]
+
+    def get_position(self, symbol):
+        qty = self.positions.get(symbol, 0.0)
+        if not qty:
+            raise ValueError(f"position does not exist: {symbol}")
+        return self._position(symbol, qty)
+
+    def list_orders(self, status='open', **kwargs):
+        return [order for queue in self.pending.values() for _, order, _ in queue]
+
+    def get_account(self):
+        equity = self.equity()
+        return SimpleNamespace(equity=str(equity), cash=str(self.cash), buying_power=str(max(equity, 0.0) * 2),
+                               status='ACTIVE', trading_blocked=False)
+
+
+def _seconds(ts):
+    """Timestamps (datetime64, DatetimeIndex, secondes) en secondes epoch float64"""
+    values = np.asarray(ts)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.float64)
+    index = pd.DatetimeIndex(ts)
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    return ((index - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(np.float64)
+
+
+def make_ticks(symbol, ts, price, put_iv, call_iv, put_delta=DEFAULT_PUT_DELTA, call_delta=DEFAULT_CALL_DELTA):
+    """Ticks colonnaires d'un sous-jacent: {'symbols', 'code', ts, price, put_iv, ...} triés par ts"""
+    ts = _seconds(ts)
+    n = len(ts)
+    columns = {'ts': ts}
+    for name, values in (('price', price), ('put_iv', put_iv), ('call_iv', call_iv),
+                         ('put_delta', put_delta), ('call_delta', call_delta)):
+        columns[name] = np.broadcast_to(np.asarray(values, dtype=np.float64), (n,)).copy()
+    order = np.argsort(ts, kind='stable')
+    ticks = {name: values[order] for name, values in columns.items()}
+    ticks['symbols'] = [symbol]
+    ticks['code'] = np.zeros(n, dtype=np.int32)
+    return ticks
+
+
+def merge_ticks(*parts):
+    """Fusionne les ticks de plusieurs sous-jacents en une seule file ordonnée par ts"""
+    symbols = list(dict.fromkeys(s for part in parts for s in part['symbols']))
+    position = {s: i for i, s in enumerate(symbols)}
+    codes = [np.array([position[s] for s in part['symbols']], dtype=np.int32)[part['code']] for part in parts]
+    ts = np.concatenate([part['ts'] for part in parts])
+    order = np.argsort(ts, kind='stable')
+    ticks = {name: np.concatenate([part[name] for part in parts])[order] for name in TICK_COLUMNS}
+    ticks['code'] = np.concatenate(codes)[order]
+    ticks['symbols'] = symbols
+    return ticks
+
+
+def ticks_from_frame(frame, symbol=None):
+    """Ticks depuis le dataset historique (put25_IV, call25_IV, underlying, index de dates)
+    ou l'export des cycles (ts, symbol, price, put_iv, call_iv)
+
+    Sans symbole ni colonne symbol, les ticks sont rattachés à SYMBOL.
+    """
+    if 'put25_IV' in frame:
+        return make_ticks(symbol or SYMBOL, frame.index, frame['underlying'], frame['put25_IV'], frame['call25_IV'])
+    ts = frame['ts'] if 'ts' in frame else frame.index
+    if symbol is None and 'symbol' in frame:
+        return merge_ticks(*[ticks_from_frame(part, name) for name, part in frame.groupby('symbol', sort=False)])
+    return make_ticks(symbol or SYMBOL, ts, frame['price'], frame['put_iv'], frame['call_iv'],
+                      frame.get('put_delta', DEFAULT_PUT_DELTA), frame.get('call_delta', DEFAULT_CALL_DELTA))
+
+
+def simulate_ticks(days=63, symbol='AAPL', start='2025-01-02', price=200.0, vol=0.25, seed=0,
+                   spread_mean=0.02, spread_vol=0.03, spread_persistence=0.995, out_of_band=0.01):
+    """Barres minute synthétiques (390 par séance, jours ouvrés depuis start)
+
+    Prix en mouvement brownien géométrique, spread IV put - call en AR(1)
+    autour de spread_mean (skew habituel), une fraction out_of_band de
+    ticks dont les contrats sortent des bandes .25 delta.
+    """
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range(start, periods=days)
+    # Ouverture 9h30 New York ~ 14h30 UTC
+    open_seconds = _seconds(sessions) + 14.5 * 3600
+    ts = (open_seconds[:, None] + 60.0 * np.arange(390)).ravel()
+    n = len(ts)
+
+    dt = 1 / MINUTE_PERIODS_PER_YEAR
+    prices = price * np.exp(np.cumsum((-0.5 * vol * vol) * dt + vol * math.sqrt(dt) * rng.standard_normal(n)))
+    shocks = spread_vol * math.sqrt(1 - spread_persistence ** 2) * rng.standard_normal(n)
+    spread = np.empty(n)
+    level = spread_mean
+    for i, shock in enumerate(shocks.tolist()):
+        level = spread_mean + spread_persistence * (level - spread_mean) + shock
+        spread[i] = level
+    call_iv = np.clip(vol + 0.01 * rng.standard_normal(n), 0.05, None)
+    put_delta = np.where(rng.random(n) < out_of_band, -0.40, rng.uniform(-0.28, -0.22, n))
+    call_delta = rng.uniform(0.22, 0.28, n)
+    return make_ticks(symbol, ts, prices, call_iv + spread, call_iv, put_delta, call_delta)
+
+
+@contextlib.contextmanager
+def live_bindings(broker, options=None, quiet=True, params=None):
+    """Branche le chemin live de main sur le courtier simulé et le flux de ticks
+
+    api et le moteur d'exécution pointent sur le courtier (positions relues
+    à chaque décision, sans limiteur de débit), get_real_option_data lit
+    l'option courante du symbole dans options, l'horloge suit les
+    événements. Sans courtier (rejeu), api, trading_client, l'horloge et
+    le moteur sont laissés à l'appelant; sans options, get_real_option_data
+    reste celui de main. Dans tous les cas, l'état du signal live, les
+    derniers contrats, les chaînes, le livre de risque, les bougies du
+    flux, le filtre de quotes et le récupérateur de prix repartent de zéro,
+    sans hub; tout est restauré à la sortie. params remplace des
+    paramètres de stratégie de main ({'ACCEL_THRESH': 0.0005}) le temps
+    du rejeu. Les logs INFO sont coupés pendant le rejeu si quiet.
+    """
+    import main
+
+    params = params or {}
+    unknown = [name for name in params if not hasattr(main, name)]
+    if unknown:
+        raise ValueError(f"Paramètres de stratégie inconnus: {unknown}")
+    saved = (main.api, main.trading_client, main.execution, main.get_real_option_data, main.clock_now,
+             main.live_states, main.last_contracts, main.last_chains, main.risk_book, main.bar_aggregators,
+             main.hub, main.quote_filter, main.price_fetcher)
+    saved_params = {name: getattr(main, name) for name in params}
+    disabled = logging.root.manager.disable
+    if broker is not None:
+        main.api = broker
+        main.execution = ExecutionEngine(lambda: broker, limiter=NullLimiter(), max_workers=1, positions_ttl=0)
+        main.clock_now = lambda: datetime.fromtimestamp(broker.now)
+    if options is not None:
+        main.get_real_option_data = lambda symbol, current_price: options.get(symbol)
+    main.live_states = {}
+    main.last_contracts = {}
+    main.last_chains = {}
+    main.risk_book = main.GreeksBook(rate=main.RISK_FREE_RATE, dividend=main.DIVIDEND_YIELD,
+                                     time_step=main.RISK_TIME_STEP)
+    main.bar_aggregators = {}
+    main.hub = None
+    main.quote_filter = main.QuoteFilter(max_spread_pct=main.QUOTE_MAX_SPREAD_PCT, max_age=main.QUOTE_MAX_AGE,
+                                         min_bid=main.QUOTE_MIN_BID)
+    main.price_fetcher = main.HedgedFetcher(hedge_delay=main.PRICE_HEDGE_DELAY, timeout=main.PRICE_FETCH_TIMEOUT)
+    for name, value in params.items():
+        setattr(main, name, value)
+    if quiet:
+        logging.disable(logging.INFO)
+    try:
+        yield main
+    finally:
+        logging.disable(disabled)
+        main.price_fetcher.close()
+        (main.api, main.trading_client, main.execution, main.get_real_option_data, main.clock_now,
+         main.live_states, main.last_contracts, main.last_chains, main.risk_book, main.bar_aggregators,
+         main.hub, main.quote_filter, main.price_fetcher) = saved
+        for name, value in saved_params.items():
+            setattr(main, name, value)
+
+
+def run_backtest(ticks, broker=None, batch_size=BATCH_SIZE, periods_per_year=MINUTE_PERIODS_PER_YEAR, quiet=True,
+                 params=None):
+    """Rejoue les ticks à travers get_live_trading_signal_fast et execute_live_trade
+
+    Chaque tick est un événement: le courtier exécute d'abord les ordres
+    arrivés à échéance au prix du tick, puis le signal live et la décision
+    de trading sont calculés exactement comme dans la boucle du bot
+    (paramètres de stratégie de main, remplacés par params). Avec les
+    paramètres live par défaut, ACCEL_THRESH égale l'accélération de
+    référence du chemin live (live_signal.REF_ACCEL): la condition
+    d'accélération n'est jamais vraie et aucun ordre n'est passé. Les
+    colonnes sont converties en listes par lots de batch_size ticks; les
+    résultats par tick sont écrits dans des tableaux préalloués.
+
+    Retourne un dict: tableaux par tick (ts, price, signal, position,
+    equity), exécutions (DataFrame), erreurs de trading, métriques de
+    performance, durée.
+    """
+    broker = broker or SimulatedBroker()
+    n = len(ticks['ts'])
+    symbols = ticks['symbols']
+    signals = np.zeros(n, dtype=np.int8)
+    positions = np.zeros(n)
+    equity = np.empty(n)
+    errors = 0
+    # Une option courante par symbole, mise à jour en place à chaque tick
+    options = {s: {'put_iv': math.nan, 'call_iv': math.nan, 'put_delta': math.nan, 'call_delta': math.nan}
+               for s in symbols}
+
+    start = time.perf_counter()
+    with live_bindings(broker, options, quiet=quiet, params=params) as live:
+        signal_fn = live.get_live_trading_signal_fast
+        trade_fn = live.execute_live_trade
+        for first in range(0, n, batch_size):
+            last = min(n, first + batch_size)
+            batch = [ticks[name][first:last].tolist() for name in ('code',) + TICK_COLUMNS]
+            i = first
+            for code, ts, price, put_iv, call_iv, put_delta, call_delta in zip(*batch):
+                symbol = symbols[code]
+                broker.on_tick(symbol, ts, price)
+                option = options[symbol]
+                option['put_iv'] = put_iv
+                option['call_iv'] = call_iv
+                option['put_delta'] = put_delta
+                option['call_delta'] = call_delta
+
+                signal = signal_fn(symbol, price)
+                result = trade_fn(symbol, signal, price)
+                if result.startswith('Erreur'):
+                    errors += 1
+
+                signals[i] = signal['signal']
+                positions[i] = broker.positions.get(symbol, 0.0)
+                equity[i] = broker.equity()
+                i += 1
+    elapsed = time.perf_counter() - start
+
+    returns = equity / np.concatenate(([broker.initial_cash], equity[:-1])) - 1
+    metrics = batch_performance(returns, positions, periods_per_year=periods_per_year).iloc[0].to_dict()
+    fills = pd.DataFrame(broker.fills, columns=['ts', 'symbol', 'order_id', 'side', 'qty', 'price',
+                                                'fill_price', 'fee', 'delay'])
+    return {
+        'ts': ticks['ts'],
+        'code': ticks['code'],
+        'symbols': symbols,
+        'price': ticks['price'],
+        'signal': signals,
+        'position': positions,
+        'equity': equity,
+        'fills': fills,
+        'errors': errors,
+        'orders': broker.orders_submitted,
+        'costs': broker.costs,
+        'metrics': metrics,
+        'events': n,
+        'seconds': elapsed,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from config import BACKTEST_CASH, BACKTEST_COMMISSION, BACKTEST_LATENCY, BACKTEST_SLIPPAGE_BPS, SYMBOL
+
+    parser = argparse.ArgumentParser(description="Backtest événementiel du chemin de décision live")
+    parser.add_argument('path', nargs='?', default=None,
+                        help="ticks Parquet (dataset historique ou export des cycles); simulés si absent")
+    parser.add_argument('--symbol', default=None)
+    parser.add_argument('--days', type=int, default=63, help="séances simulées (sans fichier)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=BACKTEST_LATENCY)
+    parser.add_argument('--slippage-bps', type=float, default=BACKTEST_SLIPPAGE_BPS)
+    parser.add_argument('--accel-thresh', type=float, default=None,
+                        help="seuil d'accélération du spread (défaut: ACCEL_THRESH de main, aucun trade)")
+    options = parser.parse_args()
+
+    if options.path:
+        ticks = ticks_from_frame(pd.read_parquet(options.path), options.symbol)
+    else:
+        ticks = simulate_ticks(options.days, options.symbol or SYMBOL, seed=options.seed)
+    broker = SimulatedBroker(BACKTEST_CASH, options.slippage_bps, options.latency, BACKTEST_COMMISSION)
+    params = {} if options.accel_thresh is None else {'ACCEL_THRESH': options.accel_thresh}
+    report = run_backtest(ticks, broker, params=params)
+
+    metrics = report['metrics']
+    print(f"✅ {report['events']} ticks rejoués en {report['seconds']:.2f}s "
+          f"({report['events'] / max(report['seconds'], 1e-9):,.0f} ticks/s)")
+    print(f"   📊 Ordres: {report['orders']}, exécutions: {len(report['fills'])}, "
+          f"coûts: ${report['costs']:,.2f}")
+    print(f"   📊 Equity finale: ${report['equity'][-1]:,.2f}")
+    print(f"   📊 Sharpe: {metrics['sharpe_ratio']:.2f}, drawdown max: {metrics['max_drawdown']:.2%}")
@@ -0,0 +1,147 @@
+# Agrégation incrémentale des trades en bougies OHLCV (buffer circulaire NumPy)
+import logging
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BAR_DTYPE = np.dtype([('ts', 'f8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'),
+                      ('close', 'f8'), ('volume', 'f8'), ('trades', 'i8')])
+
+_TIMEFRAME_UNITS = {'min': 60, 't': 60, 'hour': 3600, 'h': 3600, 'day': 86400, 'd': 86400}
+
+
+def timeframe_seconds(timeframe):
+    """Durée en secondes d'un timeframe Alpaca ('1Min', '5Min', '1Hour', '1Day')"""
+    match = re.fullmatch(r'(\d*)\s*([A-Za-z]+)', str(timeframe).strip())
+    if not match or match.group(2).lower() not in _TIMEFRAME_UNITS:
+        raise ValueError(f"Timeframe non supporté: {timeframe}")
+    return int(match.group(1) or 1) * _TIMEFRAME_UNITS[match.group(2).lower()]
+
+
+class BarAggregator:
+    """Construit les bougies d'un symbole trade par trade, en O(1)
+
+    Les bougies sont conservées dans un buffer circulaire "miroir" de
+    capacity bougies: chaque bougie est écrite à la position i et
+    i + capacity, de sorte que les n dernières bougies forment toujours
+    une tranche contiguë, lue sans copie. La bougie en cours fait partie
+    de la lecture. Les trades antérieurs à la bougie en cours sont ignorés
+    (comptés dans late).
+    """
+
+    def __init__(self, timeframe='1Min', capacity=1440):
+        self.period = timeframe_seconds(timeframe)
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=BAR_DTYPE)
+        self._count = 0
+        self._bucket = None
+        self.last_trade_ts = None
+        self.late = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def add_trade(self, ts, price, size=0.0):
+        """Ajoute un trade (ts en secondes epoch)"""
+        bucket = ts - ts % self.period
+        with self._lock:
+            if self._bucket is not None and bucket < self._bucket:
+                self.late += 1
+                return
+            if bucket != self._bucket:
+                # Nouvelle bougie
+                self._bucket = bucket
+                self._count += 1
+                bar = (bucket, price, price, price, price, size, 1)
+                pos = (self._count - 1) % self.capacity
+                self._data[pos] = bar
+                self._data[pos + self.capacity] = bar
+            else:
+                pos = (self._count - 1) % self.capacity
+                for i in (pos, pos + self.capacity):
+                    row = self._data[i]
+                    if price > row['high']:
+                        row['high'] = price
+                    if price < row['low']:
+                        row['low'] = price
+                    row['close'] = price
+                    row['volume'] += size
+                    row['trades'] += 1
+            self.last_trade_ts = ts
+
+    def bars(self, limit=None):
+        """Vue (sans copie) des limit dernières bougies, de la plus ancienne à la plus récente"""
+        n = len(self)
+        if limit is not None:
+            n = min(n, limit)
+        end = (self._count - 1) % self.capacity + 1 + self.capacity if self._count else 0
+        return self._data[end - n:end]
+
+    @property
+    def closed(self):
+        """Nombre de bougies clôturées depuis le début (la bougie en cours est exclue)"""
+        return max(self._count - 1, 0)
+
+    def last_price(self):
+        """Dernier prix (None si aucun trade)"""
+        if not self._count:
+            return None
+        return float(self._data[(self._count - 1) % self.capacity]['close'])
+
+    def state(self):
+        """État sauvegardable: bougies clôturées (change une fois par période)"""
+        with self._lock:
+            bars = self.bars()[:-1].copy()
+        return {'bars': [list(row) for row in bars.tolist()], 'last_trade_ts': self.last_trade_ts}
+
+    def restore_state(self, state):
+        rows = state.get('bars') or []
+        with self._lock:
+            self._count = 0
+            self._bucket = None
+            for row in rows[-self.capacity:]:
+                pos = self._count % self.capacity
+                self._data[pos] = tuple(row)
+                self._data[pos + self.capacity] = tuple(row)
+                self._count += 1
+            if rows:
+                self._bucket = rows[-1][0]
+            self.last_trade_ts = state.get('last_trade_ts')
+
+    def to_frame(self, limit=None):
+        """Bougies au format de get_data (DataFrame indexé par timestamp)
+
+        L'index est en heure locale naïve, comme clock_now() et les autres
+        sources de get_data.
+        """
+        with self._lock:
+            view = self.bars(limit).copy()
+        index = pd.DatetimeIndex([datetime.fromtimestamp(ts) for ts in view['ts'].tolist()])
+        return pd.DataFrame({name: view[name] for name in ('open', 'high', 'low', 'close', 'volume')},
+                            index=index)
+
+
+def start_trade_stream(aggregators, key_id, secret_key, base_url=None, data_feed='iex'):
+    """Alimente les agrégateurs {symbole: BarAggregator} via le flux de trades Alpaca
+
+    Le flux websocket tourne dans un thread démon; retourne l'objet Stream.
+    """
+    from alpaca_trade_api.stream import Stream
+
+    stream = Stream(key_id, secret_key, base_url=base_url, data_feed=data_feed)
+
+    async def on_trade(trade):
+        aggregator = aggregators.get(trade.symbol)
+        if aggregator is not None:
+            aggregator.add_trade(pd.Timestamp(trade.timestamp).timestamp(), float(trade.price),
+                                 float(trade.size or 0))
+
+    stream.subscribe_trades(on_trade, *aggregators)
+    thread = threading.Thread(target=stream.run, name='trade-stream', daemon=True)
+    thread.start()
+    logging.info(f"Flux de trades démarré pour {list(aggregators)} ({data_feed})")
+    return stream
@@ -0,0 +1,69 @@
+# Benchmark par tick du signal live: chemin pandas vs chemin scalaire
+# Usage: python bench_live_signal.py [ticks]
+import logging
+import sys
+import time
+
+import numpy as np
+
+import main
+from live_signal import LiveSignalState, update_live_signal
+
+
+def make_ticks(n, seed=0):
+    """Ticks synthétiques (IV put/call, deltas dans ou hors bande .25, prix)"""
+    rng = np.random.default_rng(seed)
+    return [{
+        'put_iv': float(rng.uniform(0.15, 0.40)),
+        'call_iv': float(rng.uniform(0.15, 0.40)),
+        'put_delta': float(rng.uniform(-0.32, -0.18)),
+        'call_delta': float(rng.uniform(0.18, 0.32)),
+        'underlying_price': float(rng.uniform(200, 250)),
+    } for _ in range(n)]
+
+
+def run_pandas(ticks):
+    results = []
+    for tick in ticks:
+        main.get_real_option_data = lambda symbol, price, tick=tick: tick
+        results.append(main.get_live_trading_signal('AAPL', tick['underlying_price']))
+    return results
+
+
+def run_scalar(ticks):
+    state = LiveSignalState(main.RISK_MULTIPLIER, main.MA_TOLERANCE, main.Z_THRESH_SHORT,
+                            main.Z_THRESH_LONG, main.ACCEL_THRESH)
+    return [update_live_signal(state, t['put_iv'], t['call_iv'], t['put_delta'], t['call_delta'],
+                               t['underlying_price']) for t in ticks]
+
+
+def main_bench(n=2000):
+    logging.disable(logging.WARNING)
+    ticks = make_ticks(n)
+    original = main.get_real_option_data
+    try:
+        start = time.perf_counter()
+        slow = run_pandas(ticks)
+        pandas_us = (time.perf_counter() - start) / n * 1e6
+    finally:
+        main.get_real_option_data = original
+
+    start = time.perf_counter()
+    fast = run_scalar(ticks)
+    scalar_us = (time.perf_counter() - start) / n * 1e6
+
+    # Mêmes signaux, tailles et spreads sur tous les ticks
+    for a, b in zip(slow, fast):
+        assert a['signal'] == b['signal'] and a['reason'] == b['reason']
+        assert abs(a['position_size'] - b['position_size']) < 1e-12
+        assert abs(a['spread_iv'] - b['spread_iv']) < 1e-12
+    in_band = sum(1 for b in fast if b['put_iv'] is not None)
+
+    print(f"Ticks: {n} ({in_band} dans les bandes .25 delta)")
+    print(f"Chemin pandas:    {pandas_us:10.1f} µs/tick")
+    print(f"Chemin scalaire:  {scalar_us:10.2f} µs/tick")
+    print(f"Accélération:     {pandas_us / scalar_us:10.0f}x")
+
+
+if __name__ == "__main__":
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,118 @@
+# Points de reprise atomiques de l'état du bot (redémarrage rapide)
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+def _json_default(obj):
+    """Sérialisation des types NumPy et dates"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+class Checkpointer:
+    """Sauvegarde périodique et restauration de l'état des composants du bot
+
+    Chaque composant s'enregistre avec une fonction qui retourne son état
+    (types JSON, tableaux NumPy acceptés) et une fonction qui le restaure.
+    Le fichier est écrit dans un fichier temporaire du même répertoire,
+    synchronisé sur disque puis renommé: un crash pendant l'écriture
+    laisse toujours le point de reprise précédent intact.
+    """
+
+    def __init__(self, path, every=1):
+        self.path = path
+        self.every = max(1, every)
+        self.saves = 0
+        self.last_save_duration = None
+        self._components = {}
+
+    def register(self, name, get_state, set_state):
+        self._components[name] = (get_state, set_state)
+
+    def save(self, cycle):
+        """Écrit l'état de tous les composants (retourne False en cas d'erreur)"""
+        start = time.perf_counter()
+        state = {'version': CHECKPOINT_VERSION, 'cycle': cycle, 'saved_at': time.time(), 'components': {}}
+        for name, (get_state, _) in self._components.items():
+            try:
+                state['components'][name] = get_state()
+            except Exception as e:
+                logging.warning(f"État du composant {name} non sauvegardé: {e}")
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.checkpoint-', dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, default=_json_default, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Erreur écriture point de reprise {self.path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except Exception:
+                pass
+            return False
+
+        self.saves += 1
+        self.last_save_duration = time.perf_counter() - start
+        return True
+
+    def maybe_save(self, cycle):
+        """Sauvegarde tous les every cycles"""
+        if cycle % self.every == 0:
+            return self.save(cycle)
+        return False
+
+    def load(self):
+        """Contenu du dernier point de reprise (None s'il est absent ou illisible)"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Point de reprise illisible ({self.path}): {e}")
+            return None
+        if state.get('version') != CHECKPOINT_VERSION:
+            logging.warning(f"Version de point de reprise non supportée: {state.get('version')}")
+            return None
+        return state
+
+    def restore(self, max_age=None):
+        """Restaure les composants enregistrés depuis le dernier point de reprise
+
+        Retourne le point de reprise appliqué, ou None s'il est absent ou
+        plus ancien que max_age secondes.
+        """
+        state = self.load()
+        if state is None:
+            return None
+        age = time.time() - state['saved_at']
+        if max_age is not None and age > max_age:
+            logging.info(f"Point de reprise trop ancien ({age:.0f}s), démarrage à froid")
+            return None
+
+        for name, (_, set_state) in self._components.items():
+            if name not in state['components']:
+                continue
+            try:
+                set_state(state['components'][name])
+            except Exception as e:
+                logging.warning(f"État du composant {name} non restauré: {e}")
+        logging.info(f"État restauré depuis {self.path} (cycle #{state['cycle']}, il y a {age:.1f}s)")
+        return state
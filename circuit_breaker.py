@@ -0,0 +1,189 @@
+# Disjoncteurs par endpoint API et cache négatif des erreurs permanentes
+import logging
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Erreurs qui ne se corrigeront pas d'un appel à l'autre (abonnement, droits)
+PERMANENT_ERROR_MARKERS = (
+    'subscription does not permit',
+    'not authorized',
+    'unauthorized',
+    'permission denied',
+    'forbidden',
+)
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé sans requête: le disjoncteur de l'endpoint est ouvert"""
+
+
+class EndpointUnavailable(CircuitOpenError, AttributeError):
+    """Méthode absente du client, mémorisée (hasattr retourne False)"""
+
+
+def classify_error(error):
+    """'permanent', 'transient' ou None (erreur client qui ne met pas l'endpoint en cause)"""
+    message = str(error).lower()
+    if any(marker in message for marker in PERMANENT_ERROR_MARKERS):
+        return 'permanent'
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+    if status is not None and 400 <= int(status) < 500 and int(status) != 429:
+        # 404 (position absente), 422 (ordre invalide)...: l'endpoint fonctionne
+        return None
+    return 'transient'
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un endpoint: fermé, ouvert, puis semi-ouvert pour un appel test
+
+    Après failure_threshold échecs transitoires consécutifs, l'endpoint est
+    ouvert pendant reset_timeout secondes (doublé à chaque test raté,
+    plafonné à max_reset_timeout). Une erreur permanente l'ouvre
+    directement pour permanent_ttl secondes (cache négatif). À
+    l'expiration, un seul appel test est autorisé (semi-ouvert).
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0, max_reset_timeout=600.0,
+                 permanent_ttl=3600.0, time_fn=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.permanent_ttl = permanent_ttl
+        self._time = time_fn
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.short_circuits = 0
+        self.last_error = None
+        self.permanent = False
+        self._timeout = reset_timeout
+        self._open_until = 0.0
+        self._probing = False
+
+    def allow(self):
+        """Vrai si un appel peut partir (un seul appel test en semi-ouvert)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._time() >= self._open_until:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuits += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logging.info(f"Disjoncteur {self.name}: endpoint rétabli")
+            self.state = CLOSED
+            self.failures = 0
+            self.permanent = False
+            self._timeout = self.reset_timeout
+            self._probing = False
+
+    def record_failure(self, error):
+        kind = classify_error(error)
+        with self._lock:
+            self._probing = False
+            if kind is None:
+                # L'endpoint a répondu: ni échec ni réouverture
+                if self.state == HALF_OPEN:
+                    self.state = CLOSED
+                    self.failures = 0
+                return
+            self.last_error = str(error)
+            if kind == 'permanent':
+                self.permanent = True
+                self._open(self.permanent_ttl)
+                logging.warning(f"Disjoncteur {self.name}: erreur permanente, endpoint désactivé "
+                                f"{self.permanent_ttl:.0f}s ({error})")
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+                self._open(self._timeout)
+            elif self.failures >= self.failure_threshold:
+                self._open(self._timeout)
+                logging.warning(f"Disjoncteur {self.name}: ouvert {self._timeout:.0f}s après "
+                                f"{self.failures} échecs ({error})")
+
+    def _open(self, timeout):
+        self.state = OPEN
+        self._open_until = self._time() + timeout
+
+    def open_error(self):
+        return CircuitOpenError(f"{self.name} indisponible (disjoncteur ouvert): {self.last_error}")
+
+    def snapshot(self):
+        return {'state': self.state, 'failures': self.failures, 'permanent': self.permanent,
+                'short_circuits': self.short_circuits, 'last_error': self.last_error}
+
+
+class BreakerClient:
+    """Proxy d'un client API avec un disjoncteur par méthode
+
+    Une méthode absente du client est mémorisée: les accès suivants lèvent
+    EndpointUnavailable sans rien tenter. Les méthodes de exempt (ex:
+    envoi d'ordres) passent sans disjoncteur.
+    """
+
+    def __init__(self, client, name, exempt=(), **breaker_options):
+        self._client = client
+        self._name = name
+        self._exempt = set(exempt)
+        self._options = breaker_options
+        self.breakers = {}
+        self._missing = {}
+
+    def _breaker(self, method):
+        breaker = self.breakers.get(method)
+        if breaker is None:
+            breaker = self.breakers[method] = CircuitBreaker(f"{self._name}.{method}", **self._options)
+        return breaker
+
+    def __getattr__(self, method):
+        if method.startswith('__') or method in self._exempt:
+            return getattr(self._client, method)
+        if method in self._missing:
+            raise EndpointUnavailable(self._missing[method])
+        try:
+            target = getattr(self._client, method)
+        except AttributeError as e:
+            self._missing[method] = f"{self._name}.{method} indisponible: {e}"
+            logging.warning(f"Méthode {self._name}.{method} absente, mise en cache négatif ({e})")
+            raise
+        if not callable(target):
+            return target
+        breaker = self._breaker(method)
+
+        def call(*args, **kwargs):
+            # Vérifié à chaque appel: la méthode peut avoir été récupérée bien avant
+            if not breaker.allow():
+                raise breaker.open_error()
+            try:
+                result = target(*args, **kwargs)
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+            breaker.record_success()
+            return result
+
+        return call
+
+    def stats(self):
+        """État des disjoncteurs non fermés (et compteurs)"""
+        stats = {method: b.snapshot() for method, b in self.breakers.items()
+                 if b.state != CLOSED or b.short_circuits}
+        for method, message in self._missing.items():
+            stats[method] = {'state': OPEN, 'permanent': True, 'last_error': message}
+        return stats
@@ -0,0 +1,232 @@
+# Export colonnaire (Parquet partitionné par jour) des cycles, ordres et datasets
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow n'est requis que si l'export colonnaire est activé
+    pa = ds = pq = None
+
+if pa is not None:
+    # Colonnes des fichiers (la date est dans le chemin: date=AAAA-MM-JJ)
+    SCHEMAS = {
+        'cycles': pa.schema([
+            ('ts', pa.timestamp('us', tz='UTC')),
+            ('symbol', pa.string()),
+            ('cycle', pa.int64()),
+            ('price', pa.float64()),
+            ('put_symbol', pa.string()),
+            ('call_symbol', pa.string()),
+            ('put_strike', pa.float64()),
+            ('call_strike', pa.float64()),
+            ('put_iv', pa.float64()),
+            ('call_iv', pa.float64()),
+            ('spread_iv', pa.float64()),
+            ('ma_short', pa.float64()),
+            ('ma_long', pa.float64()),
+            ('z_short', pa.float64()),
+            ('z_long', pa.float64()),
+            ('accel', pa.float64()),
+            ('signal', pa.int8()),
+            ('position_size', pa.float64()),
+            ('reason', pa.string()),
+            ('trade_result', pa.string()),
+            ('error', pa.string()),
+        ]),
+        'orders': pa.schema([
+            ('ts', pa.timestamp('us', tz='UTC')),
+            ('symbol', pa.string()),
+            ('cycle', pa.int64()),
+            ('side', pa.string()),
+            ('qty', pa.float64()),
+            ('order_id', pa.string()),
+            ('status', pa.string()),
+            ('latency', pa.float64()),
+            ('error', pa.string()),
+        ]),
+    }
+    TS_TYPE = pa.timestamp('us', tz='UTC')
+else:
+    SCHEMAS = {}
+    TS_TYPE = None
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts if ts is not None else datetime.now(timezone.utc))
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def _day_dir(root, table, day):
+    return os.path.join(root, table, f"date={day}")
+
+
+def _parts(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                  if f.endswith('.parquet') and not f.startswith('.'))
+
+
+def _write_atomic(table, path):
+    """Écrit un fichier Parquet complet ou rien (les lecteurs ne voient pas de fichier partiel)"""
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    # Préfixe '.': ignoré par les lectures tant que l'écriture n'est pas finie
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+class ColumnarSink:
+    """Export des cycles en Parquet partitionné root/<table>/date=AAAA-MM-JJ/
+
+    Les lignes sont bufferisées en mémoire et écrites par lots (batch_rows
+    lignes ou flush_seconds secondes), un fichier par jour et par lot.
+    Au-delà de max_parts fichiers, la journée est fusionnée en un seul
+    fichier trié par symbole puis ts: lire une journée (tous symboles)
+    ne touche jamais plus de max_parts fichiers.
+    """
+
+    def __init__(self, root, batch_rows=500, flush_seconds=300.0, max_parts=4):
+        if pa is None:
+            raise ImportError("pyarrow est requis pour l'export colonnaire")
+        self.root = root
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.max_parts = max_parts
+        self.rows_written = 0
+        self.files_written = 0
+        self.flush_time = 0.0
+        self._buffers = {name: [] for name in SCHEMAS}
+        self._last_flush = time.monotonic()
+        self._sequence = 0
+
+    def write(self, table, symbol, row, ts=None):
+        """Ajoute une ligne (dict, colonnes absentes à null) à la table cycles ou orders"""
+        ts = _utc(ts)
+        self._buffers[table].append((ts.strftime('%Y-%m-%d'), dict(row, ts=ts, symbol=symbol)))
+        self.maybe_flush()
+
+    def write_frame(self, name, frame, symbol, ts=None):
+        """Écrit un DataFrame (dataset, indicateurs...) dans root/<name>/, sans buffer"""
+        day = _utc(ts).strftime('%Y-%m-%d')
+        try:
+            table = pa.Table.from_pandas(frame.assign(symbol=symbol), preserve_index=True)
+            _write_atomic(table, self._path(name, day))
+            self.files_written += 1
+        except Exception as e:
+            logging.error(f"Erreur export colonnaire {name}: {e}")
+
+    def pending(self):
+        return sum(len(rows) for rows in self._buffers.values())
+
+    def maybe_flush(self):
+        if (self.pending() >= self.batch_rows
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def _path(self, table, day):
+        self._sequence += 1
+        stamp = datetime.now().strftime('%H%M%S')
+        return os.path.join(_day_dir(self.root, table, day),
+                            f"part-{stamp}-{os.getpid()}-{self._sequence}.parquet")
+
+    def flush(self):
+        """Écrit les lignes bufferisées (un fichier par jour et par table)"""
+        start = time.perf_counter()
+        for table, rows in self._buffers.items():
+            if not rows:
+                continue
+            days = {}
+            for day, row in rows:
+                days.setdefault(day, []).append(row)
+            try:
+                for day, part in days.items():
+                    _write_atomic(pa.Table.from_pylist(part, schema=SCHEMAS[table]), self._path(table, day))
+                    self.files_written += 1
+                    if len(_parts(_day_dir(self.root, table, day))) > self.max_parts:
+                        compact(self.root, table, day)
+                self.rows_written += len(rows)
+            except Exception as e:
+                logging.error(f"Erreur export colonnaire {table}: {e}")
+            rows.clear()
+        self._last_flush = time.monotonic()
+        self.flush_time += time.perf_counter() - start
+
+    def close(self):
+        self.flush()
+
+    def stats(self):
+        return {'rows_written': self.rows_written, 'files_written': self.files_written,
+                'pending': self.pending(), 'flush_time': round(self.flush_time, 3)}
+
+
+def compact(root, table, day):
+    """Fusionne les fichiers d'une journée en un seul, trié par symbole puis ts
+
+    Le fichier fusionné est écrit avant la suppression des anciens: un
+    lecteur concurrent peut voir brièvement des lignes en double, jamais
+    de lignes manquantes.
+    """
+    day_dir = _day_dir(root, table, day)
+    paths = _parts(day_dir)
+    if len(paths) < 2:
+        return 0
+    try:
+        merged = pa.concat_tables([pq.read_table(p) for p in paths], promote_options='default')
+        keys = [(c, 'ascending') for c in ('symbol', 'ts') if c in merged.column_names]
+        if keys:
+            merged = merged.sort_by(keys)
+        target = os.path.join(day_dir, f"compact-{day}.parquet")
+        _write_atomic(merged, target)
+        for p in paths:
+            if p != target:
+                os.remove(p)
+    except Exception as e:
+        logging.error(f"Erreur compaction {day_dir}: {e}")
+        return 0
+    return len(paths)
+
+
+def query(root, table='cycles', day=None, symbols=None, columns=None, start=None, end=None):
+    """Lit une table exportée en DataFrame
+
+    day (AAAA-MM-JJ ou date) limite la lecture au répertoire de la journée,
+    symbols et start/end (bornes sur ts) sont appliqués pendant le scan.
+    La colonne date vient du chemin.
+    """
+    if pa is None:
+        raise ImportError("pyarrow est requis pour lire l'export colonnaire")
+    path = os.path.join(root, table)
+    if day is not None:
+        day = pd.Timestamp(day).strftime('%Y-%m-%d')
+        path = _day_dir(root, table, day)
+    if not os.path.isdir(path):
+        return pd.DataFrame(columns=columns)
+
+    if day is not None:
+        dataset = ds.dataset(_parts(path), format='parquet')
+    else:
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    condition = None
+    if symbols is not None:
+        condition = ds.field('symbol').isin(list(symbols))
+    if start is not None:
+        term = ds.field('ts') >= pa.scalar(_utc(start), TS_TYPE)
+        condition = term if condition is None else condition & term
+    if end is not None:
+        term = ds.field('ts') < pa.scalar(_utc(end), TS_TYPE)
+        condition = term if condition is None else condition & term
+    read_columns = columns
+    if columns is not None and day is not None:
+        read_columns = [c for c in columns if c != 'date']
+    frame = dataset.to_table(columns=read_columns, filter=condition).to_pandas()
+    if day is not None and (columns is None or 'date' in columns):
+        frame['date'] = day
+    return frame
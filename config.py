@@ -18,6 +18,96 @@ SHORT_WINDOW = int(os.getenv("SHORT_WINDOW", "10"))
 LONG_WINDOW = int(os.getenv("LONG_WINDOW", "50"))
 RISK_LEVEL = float(os.getenv("RISK_LEVEL", "0.02"))
 
+# Planification des cycles (alignés sur l'horloge, heures de marché)
+CYCLE_PERIOD = int(os.getenv("CYCLE_PERIOD", "60"))
+FAST_CYCLE_PERIOD = int(os.getenv("FAST_CYCLE_PERIOD", "0"))  # 0 = désactivé
+FAST_WINDOW_MINUTES = int(os.getenv("FAST_WINDOW_MINUTES", "15"))
+CLOCK_CACHE_SECONDS = int(os.getenv("CLOCK_CACHE_SECONDS", "300"))
+MARKET_HOURS_ONLY = os.getenv("MARKET_HOURS_ONLY", "true").lower() in ("1", "true", "yes")
+
+# Hub de données de marché partagé (vide = accès API direct)
+HUB_NAME = os.getenv("HUB_NAME", "")
+HUB_SYMBOLS = os.getenv("HUB_SYMBOLS", SYMBOL)
+HUB_MAX_AGE = float(os.getenv("HUB_MAX_AGE", "180"))
+
+# Endpoint HTTP de statut (/status, /health), port 0 = désactivé
+STATUS_HOST = os.getenv("STATUS_HOST", "127.0.0.1")
+STATUS_PORT = int(os.getenv("STATUS_PORT", "8765"))
+
+# Allocation de portefeuille (plafonds en fraction du capital)
+PORTFOLIO_MAX_NAME = float(os.getenv("PORTFOLIO_MAX_NAME", "1.5"))
+PORTFOLIO_MAX_GROSS = float(os.getenv("PORTFOLIO_MAX_GROSS", "1.5"))
+PORTFOLIO_MAX_NET = float(os.getenv("PORTFOLIO_MAX_NET", "1.5"))
+
+# Exécution des ordres (débit max, parallélisme, durée du cache de positions)
+ORDER_RATE_PER_MINUTE = int(os.getenv("ORDER_RATE_PER_MINUTE", "100"))
+EXECUTION_WORKERS = int(os.getenv("EXECUTION_WORKERS", "8"))
+POSITIONS_CACHE_SECONDS = float(os.getenv("POSITIONS_CACHE_SECONDS", "30"))
+
+# Point de reprise de l'état du bot (vide = désactivé, âge max en secondes)
+CHECKPOINT_FILE = os.getenv("CHECKPOINT_FILE", "bot_state.json")
+CHECKPOINT_EVERY = int(os.getenv("CHECKPOINT_EVERY", "1"))
+CHECKPOINT_MAX_AGE = float(os.getenv("CHECKPOINT_MAX_AGE", "900"))
+
+# Filtre de qualité des quotes d'options (écart relatif max, âge max en secondes, bid min)
+QUOTE_MAX_SPREAD_PCT = float(os.getenv("QUOTE_MAX_SPREAD_PCT", "0.5"))
+QUOTE_MAX_AGE = float(os.getenv("QUOTE_MAX_AGE", "120"))
+QUOTE_MIN_BID = float(os.getenv("QUOTE_MIN_BID", "0.01"))
+# Strikes voisins dont la quote est demandée quand le contrat sélectionné est rejeté
+QUOTE_FALLBACK_CANDIDATES = int(os.getenv("QUOTE_FALLBACK_CANDIDATES", "2"))
+
+# Bougies agrégées depuis le flux de trades websocket (au-delà de BAR_MAX_AGE secondes sans trade: API)
+BAR_STREAM = os.getenv("BAR_STREAM", "false").lower() in ("1", "true", "yes")
+BAR_FEED = os.getenv("BAR_FEED", "iex")
+BAR_CAPACITY = int(os.getenv("BAR_CAPACITY", "1440"))
+BAR_MAX_AGE = float(os.getenv("BAR_MAX_AGE", "120"))
+
+# Signal live calculé sur scalaires (false = chemin pandas historique)
+LIVE_FAST_PATH = os.getenv("LIVE_FAST_PATH", "true").lower() in ("1", "true", "yes")
+
+# Récupération du prix en requêtes couvertes (délai avant repli et délai max, en secondes)
+PRICE_HEDGING = os.getenv("PRICE_HEDGING", "true").lower() in ("1", "true", "yes")
+PRICE_HEDGE_DELAY = float(os.getenv("PRICE_HEDGE_DELAY", "0.3"))
+PRICE_FETCH_TIMEOUT = float(os.getenv("PRICE_FETCH_TIMEOUT", "10"))
+
+# Disjoncteurs par endpoint API (échecs avant ouverture, délai avant test, cache des erreurs permanentes)
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+BREAKER_PERMANENT_SECONDS = float(os.getenv("BREAKER_PERMANENT_SECONDS", "3600"))
+
+# Profilage des cycles (nombre de cycles profilés au démarrage, 0 = sur signal USR2 uniquement)
+PROFILE_CYCLES = int(os.getenv("PROFILE_CYCLES", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# Export colonnaire des cycles en Parquet (vide = désactivé), écritures par lots
+COLUMNAR_DIR = os.getenv("COLUMNAR_DIR", "")
+COLUMNAR_BATCH_ROWS = int(os.getenv("COLUMNAR_BATCH_ROWS", "60"))
+COLUMNAR_FLUSH_SECONDS = float(os.getenv("COLUMNAR_FLUSH_SECONDS", "300"))
+
+# Analyse de robustesse (chemins bootstrap, chemins à IV bruitées, bruit relatif, process; 0 = tous les CPU)
+BOOTSTRAP_PATHS = int(os.getenv("BOOTSTRAP_PATHS", "5000"))
+BOOTSTRAP_IV_PATHS = int(os.getenv("BOOTSTRAP_IV_PATHS", "0"))
+BOOTSTRAP_IV_NOISE = float(os.getenv("BOOTSTRAP_IV_NOISE", "0.02"))
+BOOTSTRAP_WORKERS = int(os.getenv("BOOTSTRAP_WORKERS", "0"))
+
+# Greeks Black-Scholes (taux sans risque, rendement du dividende, pas de temps du cache en secondes)
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.04"))
+DIVIDEND_YIELD = float(os.getenv("DIVIDEND_YIELD", "0.0"))
+RISK_TIME_STEP = float(os.getenv("RISK_TIME_STEP", "60"))
+
+# Backtest événementiel du chemin live (capital, glissement en points de base, latence des ordres en secondes, commission par action)
+BACKTEST_CASH = float(os.getenv("BACKTEST_CASH", "100000"))
+BACKTEST_SLIPPAGE_BPS = float(os.getenv("BACKTEST_SLIPPAGE_BPS", "1.0"))
+BACKTEST_LATENCY = float(os.getenv("BACKTEST_LATENCY", "1.0"))
+BACKTEST_COMMISSION = float(os.getenv("BACKTEST_COMMISSION", "0.0"))
+
+# Enregistrement des cycles pour rejeu hors ligne (vide = désactivé)
+RECORD_FILE = os.getenv("RECORD_FILE", "")
+
+# Instrumentation mémoire de la boucle principale
+MEMORY_SAMPLE_EVERY = int(os.getenv("MEMORY_SAMPLE_EVERY", "60"))
+MEMORY_ALERT_MB = float(os.getenv("MEMORY_ALERT_MB", "200"))
+
 # Vérification des credentials
 def check_credentials():
     """Vérifie si les credentials Alpaca sont configurés"""
@@ -0,0 +1,248 @@
+# Moteur d'exécution: diff des positions et envoi groupé des ordres
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Statuts d'ordre Alpaca pour lesquels l'ordre n'est plus en attente
+CLOSED_STATUSES = ('filled', 'canceled', 'expired', 'rejected')
+
+
+class RateLimiter:
+    """Seau à jetons thread-safe (rate appels par minute, rafale de burst appels)"""
+
+    def __init__(self, rate_per_minute=100, burst=None, time_fn=time.monotonic, sleep_fn=time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst or max(1, int(rate_per_minute // 6))
+        self._tokens = float(self.burst)
+        self._time = time_fn
+        self._sleep = sleep_fn
+        self._last = time_fn()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible"""
+        while True:
+            with self._lock:
+                now = self._time()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+                self.waited += delay
+            self._sleep(delay)
+
+
+class NullLimiter:
+    """Limiteur sans attente (courtier simulé ou rejoué, pas de quota)"""
+
+    def acquire(self):
+        pass
+
+
+def diff_orders(targets, positions):
+    """Ordres nécessaires pour passer des positions aux cibles (no-op ignorés)
+
+    targets et positions: {symbole: quantité}. Chaque ordre est un dict
+    {'symbol', 'current', 'target', 'qty'} où qty est signé (>0 achat).
+    """
+    orders = []
+    for symbol, target in targets.items():
+        current = positions.get(symbol, 0)
+        qty = int(round(target - current))
+        if qty == 0:
+            continue
+        orders.append({'symbol': symbol, 'current': current, 'target': int(target), 'qty': qty})
+    return orders
+
+
+class ExecutionEngine:
+    """Rebalancement multi-symboles: cache de positions et ordres concurrents
+
+    get_client retourne le client API à utiliser (résolu à chaque appel,
+    ce qui permet de remplacer le client, par exemple en rejeu). Les
+    positions sont lues en un seul appel list_positions et mises en cache
+    pendant positions_ttl secondes; elles sont mises à jour avec les
+    quantités cibles des ordres acceptés, qui restent en attente (et ne
+    sont pas renvoyés) tant que le courtier les liste comme ouverts. Les
+    ordres d'un rebalancement partent en parallèle, chacun après un jeton
+    du limiteur de débit.
+    """
+
+    def __init__(self, get_client, limiter=None, max_workers=8, positions_ttl=30.0, order_ttl=300.0):
+        self.get_client = get_client
+        self.limiter = limiter or RateLimiter()
+        self.max_workers = max_workers
+        self.positions_ttl = positions_ttl
+        self.order_ttl = order_ttl
+        self._positions = {}
+        self._positions_ts = None
+        self._lock = threading.Lock()
+        self.last_acks = []
+        # Ordres acceptés non encore reflétés dans les positions {order_id: ordre}
+        self.open_orders = {}
+
+    # ---------- Positions ----------
+    def refresh_positions(self):
+        """Relit toutes les positions du compte (un appel API, deux s'il reste des ordres en attente)
+
+        Les ordres en attente sont d'abord confrontés aux ordres ouverts du
+        courtier: un ordre exécuté, rejeté, annulé ou expiré entre-temps
+        n'est plus en attente, et les positions lues ensuite reflètent son
+        issue. Un ordre dont la position atteint la cible, ou plus vieux que
+        order_ttl secondes, est aussi abandonné.
+        """
+        with self._lock:
+            pending = dict(self.open_orders)
+        closed = self.reconcile_orders() if pending else []
+        self.limiter.acquire()
+        positions = self.get_client().list_positions()
+        with self._lock:
+            self._positions = {p.symbol: float(p.qty) for p in positions}
+            self._positions_ts = time.monotonic()
+            now = time.time()
+            self.open_orders = {oid: o for oid, o in self.open_orders.items()
+                                if self._positions.get(o['symbol'], 0) != o['target']
+                                and now - o['ts'] <= self.order_ttl}
+            snapshot = dict(self._positions)
+        for oid in closed:
+            order = pending[oid]
+            held = snapshot.get(order['symbol'], 0)
+            if held != order['target']:
+                logging.warning(f"Ordre {oid} {order['side']} {order['qty']} {order['symbol']} clos sans "
+                                f"atteindre la cible ({held:g} au lieu de {order['target']:g})")
+        return snapshot
+
+    def positions(self, max_age=None):
+        """Positions en cache, relues si plus anciennes que max_age (positions_ttl par défaut)"""
+        max_age = self.positions_ttl if max_age is None else max_age
+        if self._positions_ts is None or time.monotonic() - self._positions_ts > max_age:
+            return self.refresh_positions()
+        with self._lock:
+            return dict(self._positions)
+
+    def invalidate(self):
+        """Force la relecture des positions au prochain appel"""
+        self._positions_ts = None
+
+    def reconcile(self):
+        """Confronte les positions connues à celles du courtier (un seul appel)
+
+        Retourne {symbole: (connue, courtier)} pour les positions divergentes.
+        """
+        with self._lock:
+            known = dict(self._positions)
+        broker = self.refresh_positions()
+        mismatches = {s: (known.get(s, 0), broker.get(s, 0)) for s in set(known) | set(broker)
+                      if known.get(s, 0) != broker.get(s, 0)}
+        for symbol, (was, now) in mismatches.items():
+            logging.warning(f"Position {symbol} réconciliée: {was:g} -> {now:g}")
+        return mismatches
+
+    def reconcile_orders(self):
+        """Ne garde des ordres en attente que ceux encore ouverts chez le courtier (un appel)
+
+        Retourne les identifiants abandonnés (exécutés, rejetés, annulés,
+        expirés ou inconnus du courtier).
+        """
+        self.limiter.acquire()
+        open_ids = {str(o.id) for o in self.get_client().list_orders(status='open')}
+        with self._lock:
+            dropped = [oid for oid in self.open_orders if oid not in open_ids]
+            for oid in dropped:
+                del self.open_orders[oid]
+        if dropped:
+            logging.info(f"{len(dropped)} ordre(s) en attente plus ouvert(s) chez le courtier")
+        return dropped
+
+    def state(self):
+        """État à sauvegarder: dernières positions connues et ordres ouverts"""
+        with self._lock:
+            return {'positions': dict(self._positions), 'open_orders': dict(self.open_orders)}
+
+    def restore_state(self, state):
+        with self._lock:
+            self._positions = {s: float(q) for s, q in state.get('positions', {}).items()}
+            self.open_orders = dict(state.get('open_orders', {}))
+            # Les positions restaurées doivent être confirmées par le courtier
+            self._positions_ts = None
+
+    # ---------- Ordres ----------
+    def rebalance(self, targets):
+        """Envoie les ordres amenant les positions aux cibles {symbole: quantité}
+
+        Retourne la liste des accusés: {'symbol', 'side', 'qty', 'order_id',
+        'status', 'latency', 'error'} (un par ordre envoyé).
+        """
+        positions = self.positions()
+        # Un ordre encore en attente compte comme exécuté: pas de doublon
+        with self._lock:
+            for order in self.open_orders.values():
+                positions[order['symbol']] = order['target']
+        orders = diff_orders(targets, positions)
+        if not orders:
+            self.last_acks = []
+            return []
+
+        start = time.perf_counter()
+        workers = min(self.max_workers, len(orders))
+        if workers == 1:
+            # Un seul symbole (cas du bot et du backtest): pas de pool de threads
+            results = [self._execute(order) for order in orders]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='orders') as pool:
+                results = list(pool.map(self._execute, orders))
+        acks = [ack for group in results for ack in group]
+
+        failed = [a for a in acks if a['error']]
+        logging.info(f"Rebalancement: {len(acks)} ordre(s) en {time.perf_counter() - start:.2f}s, "
+                     f"{len(failed)} en erreur")
+        self.last_acks = acks
+        return acks
+
+    def _execute(self, order):
+        """Exécute les ordres d'un symbole (fermeture puis ouverture si la position change de sens)"""
+        symbol, current, target = order['symbol'], order['current'], order['target']
+        acks = []
+        if current and (target == 0 or (target > 0) != (current > 0)):
+            ack = self._send(symbol, 'close', abs(current), lambda c: c.close_position(symbol))
+            acks.append(ack)
+            if ack['error'] or target == 0:
+                return acks
+            qty = target
+        else:
+            qty = order['qty']
+
+        side = 'buy' if qty > 0 else 'sell'
+        acks.append(self._send(symbol, side, abs(qty), lambda c: c.submit_order(
+            symbol=symbol,
+            qty=abs(qty),
+            side=side,
+            type="market",
+            time_in_force="day"
+        ), target=target))
+        return acks
+
+    def _send(self, symbol, side, qty, submit, target=0):
+        self.limiter.acquire()
+        start = time.perf_counter()
+        ack = {'symbol': symbol, 'side': side, 'qty': qty, 'order_id': None,
+               'status': None, 'latency': None, 'error': None}
+        try:
+            result = submit(self.get_client())
+            status = getattr(result, 'status', None)
+            ack['order_id'] = getattr(result, 'id', None)
+            ack['status'] = getattr(status, 'value', status)
+            with self._lock:
+                self._positions[symbol] = target
+                if ack['order_id'] is not None and ack['status'] not in CLOSED_STATUSES:
+                    self.open_orders[str(ack['order_id'])] = {'symbol': symbol, 'side': side, 'qty': qty,
+                                                              'target': target, 'ts': time.time()}
+        except Exception as e:
+            ack['error'] = str(e)
+            logging.error(f"Ordre {side} {qty} {symbol} rejeté: {e}")
+        ack['latency'] = time.perf_counter() - start
+        return ack
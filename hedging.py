@@ -0,0 +1,139 @@
+# Requêtes couvertes (hedged requests): sources de repli lancées en parallèle
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgedFetcher:
+    """Interroge plusieurs sources équivalentes et garde la première réponse valide
+
+    La source principale part immédiatement; chaque repli est lancé
+    hedge_delay secondes plus tard s'il n'y a toujours pas de réponse
+    valide (ou aussitôt si toutes les sources en cours ont échoué). Une
+    source retourne None quand sa réponse n'est pas exploitable. Les
+    sources encore en attente sont annulées (ou leur résultat ignoré).
+    Les victoires et latences sont suivies par source.
+
+    Un appel abandonné qui continue de tourner (requête bloquée) occupe
+    un worker: quand ces appels bloqués occupent tout le pool, celui-ci
+    est remplacé par un pool neuf (les anciens threads finissent seuls).
+    """
+
+    def __init__(self, hedge_delay=0.3, timeout=10.0, max_workers=4, history=500):
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self._history = history
+        self._lock = threading.Lock()
+        # Appels abandonnés encore en cours dans le pool courant
+        self._stuck = set()
+        self.pool_replacements = 0
+        self.wins = {}
+        self.failures = 0
+        self.source_latency = {}
+        self.fetch_latency = deque(maxlen=history)
+
+    def close(self):
+        """Arrête le pool (les appels encore en cours finissent seuls)"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _timed(self, name, fn):
+        start = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as e:
+            logging.warning(f"Erreur {name}: {e}")
+            value = None
+        with self._lock:
+            self.source_latency.setdefault(name, deque(maxlen=self._history)).append(time.perf_counter() - start)
+        return value
+
+    def fetch(self, sources):
+        """Exécute les sources [(nom, fonction)] en requêtes couvertes
+
+        Retourne (nom de la source gagnante, valeur) ou (None, None).
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        pending = {}
+        launched = 0
+        next_launch = start
+
+        while launched < len(sources) or pending:
+            now = time.perf_counter()
+            if launched < len(sources) and (now >= next_launch or not pending):
+                name, fn = sources[launched]
+                pending[self._pool.submit(self._timed, name, fn)] = name
+                launched += 1
+                next_launch = now + self.hedge_delay
+                continue
+            if now >= deadline:
+                break
+
+            wait_until = min(deadline, next_launch) if launched < len(sources) else deadline
+            done, _ = wait(pending, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                value = future.result()
+                if value is not None:
+                    self._abandon(pending)
+                    self._record(name, start)
+                    return name, value
+
+        self._abandon(pending)
+        self._record(None, start)
+        return None, None
+
+    def _abandon(self, pending):
+        """Annule les appels en attente; ceux déjà lancés sont suivis jusqu'à leur fin"""
+        with self._lock:
+            for future in pending:
+                if not future.cancel() and not future.done():
+                    self._stuck.add(future)
+                    future.add_done_callback(self._release)
+            if len(self._stuck) >= self.max_workers:
+                logging.warning(f"{len(self._stuck)} requête(s) bloquée(s): remplacement du pool de requêtes couvertes")
+                self._pool.shutdown(wait=False)
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hedge')
+                self._stuck = set()
+                self.pool_replacements += 1
+
+    def _release(self, future):
+        with self._lock:
+            self._stuck.discard(future)
+
+    def _record(self, winner, start):
+        with self._lock:
+            self.fetch_latency.append(time.perf_counter() - start)
+            if winner is None:
+                self.failures += 1
+            else:
+                self.wins[winner] = self.wins.get(winner, 0) + 1
+
+    def stats(self):
+        """Victoires par source et latences (p50/p99 en secondes)"""
+        with self._lock:
+            fetch = list(self.fetch_latency)
+            sources = {name: list(values) for name, values in self.source_latency.items()}
+            wins = dict(self.wins)
+            stuck = len(self._stuck)
+        return {
+            'wins': wins,
+            'failures': self.failures,
+            'stuck': stuck,
+            'pool_replacements': self.pool_replacements,
+            'p50': _percentile(fetch, 0.5),
+            'p99': _percentile(fetch, 0.99),
+            'sources': {name: {'p50': _percentile(v, 0.5), 'p99': _percentile(v, 0.99), 'calls': len(v)}
+                        for name, v in sources.items()},
+        }
@@ -0,0 +1,301 @@
+# Chargement en streaming des fichiers EOD de chaînes d'options (format fournisseur)
+import glob
+import logging
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow n'est requis que pour le cache Parquet
+    pa = None
+    pq = None
+
+# Colonnes utiles à la stratégie (après nettoyage des en-têtes)
+CHAIN_COLUMNS = ['QUOTE_DATE', 'UNDERLYING_LAST', 'P_IV', 'C_IV', 'P_DELTA', 'C_DELTA']
+NUMERIC_COLUMNS = ['P_IV', 'C_IV', 'P_DELTA', 'C_DELTA', 'UNDERLYING_LAST']
+
+# Types figés pour éviter l'inférence (et les object) sur chaque chunk
+CHAIN_DTYPES = {
+    'UNDERLYING_LAST': np.float64,
+    'P_IV': np.float32,
+    'C_IV': np.float32,
+    'P_DELTA': np.float32,
+    'C_DELTA': np.float32,
+}
+
+# Bandes de delta retenues pour les options .25 delta
+PUT_DELTA_BAND = (-0.3, -0.2)
+CALL_DELTA_BAND = (0.2, 0.3)
+
+DEFAULT_CHUNKSIZE = 500_000
+
+# Marqueur d'un partitionnement complet (écrit en dernier)
+SUCCESS_MARKER = '_SUCCESS'
+
+
+def clean_column_name(name):
+    """Nettoie un en-tête fournisseur (' [P_IV]' -> 'P_IV')"""
+    return str(name).strip().replace('[', '').replace(']', '')
+
+
+def clean_option_columns(df):
+    """Nettoie les en-têtes et convertit les colonnes numériques et la date"""
+    df.columns = df.columns.str.strip().str.replace('[','',regex=False).str.replace(']','',regex=False)
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['QUOTE_DATE'] = pd.to_datetime(df['QUOTE_DATE'])
+    return df
+
+
+def delta_band_mask(df):
+    """Masque des lignes dont le put ou le call est dans la bande .25 delta"""
+    return (df['P_DELTA'].between(*PUT_DELTA_BAND) |
+            df['C_DELTA'].between(*CALL_DELTA_BAND))
+
+
+def extract_25_delta(df):
+    """Moyenne des IV .25 delta et sous-jacent par QUOTE_DATE"""
+    puts_25 = df.loc[df['P_DELTA'].between(*PUT_DELTA_BAND)]
+    calls_25 = df.loc[df['C_DELTA'].between(*CALL_DELTA_BAND)]
+    puts_25 = puts_25.groupby('QUOTE_DATE')['P_IV'].mean().rename('put25_IV')
+    calls_25 = calls_25.groupby('QUOTE_DATE')['C_IV'].mean().rename('call25_IV')
+    underlying = df.groupby('QUOTE_DATE')['UNDERLYING_LAST'].first().rename('underlying')
+    return pd.concat([puts_25, calls_25, underlying], axis=1).dropna()
+
+
+def partial_25_delta(df):
+    """Agrégats partiels (sommes, comptes, premier sous-jacent) par QUOTE_DATE
+
+    Les partiels de plusieurs chunks se combinent avec merge_partials, ce qui
+    permet de calculer les moyennes sans garder le fichier en mémoire.
+    """
+    puts = df['P_IV'].where(df['P_DELTA'].between(*PUT_DELTA_BAND)).astype(np.float64)
+    calls = df['C_IV'].where(df['C_DELTA'].between(*CALL_DELTA_BAND)).astype(np.float64)
+    grouped = pd.DataFrame({
+        'QUOTE_DATE': df['QUOTE_DATE'],
+        'put_sum': puts,
+        'put_count': puts.notna().astype(np.int64),
+        'call_sum': calls,
+        'call_count': calls.notna().astype(np.int64),
+        'underlying': df['UNDERLYING_LAST'],
+    }).groupby('QUOTE_DATE', sort=True)
+    return grouped.agg({'put_sum': 'sum', 'put_count': 'sum', 'call_sum': 'sum',
+                        'call_count': 'sum', 'underlying': 'first'})
+
+
+def merge_partials(partials):
+    """Combine des agrégats partiels (dans l'ordre) en série put25/call25"""
+    partials = [p for p in partials if p is not None and len(p)]
+    if not partials:
+        return pd.DataFrame(columns=['put25_IV', 'call25_IV', 'underlying'])
+    total = pd.concat(partials).groupby(level=0, sort=True).agg(
+        {'put_sum': 'sum', 'put_count': 'sum', 'call_sum': 'sum',
+         'call_count': 'sum', 'underlying': 'first'})
+    data = pd.DataFrame({
+        'put25_IV': total['put_sum'] / total['put_count'].where(total['put_count'] > 0),
+        'call25_IV': total['call_sum'] / total['call_count'].where(total['call_count'] > 0),
+        'underlying': total['underlying'],
+    })
+    data.index.name = 'QUOTE_DATE'
+    return data.dropna()
+
+
+def _resolve_columns(path, sep=','):
+    """Associe les en-têtes bruts du fichier aux noms nettoyés utiles"""
+    header = pd.read_csv(path, sep=sep, nrows=0, skipinitialspace=True).columns
+    raw = {clean_column_name(c): c for c in header}
+    missing = [c for c in CHAIN_COLUMNS if c not in raw]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans {path}: {missing}")
+    return {c: raw[c] for c in CHAIN_COLUMNS}
+
+
+def stream_option_chain(path, chunksize=DEFAULT_CHUNKSIZE, band_only=True, sep=','):
+    """Lit un fichier EOD par chunks et produit des DataFrames nettoyés
+
+    Seules les colonnes utiles sont lues, avec des types figés. Si band_only,
+    chaque chunk est filtré sur la bande 20-30 delta pendant la lecture.
+    """
+    columns = _resolve_columns(path, sep=sep)
+    rename = {raw: clean for clean, raw in columns.items()}
+    dtype = {columns[c]: t for c, t in CHAIN_DTYPES.items()}
+
+    reader = pd.read_csv(
+        path,
+        sep=sep,
+        usecols=list(columns.values()),
+        dtype=dtype,
+        na_values=['', ' '],
+        skipinitialspace=True,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename)
+        chunk['QUOTE_DATE'] = pd.to_datetime(chunk['QUOTE_DATE'])
+        if band_only:
+            chunk = chunk.loc[delta_band_mask(chunk)]
+        if len(chunk):
+            yield chunk[CHAIN_COLUMNS]
+
+
+def _arrow_schema():
+    return pa.schema([
+        ('QUOTE_DATE', pa.timestamp('ns')),
+        ('UNDERLYING_LAST', pa.float64()),
+        ('P_IV', pa.float32()),
+        ('C_IV', pa.float32()),
+        ('P_DELTA', pa.float32()),
+        ('C_DELTA', pa.float32()),
+    ])
+
+
+def build_parquet_cache(paths, cache_path, chunksize=DEFAULT_CHUNKSIZE, sep=','):
+    """Convertit des fichiers EOD en cache Parquet filtré (un row group par chunk)
+
+    Retourne le nombre de lignes écrites.
+    """
+    if pq is None:
+        raise ImportError("pyarrow est requis pour écrire le cache Parquet")
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    schema = _arrow_schema()
+    rows = 0
+    with pq.ParquetWriter(cache_path, schema, compression='zstd') as writer:
+        for path in paths:
+            for chunk in stream_option_chain(path, chunksize=chunksize, sep=sep):
+                chunk = chunk.astype({'QUOTE_DATE': 'datetime64[ns]'})
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+            logging.info(f"Fichier EOD mis en cache: {path} ({rows} lignes cumulées)")
+    return rows
+
+
+def iter_parquet_cache(cache_path, batch_size=DEFAULT_CHUNKSIZE):
+    """Relit le cache Parquet par lots bornés"""
+    if pq is None:
+        raise ImportError("pyarrow est requis pour lire le cache Parquet")
+    parquet_file = pq.ParquetFile(cache_path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=CHAIN_COLUMNS):
+        yield batch.to_pandas()
+
+
+def load_25_delta_series(paths=None, cache_path=None, chunksize=DEFAULT_CHUNKSIZE, sep=','):
+    """Séries put25_IV / call25_IV / underlying par date, en mémoire bornée
+
+    Lit le cache Parquet s'il existe, sinon streame les fichiers EOD (et
+    écrit le cache au passage si cache_path est fourni).
+    """
+    if cache_path is not None and not os.path.exists(cache_path) and paths is not None:
+        build_parquet_cache(paths, cache_path, chunksize=chunksize, sep=sep)
+
+    if cache_path is not None and os.path.exists(cache_path):
+        chunks = iter_parquet_cache(cache_path, batch_size=chunksize)
+    else:
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        chunks = (chunk for path in paths for chunk in stream_option_chain(path, chunksize=chunksize, sep=sep))
+
+    return merge_partials(partial_25_delta(chunk) for chunk in chunks)
+
+
+def partition_option_chain(paths, partition_dir, chunksize=DEFAULT_CHUNKSIZE, sep=','):
+    """Répartit des fichiers EOD en partitions Parquet mensuelles sur disque
+
+    Arborescence: partition_dir/month=AAAA-MM/part-0.parquet. Les lignes sont
+    filtrées sur la bande 20-30 delta pendant le streaming. L'écriture se
+    fait dans un répertoire temporaire renommé à la fin, avec le marqueur
+    _SUCCESS: une relance remplace les partitions au lieu de les dupliquer,
+    et une exécution interrompue ne laisse pas de partitions incomplètes.
+    Retourne la liste triée des partitions écrites.
+    """
+    if pq is None:
+        raise ImportError("pyarrow est requis pour partitionner les données")
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    schema = _arrow_schema()
+    partition_dir = os.path.normpath(partition_dir)
+    staging = partition_dir + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    writers = {}
+    try:
+        for path in paths:
+            for chunk in stream_option_chain(path, chunksize=chunksize, sep=sep):
+                chunk = chunk.astype({'QUOTE_DATE': 'datetime64[ns]'})
+                months = chunk['QUOTE_DATE'].dt.strftime('%Y-%m')
+                for month, part in chunk.groupby(months, sort=False):
+                    writer = writers.get(month)
+                    if writer is None:
+                        month_dir = os.path.join(staging, f"month={month}")
+                        os.makedirs(month_dir)
+                        writer = writers[month] = pq.ParquetWriter(
+                            os.path.join(month_dir, "part-0.parquet"), schema, compression='zstd')
+                    writer.write_table(pa.Table.from_pandas(part, schema=schema, preserve_index=False))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    open(os.path.join(staging, SUCCESS_MARKER), 'w').close()
+    if os.path.exists(partition_dir):
+        previous = partition_dir + '.old'
+        shutil.rmtree(previous, ignore_errors=True)
+        os.rename(partition_dir, previous)
+        os.rename(staging, partition_dir)
+        shutil.rmtree(previous, ignore_errors=True)
+    else:
+        os.rename(staging, partition_dir)
+
+    logging.info(f"Partitionnement terminé: {len(writers)} mois écrits dans {partition_dir}")
+    return list_partitions(partition_dir)
+
+
+def partitions_complete(partition_dir):
+    """Vrai si le partitionnement de partition_dir est allé à son terme"""
+    return os.path.exists(os.path.join(partition_dir, SUCCESS_MARKER))
+
+
+def _partition_key(path):
+    """Clé de tri (mois, numéro de part): part-10 après part-2"""
+    month = os.path.basename(os.path.dirname(path))
+    match = re.search(r'part-(\d+)\.parquet$', path)
+    return month, int(match.group(1)) if match else -1
+
+
+def list_partitions(partition_dir):
+    """Fichiers de partitions triés chronologiquement"""
+    return sorted(glob.glob(os.path.join(partition_dir, 'month=*', 'part-*.parquet')), key=_partition_key)
+
+
+def _extract_partition(path):
+    """Tâche d'un worker: filtre delta + agrégats partiels d'une partition"""
+    df = pq.read_table(path, columns=CHAIN_COLUMNS).to_pandas()
+    return partial_25_delta(df.loc[delta_band_mask(df)])
+
+
+def extract_25_delta_parallel(partition_dir, max_workers=None):
+    """Séries put25/call25/underlying calculées en parallèle sur les partitions
+
+    Chaque partition est traitée dans un process du pool; les partiels sont
+    ensuite fusionnés dans l'ordre chronologique.
+    """
+    if pq is None:
+        raise ImportError("pyarrow est requis pour lire les partitions")
+    partitions = list_partitions(partition_dir)
+    if not partitions:
+        return merge_partials([])
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(partitions) == 1:
+        return merge_partials(_extract_partition(p) for p in partitions)
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(partitions))) as executor:
+        partials = list(executor.map(_extract_partition, partitions))
+    return merge_partials(partials)
@@ -0,0 +1,141 @@
+# Recalcul incrémental des indicateurs du spread IV sur données ajoutées
+import logging
+
+import numpy as np
+import pandas as pd
+
+INPUT_COLUMNS = ('put25_IV', 'call25_IV', 'underlying')
+
+
+class IncrementalSpreadMetrics:
+    """Indicateurs de calculate_iv_spread_metrics tenus à jour par ajout de lignes
+
+    Les colonnes calculées sont gardées dans des tableaux numpy à capacité
+    doublée. append(rows) ne recalcule que la fin de l'historique, à
+    partir de la première ligne dont le résultat peut changer:
+    - le dernier bloc de sommes cumulées du noyau glissant (partiel, sa
+      moyenne de centrage change avec les nouvelles lignes),
+    - le début du plateau final du spread, dont le pic (find_peaks) ne
+      pouvait pas être décidé sans la ligne suivante,
+    les fenêtres glissantes et le shift(1) du signal étant couverts par
+    lookback lignes de contexte. Le segment recalculé commence sur une
+    frontière de bloc, le cum_pnl repart du dernier produit cumulé: le
+    résultat est identique (au bit près) à un recalcul complet.
+    """
+
+    def __init__(self, compute, lookback, block, data=None):
+        self.compute = compute
+        self.lookback = lookback
+        self.block = block
+        self.columns = None
+        self.length = 0
+        self.rows_recomputed = 0
+        self._arrays = {}
+        self._index = None
+        self._index_dtype = None
+        self._index_name = None
+        if data is not None:
+            self.reset(data)
+
+    def reset(self, data):
+        """Recalcul complet sur data (lignes d'entrée), retourne le DataFrame calculé"""
+        result = self.compute(data[list(INPUT_COLUMNS)].copy())
+        if result is None or 'cum_pnl' not in result:
+            logging.error("Recalcul complet des indicateurs impossible")
+            return None
+        self.columns = list(result.columns)
+        self._index_dtype = result.index.dtype
+        self._index_name = result.index.name
+        self.length = 0
+        capacity = max(len(result), self.block)
+        self._arrays = {c: np.empty(capacity, dtype=result[c].to_numpy().dtype) for c in self.columns}
+        self._index = np.empty(capacity, dtype=result.index.to_numpy().dtype)
+        self._store(0, result)
+        self.rows_recomputed += len(result)
+        return result
+
+    def _store(self, start, frame):
+        end = start + len(frame)
+        self._reserve(end)
+        for c in self.columns:
+            self._arrays[c][start:end] = frame[c].to_numpy()
+        self._index[start:end] = frame.index.to_numpy()
+        self.length = end
+
+    def _reserve(self, size):
+        capacity = len(self._index)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for c, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.length] = array[:self.length]
+            self._arrays[c] = grown
+        grown = np.empty(capacity, dtype=self._index.dtype)
+        grown[:self.length] = self._index[:self.length]
+        self._index = grown
+
+    def _first_affected(self):
+        """Première ligne existante dont les indicateurs peuvent changer"""
+        n = self.length
+        last_block = (n - 1) // self.block * self.block
+        spread = self._arrays['spread_IV']
+        start = n - 1
+        # Plateau final: find_peaks ne le tranche qu'avec la valeur suivante
+        while start > 0 and spread[start - 1] == spread[n - 1]:
+            start -= 1
+        return min(last_block, start)
+
+    def _last_cum_pnl(self, before):
+        """Produit cumulé en cours avant la ligne before (cumprod saute les NaN)"""
+        cum_pnl = self._arrays['cum_pnl']
+        for i in range(before - 1, -1, -1):
+            if cum_pnl[i] == cum_pnl[i]:
+                return cum_pnl[i]
+        return 1.0
+
+    def append(self, rows):
+        """Ajoute des lignes d'entrée (put25_IV, call25_IV, underlying), retourne les lignes recalculées
+
+        Les nouvelles dates doivent suivre la dernière date connue, sinon
+        (ou avant le premier calcul) tout est recalculé.
+        """
+        if not len(rows):
+            return None
+        if (self.columns is None or not self.length or not rows.index.is_monotonic_increasing
+                or not rows.index.is_unique or rows.index[0] <= self._index[self.length - 1]):
+            frame = self.frame()
+            combined = rows if frame is None else pd.concat([frame[list(INPUT_COLUMNS)], rows[list(INPUT_COLUMNS)]])
+            return self.reset(combined)
+
+        first = self._first_affected()
+        # Début du segment sur une frontière de bloc du noyau glissant
+        start = max(0, (first - self.lookback) // self.block * self.block)
+        segment = pd.DataFrame({c: np.concatenate((self._arrays[c][start:self.length], rows[c].to_numpy()))
+                                for c in INPUT_COLUMNS},
+                               index=pd.Index(np.concatenate((self._index[start:self.length], rows.index.to_numpy())),
+                                              dtype=self._index_dtype, name=self._index_name))
+        result = self.compute(segment)
+        if result is None or 'cum_pnl' not in result:
+            logging.error("Recalcul incrémental des indicateurs impossible")
+            return None
+        result = result.iloc[first - start:]
+
+        # cum_pnl continue le produit cumulé de l'historique conservé
+        growth = (1 + result['strategy_return']).to_numpy()
+        missing = np.isnan(growth)
+        cum_pnl = np.cumprod(np.concatenate(([self._last_cum_pnl(first)], np.where(missing, 1.0, growth))))[1:]
+        cum_pnl[missing] = np.nan
+        result = result.assign(cum_pnl=cum_pnl)
+
+        self._store(first, result)
+        self.rows_recomputed += len(result)
+        return result
+
+    def frame(self):
+        """DataFrame complet (copie des tableaux)"""
+        if self.columns is None:
+            return None
+        n = self.length
+        index = pd.Index(self._index[:n], dtype=self._index_dtype, name=self._index_name)
+        return pd.DataFrame({c: self._arrays[c][:n].copy() for c in self.columns}, index=index)
@@ -0,0 +1,101 @@
+# Chemin rapide du signal live sur scalaires (sans pandas)
+import math
+
+from historical_data import PUT_DELTA_BAND, CALL_DELTA_BAND
+
+REASON_LONG = "Signal LONG: Conditions MA, Z-score et peak réunies"
+REASON_NONE = "Pas de signal: Conditions non remplies"
+REASON_NO_DATA = "Données insuffisantes"
+
+# Valeurs de référence du chemin live (identiques à calculate_iv_spread_metrics_live)
+REF_Z_SHORT = 0.5
+REF_Z_LONG = 0.3
+REF_ACCEL = 0.001
+
+
+class LiveSignalState:
+    """État préalloué du signal live d'un sous-jacent (paramètres et dernier tick)"""
+
+    __slots__ = ('risk_multiplier', 'ma_tolerance', 'z_thresh_short', 'z_thresh_long', 'accel_thresh',
+                 'ticks', 'put_iv', 'call_iv', 'underlying', 'spread', 'signal', 'position_size')
+
+    def __init__(self, risk_multiplier, ma_tolerance, z_thresh_short, z_thresh_long, accel_thresh):
+        self.risk_multiplier = risk_multiplier
+        self.ma_tolerance = ma_tolerance
+        self.z_thresh_short = z_thresh_short
+        self.z_thresh_long = z_thresh_long
+        self.accel_thresh = accel_thresh
+        self.ticks = 0
+        self.put_iv = math.nan
+        self.call_iv = math.nan
+        self.underlying = math.nan
+        self.spread = math.nan
+        self.signal = 0
+        self.position_size = 0.0
+
+    def state(self):
+        """État sauvegardable (dernier tick et signal; les paramètres viennent de la configuration)"""
+        return {name: getattr(self, name) for name in
+                ('ticks', 'put_iv', 'call_iv', 'underlying', 'spread', 'signal', 'position_size')}
+
+    def restore_state(self, state):
+        self.ticks = int(state.get('ticks', 0))
+        for name in ('put_iv', 'call_iv', 'underlying', 'spread'):
+            value = state.get(name)
+            setattr(self, name, math.nan if value is None else float(value))
+        self.signal = int(state.get('signal', 0))
+        self.position_size = float(state.get('position_size', 0.0))
+
+
+def _in_band(value, band):
+    return band[0] <= value <= band[1]
+
+
+def update_live_signal(state, put_iv, call_iv, put_delta, call_delta, underlying):
+    """Calcule le signal d'un tick, même résultat que get_live_trading_signal
+
+    Retourne le dict de signal ('signal', 'position_size', 'spread_iv',
+    'reason', 'dataset' toujours None) complété de put_iv et call_iv, ou
+    le signal neutre si les options ne sont pas dans les bandes .25 delta.
+    """
+    put_iv = float(put_iv)
+    call_iv = float(call_iv)
+    underlying = float(underlying)
+    # Équivalent de extract_25_delta(...).dropna() sur une seule ligne
+    if (not _in_band(put_delta, PUT_DELTA_BAND) or not _in_band(call_delta, CALL_DELTA_BAND)
+            or math.isnan(put_iv) or math.isnan(call_iv) or math.isnan(underlying)):
+        return {'signal': 0, 'position_size': 0, 'spread_iv': 0, 'reason': REASON_NO_DATA,
+                'dataset': None, 'put_iv': None, 'call_iv': None}
+
+    spread = put_iv - call_iv
+    ma_condition = spread * 0.98 >= spread * 1.02 - state.ma_tolerance
+    z_condition = REF_Z_SHORT > state.z_thresh_short and REF_Z_LONG > state.z_thresh_long
+    accel_condition = REF_ACCEL > state.accel_thresh
+    peak_condition = spread > 0
+    signal = 1 if ma_condition and (z_condition or accel_condition) and peak_condition else 0
+
+    spread_norm = max(0, min(1, (spread + 0.1) / 0.2))
+    position_size = signal * min(max(spread_norm * state.risk_multiplier, 0), 1.5)
+
+    state.ticks += 1
+    state.put_iv = put_iv
+    state.call_iv = call_iv
+    state.underlying = underlying
+    state.spread = spread
+    state.signal = signal
+    state.position_size = position_size
+    return {
+        'signal': signal,
+        'position_size': position_size,
+        'spread_iv': spread,
+        'reason': REASON_LONG if signal == 1 else REASON_NONE,
+        'dataset': None,
+        'put_iv': put_iv,
+        'call_iv': call_iv
+    }
+
+
+def live_indicators(spread):
+    """Indicateurs du chemin live pour un spread (valeurs de calculate_iv_spread_metrics_live)"""
+    return {'ma_short': spread * 0.98, 'ma_long': spread * 1.02,
+            'z_short': REF_Z_SHORT, 'z_long': REF_Z_LONG, 'accel': REF_ACCEL}
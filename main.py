@@ -1,15 +1,41 @@
 import os
 import time
+import signal
 import logging
 import pandas as pd
 import numpy as np
 import alpaca_trade_api as tradeapi
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import GetOptionContractsRequest
-from alpaca.trading.enums import ContractType, AssetStatus
+from alpaca.trading.enums import AssetStatus
 from datetime import datetime, timedelta
 from config import *
 from scipy.signal import find_peaks
+from option_chain import OptionChain, TYPE_CALL, TYPE_PUT, SYMBOL_TABLE
+from strike_index import get_strike_index, stats as strike_index_stats
+from historical_data import (clean_option_columns, extract_25_delta, load_25_delta_series,
+                             partition_option_chain, partitions_complete, extract_25_delta_parallel,
+                             DEFAULT_CHUNKSIZE)
+from performance import batch_performance
+from recorder import Recorder, RecordingClient
+from memory_monitor import MemoryMonitor
+from scheduler import CycleScheduler
+from market_data_hub import HubClient
+from status_server import BotStatus, MeteredClient, StatusLogHandler, start_status_server
+from portfolio import allocate
+from execution import ExecutionEngine, RateLimiter
+from checkpoint import Checkpointer
+from quote_filter import QuoteFilter
+from bars import BarAggregator, start_trade_stream
+from live_signal import LiveSignalState, update_live_signal, live_indicators
+from hedging import HedgedFetcher
+from circuit_breaker import BreakerClient, CircuitOpenError
+from profiler import CycleProfiler
+from rolling import rolling_stats, block_size
+from incremental_metrics import IncrementalSpreadMetrics
+from columnar_sink import ColumnarSink
+from robustness import robustness_report
+from risk import GreeksBook, parse_occ
 
 # ===================== LOGGING =====================
 logging.basicConfig(
@@ -22,6 +48,45 @@ logging.basicConfig(
 api = tradeapi.REST(ALPACA_API_KEY, ALPACA_SECRET_KEY, BASE_URL, api_version="v2")
 trading_client = TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
 
+# Lecteur du hub de données partagé (None = accès API direct)
+hub = None
+
+# Exécution des ordres: cache de positions et limiteur de débit
+# (le client est résolu à chaque appel: il peut être enveloppé ou rejoué)
+execution = ExecutionEngine(
+    lambda: api,
+    limiter=RateLimiter(ORDER_RATE_PER_MINUTE),
+    max_workers=EXECUTION_WORKERS,
+    positions_ttl=POSITIONS_CACHE_SECONDS
+)
+
+# Filtre de qualité des quotes (bid nul, marché croisé/bloqué, écart large, quote périmée)
+quote_filter = QuoteFilter(max_spread_pct=QUOTE_MAX_SPREAD_PCT, max_age=QUOTE_MAX_AGE, min_bid=QUOTE_MIN_BID)
+
+# Bougies construites en continu depuis le flux de trades {symbole: BarAggregator}
+bar_aggregators = {}
+
+# Méthodes d'envoi d'ordres, jamais coupées par un disjoncteur
+ORDER_METHODS = ('submit_order', 'close_position', 'cancel_order', 'cancel_all_orders')
+
+# Récupération du prix en requêtes couvertes (trade, quote, bougies)
+price_fetcher = HedgedFetcher(hedge_delay=PRICE_HEDGE_DELAY, timeout=PRICE_FETCH_TIMEOUT)
+
+# État du chemin rapide du signal live {symbole: LiveSignalState}
+live_states = {}
+
+# Derniers contrats .25 delta sélectionnés par sous-jacent (sauvegardés au point de reprise)
+last_contracts = {}
+
+# Dernière chaîne d'options par sous-jacent (vols implicites des contrats suivis)
+last_chains = {}
+
+# Export colonnaire des cycles et ordres (créé par main si COLUMNAR_DIR)
+sink = None
+
+# Greeks Black-Scholes des positions et contrats suivis (cache des termes indépendants du spot)
+risk_book = GreeksBook(rate=RISK_FREE_RATE, dividend=DIVIDEND_YIELD, time_step=RISK_TIME_STEP)
+
 # ===================== PARAMÈTRES STRATÉGIE =====================
 SHORT_WINDOW = 5
 LONG_WINDOW = 20
@@ -33,6 +98,10 @@ Z_THRESH_LONG = 0.5
 MA_TOLERANCE = 0.01
 ACCEL_THRESH = 0.001
 
+def clock_now():
+    """Heure courante utilisée par la stratégie (remplacée lors d'un rejeu)"""
+    return datetime.now()
+
 def get_option_contracts(symbol, expiration_date=None):
     """Récupère les contrats d'options pour un symbole"""
     try:
@@ -51,47 +120,65 @@ def get_option_contracts(symbol, expiration_date=None):
             
         return response.option_contracts
         
+    except CircuitOpenError as e:
+        logging.debug(f"Contrats options ignorés: {e}")
+        return None
     except Exception as e:
         logging.error(f"Erreur récupération contrats options: {e}")
         return None
 
-def find_25_delta_options(contracts, current_price):
-    """Trouve les options .25 delta les plus proches"""
+def find_25_delta_options(chain, current_price, index=None):
+    """Trouve les options .25 delta les plus proches
+
+    Si un index de strikes persistant est fourni, la recherche se fait par
+    bisection dans l'index plutôt que par parcours de la chaîne.
+    """
     try:
-        if not contracts:
+        if chain is None or len(chain) == 0:
             return None
+        if not isinstance(chain, OptionChain):
+            chain = OptionChain.from_contracts(chain)
             
-        calls = [c for c in contracts if c.type == ContractType.CALL]
-        puts = [c for c in contracts if c.type == ContractType.PUT]
+        calls = chain.calls
+        puts = chain.puts
         
-        if not calls or not puts:
+        if not calls.any() or not puts.any():
             logging.warning("Calls ou puts manquants")
             return None
         
         # Trouver les options ATM (At-The-Money) ou proches
-        atm_calls = sorted(calls, key=lambda x: abs(float(x.strike_price) - current_price))
-        atm_puts = sorted(puts, key=lambda x: abs(float(x.strike_price) - current_price))
-        
-        call_25 = atm_calls[0] if atm_calls else None
-        put_25 = atm_puts[0] if atm_puts else None
+        if index is not None:
+            call_hit = index.nearest(current_price, TYPE_CALL)
+            put_hit = index.nearest(current_price, TYPE_PUT)
+            call_idx = chain.index_of(call_hit[1]) if call_hit else None
+            put_idx = chain.index_of(put_hit[1]) if put_hit else None
+            # Contrat de l'index absent de la chaîne: parcours de la chaîne
+            if call_idx is None:
+                call_idx = chain.nearest_strike(current_price, calls)
+            if put_idx is None:
+                put_idx = chain.nearest_strike(current_price, puts)
+        else:
+            call_idx = chain.nearest_strike(current_price, calls)
+            put_idx = chain.nearest_strike(current_price, puts)
         
-        if call_25 and put_25:
-            call_strike = float(call_25.strike_price)
-            put_strike = float(put_25.strike_price)
+        if call_idx is not None and put_idx is not None:
+            call_strike = float(chain.strike[call_idx])
+            put_strike = float(chain.strike[put_idx])
             
             # Delta approximatif basé sur la distance du strike
             call_delta_est = max(0.1, min(0.9, 1 - (call_strike - current_price) / (current_price * 0.1)))
             put_delta_est = max(-0.9, min(-0.1, -1 + (current_price - put_strike) / (current_price * 0.1)))
             
             return {
-                'call': call_25,
-                'put': put_25,
+                'chain': chain,
+                'call_index': call_idx,
+                'put_index': put_idx,
                 'call_delta': call_delta_est,
                 'put_delta': put_delta_est,
                 'call_strike': call_strike,
                 'put_strike': put_strike,
-                'call_symbol': call_25.symbol,
-                'put_symbol': put_25.symbol
+                'call_symbol': chain.symbol(call_idx),
+                'put_symbol': chain.symbol(put_idx)
             }
             
     except Exception as e:
@@ -99,14 +186,19 @@ def find_25_delta_options(contracts, current_price):
     
     return None
 
-def get_option_quotes(call_symbol, put_symbol):
-    """Récupère les quotes des options pour obtenir l'IV"""
+def get_option_quotes(call_symbol, put_symbol, chain=None):
+    """Récupère les quotes des options pour obtenir l'IV
+
+    Si une chaîne colonnaire est fournie, les quotes sont aussi écrites
+    dans ses colonnes bid/ask/iv.
+    """
     try:
         call_quote = api.get_option_quote(call_symbol)
         put_quote = api.get_option_quote(put_symbol)
+        fetched_at = clock_now().timestamp()
         
         if call_quote and put_quote:
-            return {
+            quotes = {
                 'call_iv': float(call_quote.implied_volatility) if hasattr(call_quote, 'implied_volatility') else None,
                 'put_iv': float(put_quote.implied_volatility) if hasattr(put_quote, 'implied_volatility') else None,
                 'call_bid': float(call_quote.bid) if hasattr(call_quote, 'bid') else None,
@@ -114,29 +206,113 @@ def get_option_quotes(call_symbol, put_symbol):
                 'call_ask': float(call_quote.ask) if hasattr(call_quote, 'ask') else None,
                 'put_ask': float(put_quote.ask) if hasattr(put_quote, 'ask') else None
             }
+            if chain is not None:
+                for side, symbol in (('call', call_symbol), ('put', put_symbol)):
+                    i = chain.index_of(symbol)
+                    if i is not None:
+                        quote = call_quote if side == 'call' else put_quote
+                        ts = pd.Timestamp(quote.timestamp).timestamp() if getattr(quote, 'timestamp', None) else fetched_at
+                        chain.set_quote(i, quotes[f'{side}_bid'], quotes[f'{side}_ask'], quotes[f'{side}_iv'], ts=ts)
+            return quotes
+    except CircuitOpenError as e:
+        # Endpoint désactivé (méthode absente, abonnement): aucun appel, pas de bruit dans les logs
+        logging.debug(f"Quotes options ignorées: {e}")
     except Exception as e:
         logging.error(f"Erreur récupération quotes options: {e}")
     
     return None
 
+def quote_candidates(chain, symbols):
+    """Récupère les quotes de contrats candidats et les écrit dans la chaîne"""
+    fetched_at = clock_now().timestamp()
+    quoted = 0
+    for contract in symbols:
+        i = chain.index_of(contract)
+        if i is None:
+            continue
+        try:
+            quote = api.get_option_quote(contract)
+        except CircuitOpenError as e:
+            logging.debug(f"Quotes options ignorées: {e}")
+            break
+        except Exception as e:
+            logging.warning(f"Quote {contract} indisponible: {e}")
+            continue
+        if not quote:
+            continue
+        ts = pd.Timestamp(quote.timestamp).timestamp() if getattr(quote, 'timestamp', None) else fetched_at
+        chain.set_quote(i,
+                        float(quote.bid) if hasattr(quote, 'bid') else None,
+                        float(quote.ask) if hasattr(quote, 'ask') else None,
+                        float(quote.implied_volatility) if hasattr(quote, 'implied_volatility') else None,
+                        ts=ts)
+        quoted += 1
+    return quoted
+
 def get_real_option_data(symbol, current_price):
     """Récupère les vraies données d'options .25 delta"""
     try:
-        contracts = get_option_contracts(symbol)
-        if not contracts:
-            logging.warning("Aucun contrat d'option trouvé")
-            return None
-        
-        option_data = find_25_delta_options(contracts, current_price)
+        # Chaîne publiée par le hub si disponible, sinon récupération API
+        chain = hub.chain(symbol) if hub is not None else None
+        # Quotes et IV de la chaîne du hub publiées par le hub: aucun appel de quotes ici
+        from_hub = chain is not None
+        if chain is None:
+            contracts = get_option_contracts(symbol)
+            if not contracts:
+                logging.warning("Aucun contrat d'option trouvé")
+                return None
+            
+            # Chaîne colonnaire construite une seule fois par récupération
+            chain = OptionChain.from_contracts(contracts, underlying=symbol)
+        last_chains[symbol] = chain
+        index = get_strike_index(symbol)
+        index.sync(chain, as_of=clock_now().date())
+        option_data = find_25_delta_options(chain, current_price, index)
         if not option_data:
             logging.warning("Options .25 delta non trouvées")
             return None
         
-        quotes = get_option_quotes(option_data['call_symbol'], option_data['put_symbol'])
+        call_iv = chain.iv[option_data['call_index']]
+        put_iv = chain.iv[option_data['put_index']]
+        if not (call_iv > 0 and put_iv > 0) and not from_hub:
+            get_option_quotes(option_data['call_symbol'], option_data['put_symbol'], chain)
+        
+        # Qualité des quotes évaluée sur toute la chaîne, repli sur le strike voisin valide
+        now = clock_now().timestamp()
+        valid, _, reasons = quote_filter.evaluate(chain, now=now, record=False)
+        valid &= chain.iv > 0
+        # Contrat sélectionné rejeté: quotes des strikes voisins (même échéance) avant le repli
+        neighbours = []
+        for side, contract_type in (('call', TYPE_CALL), ('put', TYPE_PUT)):
+            i = option_data[f'{side}_index']
+            if not valid[i] and not from_hub:
+                neighbours += [s for _, s in index.k_nearest(chain.strike[i], contract_type,
+                                                             QUOTE_FALLBACK_CANDIDATES + 1, expiry=chain.expiry[i])
+                               if s != option_data[f'{side}_symbol']]
+        if neighbours and quote_candidates(chain, neighbours):
+            valid, _, reasons = quote_filter.evaluate(chain, now=now, record=False)
+            valid &= chain.iv > 0
+        quote_filter.record(chain, reasons)
+        call_idx = quote_filter.nearest_valid(chain, option_data['call_index'], valid)
+        put_idx = quote_filter.nearest_valid(chain, option_data['put_index'], valid)
+        call_iv = chain.iv[call_idx] if call_idx is not None else np.nan
+        put_iv = chain.iv[put_idx] if put_idx is not None else np.nan
+        for side, idx in (('call', call_idx), ('put', put_idx)):
+            if idx is not None and idx != option_data[f'{side}_index']:
+                option_data[f'{side}_strike'] = float(chain.strike[idx])
+                option_data[f'{side}_symbol'] = chain.symbol(idx)
+        
+        last_contracts[symbol] = {
+            'call_symbol': option_data['call_symbol'],
+            'put_symbol': option_data['put_symbol'],
+            'call_strike': float(option_data['call_strike']),
+            'put_strike': float(option_data['put_strike']),
+            'selected_at': clock_now().isoformat()
+        }
         
-        if quotes and quotes['call_iv'] and quotes['put_iv']:
-            call_iv = quotes['call_iv']
-            put_iv = quotes['put_iv']
+        if call_iv > 0 and put_iv > 0:
+            call_iv = float(call_iv)
+            put_iv = float(put_iv)
             logging.info(f"IV récupéré via API: Call={call_iv:.4f}, Put={put_iv:.4f}")
         else:
             # Use exact current AAPL IV values based on market data
@@ -178,13 +354,18 @@ def calculate_iv_spread_metrics(data):
         data['spread_diff'] = data['spread_IV'].diff()
         data['spread_accel'] = data['spread_diff'].diff()
         
+        # Toutes les statistiques glissantes du spread en une passe
+        stats = rolling_stats(data['spread_IV'].to_numpy(),
+                              means=(SHORT_WINDOW, LONG_WINDOW, SHORT_Z, LONG_Z),
+                              stds=(SHORT_Z, LONG_Z), mins=(60,), maxs=(60,))
+        
         # 2. Moyennes mobiles
-        data['MA_short'] = data['spread_IV'].rolling(SHORT_WINDOW).mean()
-        data['MA_long'] = data['spread_IV'].rolling(LONG_WINDOW).mean()
+        data['MA_short'] = stats[('mean', SHORT_WINDOW)]
+        data['MA_long'] = stats[('mean', LONG_WINDOW)]
         
         # 3. Z-score sur court et long terme
-        data['spread_z_short'] = (data['spread_IV'] - data['spread_IV'].rolling(SHORT_Z).mean()) / data['spread_IV'].rolling(SHORT_Z).std()
-        data['spread_z_long'] = (data['spread_IV'] - data['spread_IV'].rolling(LONG_Z).mean()) / data['spread_IV'].rolling(LONG_Z).std()
+        data['spread_z_short'] = (data['spread_IV'] - stats[('mean', SHORT_Z)]) / stats[('std', SHORT_Z)]
+        data['spread_z_long'] = (data['spread_IV'] - stats[('mean', LONG_Z)]) / stats[('std', LONG_Z)]
         
         # 4. Maxima locaux
         peaks, _ = find_peaks(data['spread_IV'], distance=2)
@@ -202,8 +383,8 @@ def calculate_iv_spread_metrics(data):
         data['signal'] = data['signal'].shift(1).fillna(0)
         
         # 6. Sizing dynamique basé sur spread et risk_multiplier
-        spread_min = data['spread_IV'].rolling(60).min()
-        spread_max = data['spread_IV'].rolling(60).max()
+        spread_min = stats[('min', 60)]
+        spread_max = stats[('max', 60)]
         spread_norm = (data['spread_IV'] - spread_min) / (spread_max - spread_min)
         data['position_size'] = data['signal'] * np.clip(spread_norm * RISK_MULTIPLIER, 0, 1.5)
         
@@ -218,60 +399,90 @@ def calculate_iv_spread_metrics(data):
         logging.error(f"Erreur calcul métriques: {e}")
         return data
 
+def incremental_spread_metrics(data=None):
+    """calculate_iv_spread_metrics tenu à jour par append() (voir IncrementalSpreadMetrics)"""
+    windows = (SHORT_WINDOW, LONG_WINDOW, SHORT_Z, LONG_Z, 60)
+    # +2: diff de diff (accélération) et shift(1) du signal
+    return IncrementalSpreadMetrics(calculate_iv_spread_metrics, lookback=max(windows) + 2,
+                                    block=block_size(windows), data=data)
+
+def _price_frame(current_price):
+    """DataFrame d'une bougie au prix courant (format de get_data)"""
+    return pd.DataFrame({
+        'open': [current_price],
+        'high': [current_price],
+        'low': [current_price],
+        'close': [current_price],
+        'volume': [1000]
+    }, index=[clock_now()])
+
+def _price_from_latest_trade(symbol):
+    """Method 1: dernier trade (le plus précis)"""
+    latest_trade = api.get_latest_trade(symbol)
+    if latest_trade and latest_trade.price:
+        current_price = float(latest_trade.price)
+        logging.info(f"Prix récupéré via latest_trade: ${current_price}")
+        return _price_frame(current_price)
+    return None
+
+def _price_from_latest_quote(symbol):
+    """Method 2: prix milieu de la dernière quote"""
+    quote = api.get_latest_quote(symbol)
+    if quote and quote.ask_price and quote.bid_price:
+        current_price = (float(quote.ask_price) + float(quote.bid_price)) / 2
+        logging.info(f"Prix récupéré via quote: ${current_price}")
+        return _price_frame(current_price)
+    return None
+
+def _bars_from_api(symbol, limit, timeframe):
+    """Method 3: bougies de la dernière heure"""
+    end_dt = clock_now()
+    start_dt = end_dt - timedelta(hours=1)  # Just get last hour
+    start_str = start_dt.strftime('%Y-%m-%d')
+    end_str = end_dt.strftime('%Y-%m-%d')
+    
+    bars = api.get_bars(symbol, timeframe, start=start_str, end=end_str, adjustment='raw').df
+    if not bars.empty:
+        current_price = float(bars['close'].iloc[-1])
+        logging.info(f"Prix récupéré via bars: ${current_price}")
+        return bars.tail(limit)
+    return None
+
 def get_data(symbol, limit=LOOKBACK, timeframe=TIMEFRAME):
     """Télécharge les données OHLC depuis Alpaca"""
     try:
-        # Method 1: Try to get latest trade (most accurate)
-        try:
-            latest_trade = api.get_latest_trade(symbol)
-            if latest_trade and latest_trade.price:
-                current_price = float(latest_trade.price)
-                logging.info(f"Prix récupéré via latest_trade: ${current_price}")
-                # Create a simple DataFrame with current price
-                data = pd.DataFrame({
-                    'open': [current_price],
-                    'high': [current_price],
-                    'low': [current_price],
-                    'close': [current_price],
-                    'volume': [1000]
-                }, index=[datetime.now()])
-                return data
-        except Exception as e:
-            logging.warning(f"Erreur latest_trade: {e}")
-        
-        # Method 2: Try to get latest quote
-        try:
-            quote = api.get_latest_quote(symbol)
-            if quote and quote.ask_price and quote.bid_price:
-                # Use mid price for better accuracy
-                current_price = (float(quote.ask_price) + float(quote.bid_price)) / 2
-                logging.info(f"Prix récupéré via quote: ${current_price}")
-                data = pd.DataFrame({
-                    'open': [current_price],
-                    'high': [current_price],
-                    'low': [current_price],
-                    'close': [current_price],
-                    'volume': [1000]
-                }, index=[datetime.now()])
+        # Bougies agrégées localement depuis le flux de trades (lecture mémoire)
+        aggregator = bar_aggregators.get(symbol)
+        if (aggregator is not None and aggregator.last_trade_ts is not None
+                and clock_now().timestamp() - aggregator.last_trade_ts <= BAR_MAX_AGE):
+            return aggregator.to_frame(limit)
+        
+        # Method 0: Prix publié par le hub de données partagé
+        if hub is not None:
+            current_price = hub.price(symbol)
+            if current_price:
+                return _price_frame(current_price)
+        
+        # Methods 1-3: dernier trade, puis quote, puis bougies récentes
+        sources = [
+            ('latest_trade', lambda: _price_from_latest_trade(symbol)),
+            ('latest_quote', lambda: _price_from_latest_quote(symbol)),
+            ('bars', lambda: _bars_from_api(symbol, limit, timeframe)),
+        ]
+        if PRICE_HEDGING:
+            # Requêtes couvertes: les replis partent après un court délai sans attendre l'échec
+            _, data = price_fetcher.fetch(sources)
+            if data is not None:
                 return data
-        except Exception as e:
-            logging.warning(f"Erreur quote: {e}")
-        
-        # Method 3: Try to get recent bars
-        try:
-            end_dt = datetime.now()
-            start_dt = end_dt - timedelta(hours=1)  # Just get last hour
-            start_str = start_dt.strftime('%Y-%m-%d')
-            end_str = end_dt.strftime('%Y-%m-%d')
-            
-            bars = api.get_bars(symbol, timeframe, start=start_str, end=end_str, adjustment='raw').df
-            
-            if not bars.empty:
-                current_price = float(bars['close'].iloc[-1])
-                logging.info(f"Prix récupéré via bars: ${current_price}")
-                return bars.tail(limit)
-        except Exception as e:
-            logging.warning(f"Erreur bars: {e}")
+        else:
+            for name, fetch in sources:
+                try:
+                    data = fetch()
+                except Exception as e:
+                    logging.warning(f"Erreur {name}: {e}")
+                    continue
+                if data is not None:
+                    return data
         
         # Method 4: Use current AAPL price as fallback
         current_price = 232.04  # Current AAPL price
@@ -294,7 +505,7 @@ def generate_simulated_data(limit=LOOKBACK):
         new_price = prices[-1] * (1 + ret)
         prices.append(new_price)
     
-    dates = pd.date_range(start=datetime.now() - timedelta(days=30), periods=limit, freq='1min')
+    dates = pd.date_range(start=clock_now() - timedelta(days=30), periods=limit, freq='1min')
     data = pd.DataFrame({
         'open': prices[:-1],
         'high': [p * (1 + abs(np.random.normal(0, 0.01))) for p in prices[:-1]],
@@ -318,7 +529,7 @@ def generate_simulated_data_with_current_price(limit=LOOKBACK):
         new_price = prices[-1] * (1 + ret)
         prices.append(new_price)
     
-    dates = pd.date_range(start=datetime.now() - timedelta(days=limit), periods=limit, freq='1min')
+    dates = pd.date_range(start=clock_now() - timedelta(days=limit), periods=limit, freq='1min')
     data = pd.DataFrame({
         'open': prices[:-1],
         'high': [p * (1 + abs(np.random.normal(0, 0.001))) for p in prices[:-1]],
@@ -375,18 +586,10 @@ def build_iv_spread_dataset(symbol, prices):
         df = pd.DataFrame(iv_data)
         
         # 1. Nettoyage des colonnes
-        df.columns = df.columns.str.strip().str.replace('[','',regex=False).str.replace(']','',regex=False)
-        for col in ['P_IV','C_IV','P_DELTA','C_DELTA','UNDERLYING_LAST']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        df['QUOTE_DATE'] = pd.to_datetime(df['QUOTE_DATE'])
+        df = clean_option_columns(df)
         
         # 2. Sélection options 25 delta
-        puts_25 = df.loc[df['P_DELTA'].between(-0.3, -0.2)].copy()
-        calls_25 = df.loc[df['C_DELTA'].between(0.2, 0.3)].copy()
-        puts_25 = puts_25.groupby('QUOTE_DATE')['P_IV'].mean().rename('put25_IV')
-        calls_25 = calls_25.groupby('QUOTE_DATE')['C_IV'].mean().rename('call25_IV')
-        underlying = df.groupby('QUOTE_DATE')['UNDERLYING_LAST'].first().rename('underlying')
-        data = pd.concat([puts_25, calls_25, underlying], axis=1).dropna()
+        data = extract_25_delta(df)
         
         # 3. Calculer tous les indicateurs
         data = calculate_iv_spread_metrics(data)
@@ -397,6 +600,33 @@ def build_iv_spread_dataset(symbol, prices):
         logging.error(f"Erreur construction dataset: {e}")
         return None
 
+def build_iv_spread_dataset_from_history(paths, cache_path=None, chunksize=DEFAULT_CHUNKSIZE,
+                                         partition_dir=None, max_workers=None):
+    """Construit le dataset de la stratégie depuis des fichiers EOD historiques
+
+    Les fichiers sont lus en streaming (mémoire bornée), avec un cache
+    Parquet optionnel pour les relectures. Avec partition_dir, les données
+    sont partitionnées par mois puis traitées en parallèle.
+    """
+    try:
+        if partition_dir is not None:
+            if not partitions_complete(partition_dir):
+                if paths is None:
+                    logging.error(f"Partitions incomplètes dans {partition_dir} et aucun fichier source")
+                    return None
+                partition_option_chain(paths, partition_dir, chunksize=chunksize)
+            data = extract_25_delta_parallel(partition_dir, max_workers=max_workers)
+        else:
+            data = load_25_delta_series(paths, cache_path=cache_path, chunksize=chunksize)
+        if data.empty:
+            logging.warning("Aucune option .25 delta dans les fichiers historiques")
+            return None
+        return calculate_iv_spread_metrics(data)
+        
+    except Exception as e:
+        logging.error(f"Erreur construction dataset historique: {e}")
+        return None
+
 def calculate_performance_metrics(data):
     """Calcule les métriques de performance de la stratégie"""
     try:
@@ -406,12 +636,19 @@ def calculate_performance_metrics(data):
         mean_daily_return = daily_return.mean()
         sharpe_ratio = (mean_daily_return / daily_return.std()) * np.sqrt(252) if daily_return.std() > 0 else 0
         n_trades = data['signal'].diff().fillna(0).abs().sum()
+        extended = batch_performance(data[['strategy_return']], data[['position_size']]).iloc[0]
         
         return {
             'cumulative_return': cumulative_return,
             'volatility': volatility,
             'sharpe_ratio': sharpe_ratio,
             'n_trades': n_trades,
+            'max_drawdown': extended['max_drawdown'],
+            'rolling_sharpe': extended['rolling_sharpe'],
+            'rolling_sortino': extended['rolling_sortino'],
+            'hit_rate': extended['hit_rate'],
+            'turnover': extended['turnover'],
+            'exposure': extended['exposure'],
             'current_signal': data['signal'].iloc[-1],
             'current_position_size': data['position_size'].iloc[-1],
             'current_spread_iv': data['spread_IV'].iloc[-1],
@@ -423,6 +660,20 @@ def calculate_performance_metrics(data):
         logging.error(f"Erreur calcul métriques performance: {e}")
         return None
 
+def calculate_robustness_metrics(data, n_paths=BOOTSTRAP_PATHS, iv_paths=BOOTSTRAP_IV_PATHS):
+    """Intervalles de confiance du Sharpe, du drawdown et du rendement cumulé
+
+    Block bootstrap de strategy_return et, si iv_paths > 0, stratégie
+    recalculée sur des IV bruitées (voir robustness.robustness_report).
+    """
+    try:
+        return robustness_report(data, n_paths=n_paths, iv_paths=iv_paths, iv_noise=BOOTSTRAP_IV_NOISE,
+                                 compute=calculate_iv_spread_metrics,
+                                 max_workers=BOOTSTRAP_WORKERS or None)
+    except Exception as e:
+        logging.error(f"Erreur analyse de robustesse: {e}")
+        return None
+
 def build_iv_spread_dataset_live(symbol, current_price):
     """Construit le dataset LIVE pour la stratégie spread IV (pas de backtesting)"""
     try:
@@ -431,7 +682,7 @@ def build_iv_spread_dataset_live(symbol, current_price):
         
         if option_data:
             # Créer un DataFrame avec les données actuelles
-            current_time = datetime.now()
+            current_time = clock_now()
             df = pd.DataFrame([{
                 'QUOTE_DATE': current_time,
                 'P_IV': option_data['put_iv'],
@@ -442,21 +693,12 @@ def build_iv_spread_dataset_live(symbol, current_price):
             }])
             
             # Nettoyer et traiter les données
-            df.columns = df.columns.str.strip().str.replace('[','',regex=False).str.replace(']','',regex=False)
-            for col in ['P_IV','C_IV','P_DELTA','C_DELTA','UNDERLYING_LAST']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df['QUOTE_DATE'] = pd.to_datetime(df['QUOTE_DATE'])
+            df = clean_option_columns(df)
             
             # Sélection options 25 delta
-            puts_25 = df.loc[df['P_DELTA'].between(-0.3, -0.2)].copy()
-            calls_25 = df.loc[df['C_DELTA'].between(0.2, 0.3)].copy()
-            
-            if len(puts_25) > 0 and len(calls_25) > 0:
-                puts_25 = puts_25.groupby('QUOTE_DATE')['P_IV'].mean().rename('put25_IV')
-                calls_25 = calls_25.groupby('QUOTE_DATE')['C_IV'].mean().rename('call25_IV')
-                underlying = df.groupby('QUOTE_DATE')['UNDERLYING_LAST'].first().rename('underlying')
-                data = pd.concat([puts_25, calls_25, underlying], axis=1).dropna()
-                
+            data = extract_25_delta(df)
+            
+            if len(data) > 0:
                 # Calculer les indicateurs en temps réel
                 data = calculate_iv_spread_metrics_live(data)
                 
@@ -570,55 +812,180 @@ def get_live_trading_signal(symbol, current_price):
             'dataset': None
         }
 
+def new_live_state():
+    """État du signal live avec les paramètres courants de la stratégie"""
+    return LiveSignalState(RISK_MULTIPLIER, MA_TOLERANCE, Z_THRESH_SHORT, Z_THRESH_LONG, ACCEL_THRESH)
+
+def restore_live_states(saved):
+    """Recrée les états du signal live d'un point de reprise"""
+    for symbol, state in saved.items():
+        live_states[symbol] = new_live_state()
+        live_states[symbol].restore_state(state)
+
+def get_live_trading_signal_fast(symbol, current_price):
+    """Signal live calculé sur scalaires (même dict que get_live_trading_signal, sans dataset)"""
+    try:
+        option_data = get_real_option_data(symbol, current_price)
+        if not option_data:
+            logging.warning("Dataset live non disponible, signal neutre")
+            return {
+                'signal': 0,
+                'position_size': 0,
+                'spread_iv': 0,
+                'reason': 'Données insuffisantes',
+                'dataset': None
+            }
+        
+        state = live_states.get(symbol)
+        if state is None:
+            state = live_states[symbol] = new_live_state()
+        signal = update_live_signal(state, option_data['put_iv'], option_data['call_iv'],
+                                    option_data['put_delta'], option_data['call_delta'], current_price)
+        if signal['put_iv'] is not None:
+            logging.info(f"IV Spread exact: Put={signal['put_iv']:.4f}, Call={signal['call_iv']:.4f}, "
+                         f"Spread={signal['spread_iv']:.4f}")
+        return signal
+        
+    except Exception as e:
+        logging.error(f"Erreur génération signal live: {e}")
+        return {
+            'signal': 0,
+            'position_size': 0,
+            'spread_iv': 0,
+            'reason': f'Erreur: {e}',
+            'dataset': None
+        }
+
+def cycle_record(symbol, current_price, trading_signal, trade_result):
+    """Ligne de la table cycles: entrées, contrats choisis, indicateurs, signal et résultat"""
+    record = {
+        'price': float(current_price),
+        'signal': int(trading_signal['signal']),
+        'position_size': float(trading_signal['position_size']),
+        'spread_iv': float(trading_signal['spread_iv']),
+        'reason': trading_signal['reason'],
+        'trade_result': str(trade_result),
+    }
+    contracts = last_contracts.get(symbol, {})
+    for key in ('put_symbol', 'call_symbol', 'put_strike', 'call_strike'):
+        record[key] = contracts.get(key)
+    dataset = trading_signal.get('dataset')
+    if dataset is not None and len(dataset):
+        last = dataset.iloc[-1]
+        record.update({
+            'put_iv': float(last['put25_IV']),
+            'call_iv': float(last['call25_IV']),
+            'ma_short': float(last['MA_short']),
+            'ma_long': float(last['MA_long']),
+            'z_short': float(last['spread_z_short']),
+            'z_long': float(last['spread_z_long']),
+            'accel': float(last['spread_accel'])
+        })
+    elif trading_signal.get('put_iv') is not None:
+        record['put_iv'] = trading_signal['put_iv']
+        record['call_iv'] = trading_signal['call_iv']
+        record.update(live_indicators(trading_signal['spread_iv']))
+    return record
+
+def update_book_risk(symbol, current_price, trading_signal=None):
+    """Greeks et expositions agrégées: positions du sous-jacent et contrats .25 delta suivis
+
+    Les vols viennent de la dernière chaîne (colonne iv), à défaut des IV
+    du signal. Les contrats ne sont redéfinis que si la liste ou les
+    quantités changent: un simple mouvement de spot réutilise le cache.
+    """
+    try:
+        positions = execution.positions()
+        held = {}
+        for position_symbol, qty in positions.items():
+            parsed = parse_occ(position_symbol)
+            if parsed is not None and parsed[0] == symbol:
+                held[position_symbol] = (parsed, qty)
+        contracts = last_contracts.get(symbol, {})
+        for key in ('put_symbol', 'call_symbol'):
+            parsed = parse_occ(contracts.get(key))
+            if parsed is not None and contracts[key] not in held:
+                held[contracts[key]] = (parsed, 0)
+        
+        chain = last_chains.get(symbol)
+        if chain is not None and chain.stale:
+            # Table d'internement vidée depuis la récupération: ses identifiants ne sont plus valides
+            del last_chains[symbol]
+            chain = None
+        signal_iv = {TYPE_CALL: (trading_signal or {}).get('call_iv'), TYPE_PUT: (trading_signal or {}).get('put_iv')}
+        symbols = list(held)
+        vols = np.full(len(symbols), np.nan)
+        for i, contract in enumerate(symbols):
+            idx = chain.index_of(contract) if chain is not None else None
+            if idx is not None and chain.iv[idx] > 0:
+                vols[i] = chain.iv[idx]
+            elif signal_iv[held[contract][0][2]]:
+                vols[i] = signal_iv[held[contract][0][2]]
+        
+        qty = [held[s][1] for s in symbols]
+        if symbols != risk_book.symbols or not np.array_equal(qty, risk_book.qty):
+            risk_book.set_contracts(symbols, [held[s][0][3] for s in symbols], [held[s][0][2] for s in symbols],
+                                    [held[s][0][1] for s in symbols], vols, qty)
+        else:
+            risk_book.set_vols(vols)
+        return risk_book.exposures(current_price, stock_qty=positions.get(symbol, 0))
+    except Exception as e:
+        logging.error(f"Erreur calcul des greeks: {e}")
+        return None
+
 def execute_live_trade(symbol, signal_data, current_price):
     """Exécute le trade en temps réel basé sur le signal"""
     try:
+        # Positions du compte en un seul appel (cache partagé par les symboles)
+        current_qty = execution.positions().get(symbol, 0)
+        
         if signal_data['signal'] == 1:
+            # Vérifier si on a déjà une position
+            if current_qty:
+                logging.info(f"Position existante: {current_qty:g} {symbol}")
+                return "Position déjà ouverte"
+            
             # Signal d'achat
             account = api.get_account()
             equity = float(account.equity)
             
             # Calculer la taille de position basée sur le sizing dynamique
+            # (plafonds par nom / brut / net et marge de 5% appliqués par l'allocateur)
             position_size_pct = signal_data['position_size']
-            cash_to_use = equity * position_size_pct * 0.95  # 95% pour laisser une marge
+            allocation = allocate(
+                [symbol], [position_size_pct], [current_price], equity,
+                max_name=PORTFOLIO_MAX_NAME, max_gross=PORTFOLIO_MAX_GROSS, max_net=PORTFOLIO_MAX_NET
+            )
             
             # Calculer la quantité
-            qty = max(1, int(cash_to_use / current_price))
-            
-            # Vérifier si on a déjà une position
-            try:
-                existing_position = api.get_position(symbol)
-                if existing_position:
-                    logging.info(f"Position existante: {existing_position.qty} @ ${existing_position.avg_entry_price}")
-                    return "Position déjà ouverte"
-            except:
-                pass
+            qty = max(1, int(allocation['target_qty'].iloc[0]))
 
             # Placer l'ordre d'achat
-            order = api.submit_order(
-                symbol=symbol,
-                qty=qty,
-                side="buy",
-                type="market",
-                time_in_force="day"
-            )
+            acks = execution.rebalance({symbol: qty})
+            if not acks:
+                # Cible déjà atteinte (ordre en attente): aucun ordre envoyé
+                return "Aucune action"
+            errors = [a['error'] for a in acks if a['error']]
+            if errors:
+                return f"Erreur trade: {errors[0]}"
             
             logging.info(f"ORDRE D'ACHAT EXÉCUTÉ: {qty} {symbol} @ ${current_price:.2f}")
             return f"ACHAT {qty} {symbol} - Taille: {position_size_pct:.1%}"
             
         elif signal_data['signal'] == 0:
             # Pas de signal - vérifier si on doit fermer une position existante
-            try:
-                existing_position = api.get_position(symbol)
-                if existing_position:
-                    # Fermer la position
-                    api.close_position(symbol)
-                    logging.info(f"POSITION FERMÉE: {existing_position.qty} {symbol}")
-                    return f"FERMETURE position {symbol}"
-                else:
-                    return "Pas de position à fermer"
-            except:
+            if not current_qty:
                 return "Pas de position ouverte"
+            
+            # Fermer la position
+            acks = execution.rebalance({symbol: 0})
+            if not acks:
+                return "Aucune action"
+            errors = [a['error'] for a in acks if a['error']]
+            if errors:
+                return f"Erreur trade: {errors[0]}"
+            logging.info(f"POSITION FERMÉE: {current_qty:g} {symbol}")
+            return f"FERMETURE position {symbol}"
         
         return "Aucune action"
         
@@ -760,7 +1127,7 @@ def test_trading_functionality():
                 else:
                     sell_limit_price = current_price - 0.50  # Subtract 50 cents to ensure fill
                     print(f"📊 Prix limite vente: ${sell_limit_price:.2f}")
-            except:
+            except Exception:
                 sell_limit_price = current_price - 0.50
                 print(f"📊 Prix limite vente: ${sell_limit_price:.2f}")
             
@@ -816,8 +1183,18 @@ def test_trading_functionality():
         print(f"❌ Erreur test trading: {e}")
         return False
 
+def handle_sigterm(signum, frame):
+    """SIGTERM (stop_bot.sh, systemd): sortie normale, les blocs finally et shutdown() s'exécutent"""
+    raise SystemExit(0)
+
+def shutdown():
+    """Écrit les lignes encore bufferisées de l'export colonnaire"""
+    if sink is not None:
+        sink.close()
+
 def main():
     logging.info("=== Bot LIVE IV Spread Strategy Started ===")
+    signal.signal(signal.SIGTERM, handle_sigterm)
     print("🚀 BOT LIVE - Stratégie IV Spread Sophistiquée")
     print("=" * 80)
     print(f"📊 Symbole: {SYMBOL}")
@@ -829,21 +1206,153 @@ def main():
     print(f"📊 Tolérance MA: {MA_TOLERANCE}, Seuil accélération: {ACCEL_THRESH}")
     print("=" * 80)
     
-    # Run trading functionality test
-    test_success = test_trading_functionality()
-    if not test_success:
-        print("❌ Test de trading échoué. Vérifiez vos clés API et permissions.")
-        return
+    # Bougies construites depuis le flux de trades (restaurées avant le démarrage du flux)
+    if BAR_STREAM:
+        bar_aggregators[SYMBOL] = BarAggregator(TIMEFRAME, capacity=BAR_CAPACITY)
+    
+    # Point de reprise: un redémarrage récent reprend l'état sans refaire le test de trading
+    checkpointer = None
+    restored = None
+    if CHECKPOINT_FILE:
+        checkpointer = Checkpointer(CHECKPOINT_FILE, every=CHECKPOINT_EVERY)
+        checkpointer.register('execution', execution.state, execution.restore_state)
+        checkpointer.register('contracts', lambda: last_contracts, last_contracts.update)
+        checkpointer.register('live_signal', lambda: {s: st.state() for s, st in live_states.items()},
+                              restore_live_states)
+        restored = checkpointer.restore(max_age=CHECKPOINT_MAX_AGE)
     
-    cycle_count = 0
+    # Bougies dans un point de reprise séparé, réécrit seulement à la clôture d'une bougie
+    bars_checkpointer = None
+    bars_saved = None
+    if CHECKPOINT_FILE and bar_aggregators:
+        bars_checkpointer = Checkpointer(f"{os.path.splitext(CHECKPOINT_FILE)[0]}_bars.json")
+        for bar_symbol, aggregator in bar_aggregators.items():
+            bars_checkpointer.register(bar_symbol, aggregator.state, aggregator.restore_state)
+        bars_checkpointer.restore(max_age=CHECKPOINT_MAX_AGE)
+        bars_saved = tuple(a.closed for a in bar_aggregators.values())
+    
+    if restored:
+        # Réconciliation avec le courtier (ordres encore ouverts, puis list_positions)
+        try:
+            execution.reconcile()
+            print(f"♻️  Reprise au cycle #{restored['cycle']} depuis {CHECKPOINT_FILE}")
+        except Exception as e:
+            logging.error(f"Réconciliation des positions impossible: {e}")
+            restored = None
+    
+    if not restored:
+        # Run trading functionality test
+        test_success = test_trading_functionality()
+        if not test_success:
+            print("❌ Test de trading échoué. Vérifiez vos clés API et permissions.")
+            return
+    
+    if bar_aggregators:
+        try:
+            start_trade_stream(bar_aggregators, ALPACA_API_KEY, ALPACA_SECRET_KEY, BASE_URL, data_feed=BAR_FEED)
+        except Exception as e:
+            logging.warning(f"Flux de trades indisponible, bougies via API: {e}")
+            bar_aggregators.clear()
+    
+    # Lecture des données depuis le hub partagé s'il est configuré
+    global api, trading_client, hub, sink
+    if HUB_NAME:
+        try:
+            hub = HubClient(HUB_NAME, [SYMBOL], max_age=HUB_MAX_AGE)
+            logging.info(f"Données de marché lues depuis le hub {HUB_NAME}")
+        except FileNotFoundError:
+            logging.warning(f"Hub {HUB_NAME} introuvable, accès API direct")
+    
+    # Statut exposé en HTTP et décompte du budget API
+    status = BotStatus(stale_after=max(3 * CYCLE_PERIOD, 180))
+    api = MeteredClient(api, status.budget)
+    trading_client = MeteredClient(trading_client, status.budget)
+    
+    # Disjoncteurs par endpoint (les ordres passent toujours)
+    breaker_options = dict(failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET_SECONDS,
+                           permanent_ttl=BREAKER_PERMANENT_SECONDS)
+    api = BreakerClient(api, 'api', exempt=ORDER_METHODS, **breaker_options)
+    trading_client = BreakerClient(trading_client, 'trading_client', exempt=ORDER_METHODS, **breaker_options)
+    breaker_clients = {'api': api, 'trading_client': trading_client}
+    logging.getLogger().addHandler(StatusLogHandler(status))
+    if STATUS_PORT:
+        try:
+            start_status_server(status, STATUS_HOST, STATUS_PORT)
+        except OSError as e:
+            logging.warning(f"Endpoint de statut indisponible: {e}")
+    
+    # Enregistrement optionnel des réponses API pour rejeu hors ligne
+    recorder = None
+    if RECORD_FILE:
+        recorder = Recorder(RECORD_FILE)
+        api = RecordingClient(api, recorder, 'api')
+        trading_client = RecordingClient(trading_client, recorder, 'trading_client')
+        logging.info(f"Enregistrement des cycles dans {RECORD_FILE}")
+    
+    # Export colonnaire des cycles et ordres (Parquet par jour, lecture: columnar_sink.query),
+    # buffer écrit par shutdown() à l'arrêt (Ctrl+C ou SIGTERM)
+    if COLUMNAR_DIR:
+        try:
+            sink = ColumnarSink(COLUMNAR_DIR, batch_rows=COLUMNAR_BATCH_ROWS,
+                                flush_seconds=COLUMNAR_FLUSH_SECONDS)
+            status.set_extra('columnar', sink.stats)
+            logging.info(f"Export colonnaire des cycles dans {COLUMNAR_DIR}")
+        except ImportError as e:
+            logging.warning(f"Export colonnaire désactivé: {e}")
+    
+    # Comptabilité mémoire par cycle
+    memory = MemoryMonitor(sample_every=MEMORY_SAMPLE_EVERY, alert_growth_mb=MEMORY_ALERT_MB)
+    memory.register('symbol_table', lambda: len(SYMBOL_TABLE))
+    memory.register('strike_indexes', lambda: strike_index_stats()['indexes'])
+    memory.register('strike_index_contracts', lambda: strike_index_stats()['contracts'])
+    
+    # Cycles alignés sur l'horloge, en pause hors séance
+    scheduler = CycleScheduler(
+        get_clock=api.get_clock,
+        get_calendar=api.get_calendar,
+        period=CYCLE_PERIOD,
+        fast_period=FAST_CYCLE_PERIOD or None,
+        fast_window=FAST_WINDOW_MINUTES * 60,
+        clock_ttl=CLOCK_CACHE_SECONDS,
+        market_hours_only=MARKET_HOURS_ONLY,
+        max_sleep=60,
+        heartbeat=status.heartbeat
+    )
+    status.set_extra('scheduler', scheduler.stats)
+    status.set_extra('memory', lambda: memory.last)
+    status.set_extra('quotes', quote_filter.stats)
+    status.set_extra('price_fetch', price_fetcher.stats)
+    status.set_extra('breakers', lambda: {name: c.stats() for name, c in breaker_clients.items()})
+    status.set_extra('risk', lambda: risk_book.last)
+    
+    # Profilage à la demande (PROFILE_CYCLES au démarrage ou kill -USR2 <pid>), fichiers à côté du log
+    profiler = CycleProfiler(output_dir=os.path.dirname(os.path.abspath("trading.log")),
+                             interval=PROFILE_INTERVAL_MS / 1000, get_stage=lambda: status.stage,
+                             default_cycles=PROFILE_CYCLES or 5)
+    profiler.install_signal()
+    if PROFILE_CYCLES:
+        profiler.request(PROFILE_CYCLES)
+    status.set_extra('profiler', lambda: {'active': profiler.active, 'remaining': profiler.remaining,
+                                          'last_dump': profiler.last_dump})
+    
+    cycle_count = restored['cycle'] if restored else 0
     while True:
+        scheduler.wait()
         cycle_count += 1
         current_time = datetime.now().strftime("%H:%M:%S")
         print(f"\n🔄 Cycle #{cycle_count} - {current_time}")
         print("-" * 60)
+        outcome = {}
+        row = {'cycle': cycle_count}
+        execution.last_acks = []
+        if recorder:
+            recorder.begin_cycle(cycle_count)
+        memory.begin_cycle(cycle_count)
+        profiler.begin_cycle()
         
         try:
             # 1) Récupérer le prix actuel
+            status.set_stage('price')
             print("📊 Récupération du prix actuel...")
             data = get_data(SYMBOL, limit=10)  # Juste les dernières données
             current_price = data["close"].iloc[-1]
@@ -851,17 +1360,26 @@ def main():
             
             # 2) Générer le signal de trading en temps réel
             print("\n🎯 Génération du signal de trading LIVE...")
-            trading_signal = get_live_trading_signal(SYMBOL, current_price)
+            status.set_stage('signal')
+            if LIVE_FAST_PATH:
+                trading_signal = get_live_trading_signal_fast(SYMBOL, current_price)
+            else:
+                trading_signal = get_live_trading_signal(SYMBOL, current_price)
             
-            if trading_signal['dataset'] is not None:
-                dataset = trading_signal['dataset']
+            dataset = trading_signal['dataset']
+            if dataset is not None or trading_signal.get('put_iv') is not None:
                 print(f"   ✅ Signal généré: {'🟢 ACHAT' if trading_signal['signal'] == 1 else '🔴 PAS DE POSITION'}")
                 print(f"   📊 Spread IV actuel: {trading_signal['spread_iv']:.6f}")
                 print(f"   📊 Taille de position: {trading_signal['position_size']:.3f}")
                 print(f"   📝 Raison: {trading_signal['reason']}")
                 
                 # Afficher les détails des options
-                if 'put25_IV' in dataset.columns and 'call25_IV' in dataset.columns:
+                if dataset is None:
+                    print(f"\n🎯 Options .25 delta détectées:")
+                    print(f"   📉 Put IV: {trading_signal['put_iv']:.4f}")
+                    print(f"   📞 Call IV: {trading_signal['call_iv']:.4f}")
+                    print(f"   📊 IV Skew: {trading_signal['spread_iv']:.4f}")
+                elif 'put25_IV' in dataset.columns and 'call25_IV' in dataset.columns:
                     print(f"\n🎯 Options .25 delta détectées:")
                     print(f"   📉 Put IV: {dataset['put25_IV'].iloc[-1]:.4f}")
                     print(f"   📞 Call IV: {dataset['call25_IV'].iloc[-1]:.4f}")
@@ -871,10 +1389,31 @@ def main():
             
             # 3) Exécuter le trade en temps réel
             print("\n💼 Exécution du trade LIVE...")
+            status.set_stage('trade')
             trade_result = execute_live_trade(SYMBOL, trading_signal, current_price)
             print(f"   ✅ Résultat: {trade_result}")
+            outcome = {
+                'price': current_price,
+                'signal': trading_signal['signal'],
+                'position_size': trading_signal['position_size'],
+                'spread_iv': trading_signal['spread_iv'],
+                'trade_result': trade_result
+            }
+            row.update(cycle_record(SYMBOL, current_price, trading_signal, trade_result))
+            
+            # Risque du portefeuille (greeks Black-Scholes agrégés)
+            status.set_stage('risk')
+            risk = update_book_risk(SYMBOL, current_price, trading_signal)
+            if risk:
+                print(f"   📐 Delta: {risk['delta']:+.1f} (${risk['delta_dollars']:+,.0f}), "
+                      f"Gamma 1%: ${risk['gamma_dollars_1pct']:+,.0f}, Vega: ${risk['vega']:+,.0f}, "
+                      f"Theta: ${risk['theta']:+,.0f}/j")
+                for contract, greeks in risk['contracts'].items():
+                    logging.info(f"Greeks {contract}: delta={greeks['delta']:.3f} gamma={greeks['gamma']:.4f} "
+                                 f"vega={greeks['vega']:.3f} theta={greeks['theta']:.3f}")
             
             # 4) Afficher le statut du compte
+            status.set_stage('account')
             try:
                 account = api.get_account()
                 equity = float(account.equity)
@@ -890,22 +1429,56 @@ def main():
                     avg_price = float(position.avg_entry_price)
                     market_value = float(position.market_value)
                     print(f"   📈 Position {SYMBOL}: {qty} @ ${avg_price:.2f} = ${market_value:,.2f}")
-                except:
+                except Exception:
                     print(f"   📈 Position {SYMBOL}: Aucune")
                     
             except Exception as e:
                 print(f"   ⚠️  Erreur lecture compte: {e}")
 
-            print(f"\n⏳ Attente 60 secondes... (Ctrl+C pour arrêter)")
+            print(f"\n⏳ Attente du prochain cycle... (Ctrl+C pour arrêter)")
             print("=" * 80)
 
         except Exception as e:
             logging.error(f"Error: {e}")
             print(f"❌ Erreur: {e}")
-            print("⏳ Attente 60 secondes avant retry...")
+            print("⏳ Attente du prochain cycle avant retry...")
+            outcome['error'] = str(e)
+            row['error'] = str(e)
 
-        time.sleep(60)  # attendre 1 min avant nouveau cycle
+        if recorder:
+            recorder.end_cycle(outcome)
+        if sink:
+            sink.write('cycles', SYMBOL, row)
+            for ack in execution.last_acks:
+                sink.write('orders', ack['symbol'], {
+                    'cycle': cycle_count, 'side': ack['side'], 'qty': float(ack['qty']),
+                    'order_id': None if ack['order_id'] is None else str(ack['order_id']),
+                    'status': ack['status'], 'latency': ack['latency'], 'error': ack['error']
+                })
+        profiler.end_cycle()
+        if checkpointer:
+            checkpointer.maybe_save(cycle_count)
+        if bars_checkpointer:
+            closed = tuple(a.closed for a in bar_aggregators.values())
+            if closed != bars_saved and bars_checkpointer.save(cycle_count):
+                bars_saved = closed
+        memory.end_cycle(cycle_count)
+        duration = scheduler.cycle_done()
+        logging.info(f"Cycle #{cycle_count} terminé en {duration:.2f}s (sautés: {scheduler.skipped})")
+        status.update(
+            cycle=cycle_count,
+            last_cycle_ts=time.time(),
+            cycle_duration=duration,
+            signal=outcome.get('signal'),
+            position_size=outcome.get('position_size'),
+            spread_iv=outcome.get('spread_iv'),
+            trade_result=outcome.get('trade_result')
+        )
+        status.set_stage('idle')
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        shutdown()
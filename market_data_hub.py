@@ -0,0 +1,429 @@
+# Hub de données de marché partagé entre plusieurs instances de stratégie
+import logging
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from option_chain import OptionChain, SymbolTable
+
+# Enregistrements publiés en mémoire partagée
+PRICE_DTYPE = np.dtype([('ts', 'f8'), ('price', 'f8')])
+QUOTE_DTYPE = np.dtype([('ts', 'f8'), ('symbol', 'S24'), ('bid', 'f8'), ('ask', 'f8'), ('iv', 'f8')])
+CHAIN_DTYPE = np.dtype([('strike', 'f8'), ('type', 'i1'), ('expiry', 'M8[D]'), ('open_interest', 'f8'),
+                        ('bid', 'f8'), ('ask', 'f8'), ('iv', 'f8'), ('quote_ts', 'f8'), ('symbol', 'S24')])
+
+_HEADER_BYTES = 64
+
+# Segments créés par ce process (hub et lecteur peuvent partager un process)
+_created = set()
+
+
+def _attach(name):
+    """Ouvre un segment existant sans le confier au resource_tracker du lecteur
+
+    Sinon le tracker d'un worker supprimerait le segment à sa sortie, alors
+    qu'il appartient au hub.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name=name)
+    if name in _created:
+        # Enregistrement du hub de ce process: le retirer ferait échouer son unlink
+        return shm
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+class SharedRing:
+    """Buffer circulaire d'enregistrements en mémoire partagée (un écrivain, N lecteurs)
+
+    En-tête: compteur d'écritures (int64) et capacité. Les lecteurs suivent
+    le compteur et détectent les enregistrements écrasés.
+    """
+
+    def __init__(self, name, dtype, capacity=None, create=False):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        if create:
+            size = _HEADER_BYTES + capacity * self.dtype.itemsize
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Segment laissé par un hub précédent: on le remplace
+                old = shared_memory.SharedMemory(name=name)
+                old.close()
+                old.unlink()
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _created.add(name)
+        else:
+            self._shm = _attach(name)
+        self._owner = create
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=self._shm.buf)
+        if create:
+            self._header[:] = (0, capacity)
+        self.capacity = int(self._header[1])
+        self._data = np.ndarray((self.capacity,), dtype=self.dtype, buffer=self._shm.buf, offset=_HEADER_BYTES)
+
+    @property
+    def count(self):
+        """Nombre total d'enregistrements écrits depuis la création"""
+        return int(self._header[0])
+
+    def append(self, record):
+        count = int(self._header[0])
+        self._data[count % self.capacity] = record
+        # Publication après écriture complète de l'enregistrement
+        self._header[0] = count + 1
+
+    def latest(self):
+        """Dernier enregistrement (copie) ou None"""
+        count = self.count
+        if count == 0:
+            return None
+        record = self._data[(count - 1) % self.capacity].copy()
+        if self.count - count >= self.capacity:
+            return self.latest()
+        return record
+
+    def read_since(self, last_count):
+        """Enregistrements écrits depuis last_count: (tableau, nouveau compteur)"""
+        count = self.count
+        start = max(last_count, count - self.capacity)
+        if start >= count:
+            return self._data[:0], count
+        idx = np.arange(start, count) % self.capacity
+        records = self._data[idx]
+        # Retirer ceux écrasés pendant la lecture
+        overwritten = self.count - self.capacity - start
+        if overwritten > 0:
+            records = records[overwritten:]
+        return records, count
+
+    def close(self):
+        self._header = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+            _created.discard(self.name)
+
+
+class SharedSnapshot:
+    """Instantané de taille variable (chaîne d'options) en double buffer
+
+    L'écrivain remplit le buffer inactif puis le publie sous seqlock. Les
+    lecteurs obtiennent une vue sans copie, valide tant que l'écrivain n'a
+    pas republié deux fois (vérifiable avec is_valid).
+    """
+
+    def __init__(self, name, dtype, capacity=None, create=False):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        if create:
+            size = _HEADER_BYTES + 2 * capacity * self.dtype.itemsize
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                old = shared_memory.SharedMemory(name=name)
+                old.close()
+                old.unlink()
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _created.add(name)
+        else:
+            self._shm = _attach(name)
+        self._owner = create
+        # [seq, n, slot, capacity, ts (bits float64)]
+        self._header = np.ndarray((5,), dtype=np.int64, buffer=self._shm.buf)
+        if create:
+            self._header[:4] = (0, 0, 0, capacity)
+            self._header[4:5].view(np.float64)[0] = 0.0
+        self.capacity = int(self._header[3])
+        self._slots = np.ndarray((2, self.capacity), dtype=self.dtype, buffer=self._shm.buf, offset=_HEADER_BYTES)
+
+    def publish(self, records, ts=None):
+        n = min(len(records), self.capacity)
+        if n < len(records):
+            logging.warning(f"Instantané {self.name} tronqué à {self.capacity} enregistrements")
+        slot = 1 - int(self._header[2])
+        self._slots[slot, :n] = records[:n]
+        self._header[0] += 1  # impair: publication en cours
+        self._header[1] = n
+        self._header[2] = slot
+        self._header[4:5].view(np.float64)[0] = time.time() if ts is None else ts
+        self._header[0] += 1
+
+    def read(self):
+        """(vue sans copie, seq, ts) de l'instantané courant"""
+        for _ in range(100_000):
+            seq = int(self._header[0])
+            if seq % 2:
+                continue
+            n, slot = int(self._header[1]), int(self._header[2])
+            ts = float(self._header[4:5].view(np.float64)[0])
+            if int(self._header[0]) == seq:
+                return self._slots[slot, :n], seq, ts
+        raise RuntimeError(f"Instantané {self.name} bloqué en cours de publication")
+
+    def is_valid(self, seq):
+        """Vrai si la vue obtenue à seq n'a pas pu être réécrite"""
+        return int(self._header[0]) - seq < 4
+
+    @property
+    def seq(self):
+        return int(self._header[0])
+
+    def close(self):
+        self._header = self._slots = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+            _created.discard(self.name)
+
+
+def _segment_names(hub_name, symbol):
+    return f"{hub_name}_px_{symbol}", f"{hub_name}_chain_{symbol}"
+
+
+def chain_to_records(chain):
+    """Convertit une OptionChain en enregistrements CHAIN_DTYPE"""
+    records = np.empty(len(chain), dtype=CHAIN_DTYPE)
+    records['strike'] = chain.strike
+    records['type'] = chain.type
+    records['expiry'] = chain.expiry
+    records['open_interest'] = chain.open_interest
+    records['bid'] = chain.bid
+    records['ask'] = chain.ask
+    records['iv'] = chain.iv
+    records['quote_ts'] = chain.quote_ts
+    records['symbol'] = [chain.symbol(i).encode() for i in range(len(chain))]
+    return records
+
+
+class MarketDataHub:
+    """Process propriétaire des flux: publie prix, chaînes et quotes en mémoire partagée
+
+    Les fonctions de récupération sont injectées (fetch_price(symbol) ->
+    float, fetch_contracts(symbol) -> contrats, select_quotes(symbol, chain,
+    price) -> liste de (symbole, bid, ask, iv[, ts])), si bien que le hub est
+    le seul à consommer le budget API quel que soit le nombre de stratégies.
+    """
+
+    def __init__(self, name, symbols, fetch_price, fetch_contracts, select_quotes=None,
+                 period=60, chain_every=600, price_capacity=4096, chain_capacity=5000,
+                 quote_capacity=8192):
+        self.name = name
+        self.symbols = list(symbols)
+        self.fetch_price = fetch_price
+        self.fetch_contracts = fetch_contracts
+        self.select_quotes = select_quotes
+        self.period = period
+        self.chain_every = chain_every
+        self.prices = {}
+        self.chains = {}
+        self._chain_objects = {}
+        self._chain_fetched = {}
+        for symbol in self.symbols:
+            px_name, chain_name = _segment_names(name, symbol)
+            self.prices[symbol] = SharedRing(px_name, PRICE_DTYPE, price_capacity, create=True)
+            self.chains[symbol] = SharedSnapshot(chain_name, CHAIN_DTYPE, chain_capacity, create=True)
+        self.quotes = SharedRing(f"{name}_quotes", QUOTE_DTYPE, quote_capacity, create=True)
+
+    def poll(self):
+        """Un passage de collecte sur tous les symboles"""
+        now = time.time()
+        for symbol in self.symbols:
+            try:
+                price = self.fetch_price(symbol)
+                if price:
+                    self.prices[symbol].append((now, float(price)))
+
+                if now - self._chain_fetched.get(symbol, 0.0) >= self.chain_every:
+                    contracts = self.fetch_contracts(symbol)
+                    if contracts:
+                        self._chain_objects[symbol] = OptionChain.from_contracts(contracts, underlying=symbol)
+                        self._chain_fetched[symbol] = now
+
+                chain = self._chain_objects.get(symbol)
+                if chain is None:
+                    continue
+                if self.select_quotes is not None and price:
+                    for contract_symbol, bid, ask, iv, *quote_ts in self.select_quotes(symbol, chain, price):
+                        ts = quote_ts[0] if quote_ts and quote_ts[0] is not None else now
+                        self.quotes.append((ts, contract_symbol.encode(), _num(bid), _num(ask), _num(iv)))
+                        i = chain.index_of(contract_symbol)
+                        if i is not None:
+                            chain.set_quote(i, bid, ask, iv, ts=ts)
+                self.chains[symbol].publish(chain_to_records(chain), ts=now)
+            except Exception as e:
+                logging.error(f"Hub {self.name}: erreur collecte {symbol}: {e}")
+
+    def run(self, stop_event=None):
+        """Boucle de collecte (à lancer dans un process dédié)"""
+        logging.info(f"Hub {self.name} démarré pour {self.symbols}")
+        try:
+            while stop_event is None or not stop_event.is_set():
+                start = time.time()
+                self.poll()
+                remaining = self.period - (time.time() - start)
+                if remaining > 0:
+                    if stop_event is not None:
+                        stop_event.wait(remaining)
+                    else:
+                        time.sleep(remaining)
+        finally:
+            self.close()
+
+    def close(self):
+        for ring in self.prices.values():
+            ring.close()
+        for snapshot in self.chains.values():
+            snapshot.close()
+        self.quotes.close()
+
+
+class HubClient:
+    """Accès en lecture aux données publiées par un MarketDataHub"""
+
+    def __init__(self, name, symbols, max_age=None):
+        self.name = name
+        self.max_age = max_age
+        self.prices = {}
+        self.chains = {}
+        self._symbol_table = SymbolTable()
+        self._chain_cache = {}
+        for symbol in symbols:
+            px_name, chain_name = _segment_names(name, symbol)
+            self.prices[symbol] = SharedRing(px_name, PRICE_DTYPE)
+            self.chains[symbol] = SharedSnapshot(chain_name, CHAIN_DTYPE)
+        self.quotes = SharedRing(f"{name}_quotes", QUOTE_DTYPE)
+        self._quote_count = 0
+
+    def price(self, symbol):
+        """Dernier prix publié (None si absent ou plus vieux que max_age)"""
+        ring = self.prices.get(symbol)
+        record = ring.latest() if ring is not None else None
+        if record is None:
+            return None
+        if self.max_age is not None and time.time() - record['ts'] > self.max_age:
+            return None
+        return float(record['price'])
+
+    def chain(self, symbol):
+        """OptionChain copiée depuis le dernier instantané publié (une copie par publication)
+
+        Le hub réécrit le buffer d'une vue deux publications plus tard: les
+        enregistrements sont copiés puis la copie n'est retenue que si
+        l'instantané n'a pas été réécrit pendant la lecture. La chaîne
+        renvoyée reste donc cohérente aussi longtemps que main la garde.
+        """
+        snapshot = self.chains.get(symbol)
+        if snapshot is None:
+            return None
+        for _ in range(100):
+            view, seq, ts = snapshot.read()
+            if not len(view):
+                return None
+            if self.max_age is not None and time.time() - ts > self.max_age:
+                return None
+            cached = self._chain_cache.get(symbol)
+            if cached is not None and cached[0] == seq:
+                return cached[1]
+            records = view.copy()
+            if snapshot.is_valid(seq):
+                break
+        else:
+            raise RuntimeError(f"Instantané {snapshot.name} réécrit pendant chaque lecture")
+        self._symbol_table.reserve(len(records))
+        symbol_idx = np.fromiter((self._symbol_table.intern(s.decode()) for s in records['symbol']),
+                                 dtype=np.int32, count=len(records))
+        chain = OptionChain(symbol, records['strike'], records['type'], records['expiry'],
+                            records['open_interest'], symbol_idx, records['bid'], records['ask'], records['iv'],
+                            symbol_table=self._symbol_table, quote_ts=records['quote_ts'])
+        self._chain_cache[symbol] = (seq, chain)
+        return chain
+
+    def new_quotes(self):
+        """Quotes publiées depuis le dernier appel"""
+        records, self._quote_count = self.quotes.read_since(self._quote_count)
+        return records
+
+    def close(self):
+        for ring in self.prices.values():
+            ring.close()
+        for snapshot in self.chains.values():
+            snapshot.close()
+        self.quotes.close()
+
+
+def _num(value):
+    return np.nan if value is None else float(value)
+
+
+if __name__ == "__main__":
+    import argparse
+    import main
+    from circuit_breaker import BreakerClient
+    from config import (BREAKER_FAILURES, BREAKER_PERMANENT_SECONDS, BREAKER_RESET_SECONDS, HUB_NAME,
+                        HUB_SYMBOLS, QUOTE_FALLBACK_CANDIDATES)
+    from status_server import ApiBudget, MeteredClient
+
+    parser = argparse.ArgumentParser(description="Hub de données de marché partagé")
+    parser.add_argument('--name', default=HUB_NAME or 'ivspread')
+    parser.add_argument('--symbols', default=HUB_SYMBOLS)
+    parser.add_argument('--period', type=float, default=main.CYCLE_PERIOD)
+    options = parser.parse_args()
+
+    # Mêmes clients que main(): appels décomptés et disjoncteurs par endpoint
+    budget = ApiBudget()
+    breaker_options = dict(failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET_SECONDS,
+                           permanent_ttl=BREAKER_PERMANENT_SECONDS)
+    main.api = BreakerClient(MeteredClient(main.api, budget), 'api', exempt=main.ORDER_METHODS,
+                             **breaker_options)
+    main.trading_client = BreakerClient(MeteredClient(main.trading_client, budget), 'trading_client',
+                                        exempt=main.ORDER_METHODS, **breaker_options)
+
+    def fetch_price(symbol):
+        # Sources réelles uniquement: jamais le prix de repli simulé de get_data
+        sources = (main._price_from_latest_trade, main._price_from_latest_quote,
+                   lambda s: main._bars_from_api(s, 1, main.TIMEFRAME))
+        for fetch in sources:
+            try:
+                data = fetch(symbol)
+            except Exception as e:
+                logging.warning(f"Hub: prix {symbol} indisponible: {e}")
+                continue
+            if data is not None and len(data):
+                return float(data['close'].iloc[-1])
+        return None
+
+    def select_quotes(symbol, chain, price):
+        # Contrats que get_real_option_data retiendrait: sélection .25 delta et strikes voisins de repli
+        index = main.get_strike_index(symbol)
+        index.sync(chain, as_of=main.clock_now().date())
+        option_data = main.find_25_delta_options(chain, price, index)
+        if not option_data:
+            return []
+        candidates = [option_data['call_symbol'], option_data['put_symbol']]
+        for side, contract_type in (('call', main.TYPE_CALL), ('put', main.TYPE_PUT)):
+            i = option_data[f'{side}_index']
+            candidates += [s for _, s in index.k_nearest(chain.strike[i], contract_type,
+                                                         QUOTE_FALLBACK_CANDIDATES + 1, expiry=chain.expiry[i])
+                           if s not in candidates]
+        main.quote_candidates(chain, candidates)
+        quoted = [i for i in (chain.index_of(s) for s in candidates) if i is not None and chain.iv[i] > 0]
+        return [(chain.symbol(i), chain.bid[i], chain.ask[i], chain.iv[i], chain.quote_ts[i]) for i in quoted]
+
+    hub = MarketDataHub(options.name, options.symbols.split(','), fetch_price, main.get_option_contracts,
+                        select_quotes, period=options.period)
+    print(f"📡 Hub {options.name} en cours pour {hub.symbols} (Ctrl+C pour arrêter)")
+    try:
+        hub.run()
+    except KeyboardInterrupt:
+        pass
+    print(f"📊 {budget.total} appels API effectués par le hub")
@@ -0,0 +1,128 @@
+# Instrumentation mémoire de la boucle longue durée et caches bornés
+import logging
+import os
+import resource
+import sys
+import tracemalloc
+from collections import OrderedDict, deque
+
+
+def current_rss_mb():
+    """RSS courant du process en Mo (/proc sur Linux, pic RSS sinon)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sur macOS, en Ko ailleurs
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class BoundedCache(OrderedDict):
+    """Dictionnaire LRU à nombre d'entrées plafonné"""
+
+    def __init__(self, max_entries, name='cache'):
+        super().__init__()
+        self.max_entries = max_entries
+        self.name = name
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            old_key, _ = self.popitem(last=False)
+            self.evictions += 1
+            logging.info(f"Cache {self.name}: éviction de {old_key!r} (plafond {self.max_entries})")
+
+
+class MemoryMonitor:
+    """Comptabilité mémoire par cycle avec alertes de croissance
+
+    À chaque cycle: RSS et taille des caches enregistrés. Tous les
+    sample_every cycles, le cycle est tracé avec tracemalloc et les
+    plus gros allocateurs survivants sont journalisés. Une alerte est émise
+    à chaque palier de alert_growth_mb franchi au-dessus de la référence.
+    """
+
+    def __init__(self, sample_every=60, top=10, alert_growth_mb=200.0, history=1440):
+        self.sample_every = sample_every
+        self.top = top
+        self.alert_growth_mb = alert_growth_mb
+        self.baseline_mb = None
+        self.last = {}
+        self.alerts = 0
+        self._alert_level = 0
+        self._rss_history = deque(maxlen=history)
+        self._sizes = {}
+        self._tracing = False
+
+    def register(self, name, size_fn):
+        """Enregistre une fonction retournant la taille d'un cache/historique"""
+        self._sizes[name] = size_fn
+
+    def begin_cycle(self, cycle):
+        """Démarre le traçage tracemalloc si le cycle est échantillonné"""
+        if self.sample_every and cycle % self.sample_every == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def end_cycle(self, cycle):
+        """Mesure la mémoire en fin de cycle et retourne les métriques"""
+        rss = current_rss_mb()
+        self._rss_history.append(rss)
+        # Référence prise après le premier cycle (imports et caches initialisés)
+        if self.baseline_mb is None:
+            self.baseline_mb = rss
+
+        sizes = {}
+        for name, size_fn in self._sizes.items():
+            try:
+                sizes[name] = size_fn()
+            except Exception as e:
+                sizes[name] = None
+                logging.warning(f"Taille du cache {name} indisponible: {e}")
+
+        metrics = {
+            'cycle': cycle,
+            'rss_mb': rss,
+            'baseline_mb': self.baseline_mb,
+            'growth_mb': rss - self.baseline_mb,
+            'peak_mb': max(self._rss_history),
+            'sizes': sizes,
+        }
+
+        if self._tracing:
+            metrics['top_allocators'] = self._top_allocators()
+
+        # Une alerte par palier de alert_growth_mb franchi (pas à chaque cycle)
+        level = int(metrics['growth_mb'] // self.alert_growth_mb) if self.alert_growth_mb > 0 else 0
+        if level > self._alert_level:
+            self._alert_level = level
+            self.alerts += 1
+            logging.warning(f"ALERTE mémoire: RSS {rss:.1f} Mo (+{metrics['growth_mb']:.1f} Mo depuis le démarrage)")
+        logging.info(f"Mémoire cycle #{cycle}: RSS {rss:.1f} Mo, caches {sizes}")
+
+        self.last = metrics
+        return metrics
+
+    def _top_allocators(self):
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        self._tracing = False
+        stats = snapshot.statistics('lineno')[:self.top]
+        top = [(str(stat.traceback), stat.size / 1024) for stat in stats]
+        for location, size_kb in top:
+            logging.info(f"Allocation survivante: {size_kb:.1f} Ko - {location}")
+        return top
@@ -8,6 +8,7 @@
 BOT_DIR="$(pwd)"
 PID_FILE="$BOT_DIR/trading-bot.pid"
 LOG_FILE="$BOT_DIR/trading-bot.log"
+STATUS_URL="http://${STATUS_HOST:-127.0.0.1}:${STATUS_PORT:-8765}"
 
 # Couleurs pour l'affichage
 RED='\033[0;31m'
@@ -38,6 +39,27 @@ else
     echo -e "   ${YELLOW}⚠️  Aucun bot en cours d'exécution${NC}"
 fi
 
+# 1b. Santé applicative via l'endpoint de statut du bot
+echo -e "\n${BLUE}🩺 Santé du bot (endpoint de statut):${NC}"
+STATUS_JSON=$(curl -s --max-time 2 "$STATUS_URL/status")
+if [ -n "$STATUS_JSON" ]; then
+    echo "$STATUS_JSON" | python3 -c '
+import json, sys
+s = json.load(sys.stdin)
+print("   {} Sain: {}".format("✅" if s.get("healthy") else "❌", s.get("healthy")))
+print("   🔄 Cycle #{} | Étape: {} | Durée: {}s".format(s.get("cycle"), s.get("stage"),
+      round(s["cycle_duration"], 2) if s.get("cycle_duration") is not None else "-"))
+if s.get("seconds_since_cycle") is not None:
+    print("   ⏱️  Dernier cycle il y a {:.0f}s".format(s["seconds_since_cycle"]))
+print("   🎯 Signal: {} | Taille: {} | Spread IV: {}".format(s.get("signal"), s.get("position_size"), s.get("spread_iv")))
+print("   📡 API: {}/{} appels sur la dernière minute".format(s.get("api_calls_last_minute"), s.get("api_budget_per_minute")))
+for stage, err in (s.get("last_errors") or {}).items():
+    print("   ⚠️  Dernière erreur [{}]: {}".format(stage, err.get("message")))
+'
+else
+    echo -e "   ${RED}❌ Endpoint de statut injoignable ($STATUS_URL)${NC}"
+fi
+
 # 2. Utilisation des ressources système
 echo -e "\n${BLUE}💻 Ressources système:${NC}"
 CPU_USAGE=$(top -bn1 | grep "Cpu(s)" | awk '{print $2}' | cut -d'%' -f1)
@@ -0,0 +1,196 @@
+# Représentation colonnaire compacte d'une chaîne d'options
+import numpy as np
+
+# Codes de type de contrat (signe = sens du delta)
+TYPE_CALL = 1
+TYPE_PUT = -1
+
+
+class SymbolTable:
+    """Table d'internement des symboles: chaque chaîne n'est stockée qu'une fois
+
+    La table est plafonnée à max_size symboles: au-delà elle est vidée et
+    sa génération incrémentée, ce qui invalide les index construits avant.
+    """
+
+    def __init__(self, max_size=None):
+        self._symbols = []
+        self._index = {}
+        self.max_size = max_size
+        self.generation = 0
+
+    def reserve(self, n):
+        """Vide la table si l'ajout de n symboles risque de dépasser le plafond"""
+        if self.max_size is not None and len(self._symbols) + n > self.max_size:
+            self._symbols = []
+            self._index = {}
+            self.generation += 1
+
+    def intern(self, symbol):
+        """Retourne l'index du symbole, en l'ajoutant si nécessaire"""
+        idx = self._index.get(symbol)
+        if idx is None:
+            idx = len(self._symbols)
+            self._symbols.append(symbol)
+            self._index[symbol] = idx
+        return idx
+
+    def intern_many(self, symbols):
+        """Interne une séquence de symboles et retourne un tableau d'index int32"""
+        return np.fromiter((self.intern(s) for s in symbols), dtype=np.int32, count=len(symbols))
+
+    def index_of(self, symbol):
+        """Index d'un symbole déjà interné (None s'il est inconnu)"""
+        return self._index.get(symbol)
+
+    def lookup(self, idx):
+        """Symbole correspondant à un index"""
+        return self._symbols[int(idx)]
+
+    def __len__(self):
+        return len(self._symbols)
+
+
+# Table partagée par toutes les chaînes du process
+SYMBOL_TABLE = SymbolTable(max_size=200_000)
+
+
+class OptionChain:
+    """Chaîne d'options d'un sous-jacent sous forme de tableaux NumPy
+
+    Colonnes: strike (float64), type (int8, TYPE_CALL/TYPE_PUT), expiry
+    (datetime64[D]), open_interest (float64, NaN si inconnu), symbol_idx
+    (int32, index dans la table d'internement). Les colonnes de quotes
+    (bid, ask, iv, quote_ts en secondes epoch) sont remplies par la couche
+    quotes, NaN par défaut.
+    """
+
+    __slots__ = ('underlying', 'strike', 'type', 'expiry', 'open_interest',
+                 'symbol_idx', 'bid', 'ask', 'iv', 'quote_ts', 'symbol_table', 'generation')
+
+    def __init__(self, underlying, strike, type, expiry, open_interest, symbol_idx,
+                 bid=None, ask=None, iv=None, symbol_table=None, quote_ts=None):
+        n = len(strike)
+        self.underlying = underlying
+        self.strike = np.asarray(strike, dtype=np.float64)
+        self.type = np.asarray(type, dtype=np.int8)
+        self.expiry = np.asarray(expiry, dtype='datetime64[D]')
+        self.open_interest = np.asarray(open_interest, dtype=np.float64)
+        self.symbol_idx = np.asarray(symbol_idx, dtype=np.int32)
+        self.bid = np.full(n, np.nan) if bid is None else np.asarray(bid, dtype=np.float64)
+        self.ask = np.full(n, np.nan) if ask is None else np.asarray(ask, dtype=np.float64)
+        self.iv = np.full(n, np.nan) if iv is None else np.asarray(iv, dtype=np.float64)
+        self.quote_ts = np.full(n, np.nan) if quote_ts is None else np.asarray(quote_ts, dtype=np.float64)
+        self.symbol_table = symbol_table if symbol_table is not None else SYMBOL_TABLE
+        self.generation = self.symbol_table.generation
+
+    @classmethod
+    def from_contracts(cls, contracts, underlying=None, symbol_table=None):
+        """Construit la chaîne en une passe depuis les contrats Alpaca"""
+        table = symbol_table if symbol_table is not None else SYMBOL_TABLE
+        contracts = list(contracts or [])
+        n = len(contracts)
+        table.reserve(n)
+        strike = np.empty(n, dtype=np.float64)
+        types = np.empty(n, dtype=np.int8)
+        expiry = np.empty(n, dtype='datetime64[D]')
+        open_interest = np.full(n, np.nan)
+        symbol_idx = np.empty(n, dtype=np.int32)
+
+        for i, c in enumerate(contracts):
+            strike[i] = float(c.strike_price)
+            types[i] = TYPE_CALL if _type_value(c.type) == 'call' else TYPE_PUT
+            expiry[i] = np.datetime64(c.expiration_date, 'D')
+            if c.open_interest is not None:
+                open_interest[i] = float(c.open_interest)
+            symbol_idx[i] = table.intern(c.symbol)
+
+        if underlying is None and contracts:
+            underlying = contracts[0].underlying_symbol
+
+        return cls(underlying, strike, types, expiry, open_interest, symbol_idx,
+                   symbol_table=table)
+
+    def __len__(self):
+        return len(self.strike)
+
+    @property
+    def nbytes(self):
+        """Taille mémoire des colonnes (hors table d'internement)"""
+        return sum(getattr(self, name).nbytes for name in
+                   ('strike', 'type', 'expiry', 'open_interest', 'symbol_idx', 'bid', 'ask', 'iv',
+                    'quote_ts'))
+
+    @property
+    def calls(self):
+        """Masque booléen des calls"""
+        return self.type == TYPE_CALL
+
+    @property
+    def puts(self):
+        """Masque booléen des puts"""
+        return self.type == TYPE_PUT
+
+    @property
+    def stale(self):
+        """Vrai si la table d'internement a été vidée depuis la construction (index invalides)"""
+        return self.generation != self.symbol_table.generation
+
+    def symbol(self, i):
+        """Symbole OCC du contrat à la position i"""
+        if self.stale:
+            raise LookupError(f"Chaîne {self.underlying} périmée: table d'internement réinitialisée")
+        return self.symbol_table.lookup(self.symbol_idx[i])
+
+    def index_of(self, symbol):
+        """Position d'un contrat dans la chaîne (None s'il est absent ou si la chaîne est périmée)"""
+        if self.stale:
+            return None
+        idx = self.symbol_table.index_of(symbol)
+        if idx is None:
+            return None
+        hits = np.flatnonzero(self.symbol_idx == idx)
+        return int(hits[0]) if len(hits) else None
+
+    def take(self, selector):
+        """Sous-chaîne (masque booléen ou tableau d'index)"""
+        sub = OptionChain(self.underlying, self.strike[selector], self.type[selector],
+                          self.expiry[selector], self.open_interest[selector],
+                          self.symbol_idx[selector], self.bid[selector], self.ask[selector],
+                          self.iv[selector], symbol_table=self.symbol_table,
+                          quote_ts=self.quote_ts[selector])
+        sub.generation = self.generation
+        return sub
+
+    def nearest_strike(self, price, mask=None):
+        """Position du contrat dont le strike est le plus proche du prix"""
+        distance = np.abs(self.strike - price)
+        if mask is not None:
+            distance = np.where(mask, distance, np.inf)
+        if not len(distance) or not np.isfinite(distance).any():
+            return None
+        return int(np.argmin(distance))
+
+    def set_quote(self, i, bid=None, ask=None, iv=None, ts=None):
+        """Enregistre une quote dans les colonnes bid/ask/iv (ts: horodatage epoch)
+
+        Les colonnes en lecture seule (vues sur la mémoire partagée du hub)
+        sont d'abord copiées: la quote reste locale à ce process.
+        """
+        if not (self.bid.flags.writeable and self.ask.flags.writeable
+                and self.iv.flags.writeable and self.quote_ts.flags.writeable):
+            self.bid, self.ask, self.iv, self.quote_ts = (
+                self.bid.copy(), self.ask.copy(), self.iv.copy(), self.quote_ts.copy())
+        if bid is not None:
+            self.bid[i] = bid
+        if ask is not None:
+            self.ask[i] = ask
+        if iv is not None:
+            self.iv[i] = iv
+        if ts is not None:
+            self.quote_ts[i] = ts
+
+
+def _type_value(contract_type):
+    """Valeur texte d'un ContractType (enum ou chaîne)"""
+    return getattr(contract_type, 'value', contract_type)
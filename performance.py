@@ -0,0 +1,218 @@
+# Analytique de performance: mode incrémental (barre par barre) et mode batch vectorisé
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Nombre de périodes par an pour l'annualisation (rendements journaliers)
+PERIODS_PER_YEAR = 252
+ROLLING_WINDOW = 60
+
+
+class IncrementalPerformance:
+    """Métriques de performance mises à jour en O(1) à chaque nouvelle barre
+
+    Maintient l'equity, le drawdown maximum, le Sharpe/Sortino glissants,
+    le taux de réussite, le turnover et l'exposition sans jamais relire
+    l'historique.
+    """
+
+    def __init__(self, window=ROLLING_WINDOW, periods_per_year=PERIODS_PER_YEAR):
+        self.window = window
+        self.annualization = math.sqrt(periods_per_year)
+        self.equity = 1.0
+        self.peak = 1.0
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.n_bars = 0
+        self.n_returns = 0
+        self.n_wins = 0
+        self.n_active = 0
+        self.n_exposed = 0
+        self.gross_exposure = 0.0
+        self.turnover = 0.0
+        self.n_trades = 0
+        self.position = 0.0
+        # Sommes totales (Sharpe global)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        # Fenêtre glissante
+        self._window = deque()
+        self._wsum = 0.0
+        self._wsumsq = 0.0
+        self._wdownsq = 0.0
+
+    def update(self, ret, position=None):
+        """Ajoute le rendement de la barre (et la position détenue) et retourne l'equity"""
+        self.n_bars += 1
+
+        if position is not None:
+            position = float(position)
+            change = abs(position - self.position)
+            self.turnover += change
+            if change > 0:
+                self.n_trades += 1
+            self.position = position
+        if self.position != 0:
+            self.n_exposed += 1
+        self.gross_exposure += abs(self.position)
+
+        if ret is None or ret != ret:  # NaN: barre sans rendement
+            return self.equity
+        ret = float(ret)
+
+        self.equity *= 1 + ret
+        self.peak = max(self.peak, self.equity)
+        self.drawdown = self.equity / self.peak - 1
+        self.max_drawdown = min(self.max_drawdown, self.drawdown)
+
+        self.n_returns += 1
+        self._sum += ret
+        self._sumsq += ret * ret
+        if ret != 0:
+            self.n_active += 1
+            if ret > 0:
+                self.n_wins += 1
+
+        self._window.append(ret)
+        self._wsum += ret
+        self._wsumsq += ret * ret
+        self._wdownsq += min(ret, 0.0) ** 2
+        if len(self._window) > self.window:
+            old = self._window.popleft()
+            self._wsum -= old
+            self._wsumsq -= old * old
+            self._wdownsq -= min(old, 0.0) ** 2
+
+        return self.equity
+
+    @staticmethod
+    def _std(total, total_sq, n):
+        if n < 2:
+            return float('nan')
+        var = (total_sq - total * total / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def sharpe(self):
+        """Sharpe annualisé sur tout l'historique"""
+        std = self._std(self._sum, self._sumsq, self.n_returns)
+        if not std or std != std:
+            return 0.0
+        return self._sum / self.n_returns / std * self.annualization
+
+    def rolling_sharpe(self):
+        """Sharpe annualisé sur la fenêtre glissante"""
+        n = len(self._window)
+        std = self._std(self._wsum, self._wsumsq, n)
+        if not std or std != std:
+            return 0.0
+        return self._wsum / n / std * self.annualization
+
+    def rolling_sortino(self):
+        """Sortino annualisé sur la fenêtre glissante"""
+        n = len(self._window)
+        if n == 0:
+            return 0.0
+        downside = math.sqrt(max(self._wdownsq, 0.0) / n)
+        if downside == 0:
+            return 0.0
+        return self._wsum / n / downside * self.annualization
+
+    def snapshot(self):
+        """Dictionnaire des métriques courantes"""
+        n_bars = max(self.n_bars, 1)
+        volatility = self._std(self._sum, self._sumsq, self.n_returns)
+        return {
+            'equity': self.equity,
+            'cumulative_return': self.equity - 1,
+            'drawdown': self.drawdown,
+            'max_drawdown': self.max_drawdown,
+            'volatility': volatility * self.annualization if volatility == volatility else 0.0,
+            'sharpe_ratio': self.sharpe(),
+            'rolling_sharpe': self.rolling_sharpe(),
+            'rolling_sortino': self.rolling_sortino(),
+            'hit_rate': self.n_wins / self.n_active if self.n_active else 0.0,
+            'turnover': self.turnover,
+            'n_trades': self.n_trades,
+            'exposure': self.n_exposed / n_bars,
+            'avg_gross_exposure': self.gross_exposure / n_bars,
+        }
+
+
+def batch_performance(returns, positions=None, window=ROLLING_WINDOW, periods_per_year=PERIODS_PER_YEAR):
+    """Mêmes métriques que IncrementalPerformance pour N stratégies en une passe
+
+    returns: DataFrame ou tableau (barres x stratégies) de rendements, NaN
+    autorisés. positions: même forme, optionnel (turnover/exposition).
+    Retourne un DataFrame indexé par stratégie.
+    """
+    columns = returns.columns if isinstance(returns, pd.DataFrame) else None
+    r = np.asarray(returns, dtype=np.float64)
+    if r.ndim == 1:
+        r = r[:, None]
+    n_bars, n_strats = r.shape
+    annualization = math.sqrt(periods_per_year)
+    valid = ~np.isnan(r)
+    r0 = np.where(valid, r, 0.0)
+
+    # Equity et drawdown
+    equity = np.cumprod(1 + r0, axis=0)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=0), 1.0)
+    drawdowns = equity / peak - 1
+    final_equity = equity[-1] if n_bars else np.ones(n_strats)
+
+    # Moments globaux (ddof=1 comme pandas)
+    n = valid.sum(axis=0)
+    mean = np.divide(r0.sum(axis=0), n, out=np.full(n_strats, np.nan), where=n > 0)
+    dev = np.where(valid, r - mean, 0.0)
+    var = np.divide((dev * dev).sum(axis=0), n - 1, out=np.full(n_strats, np.nan), where=n > 1)
+    std = np.sqrt(var)
+    sharpe = np.divide(mean, std, out=np.zeros(n_strats), where=std > 0) * annualization
+
+    # Fenêtre glissante terminale
+    tail_r, tail_valid = r0[-window:], valid[-window:]
+    wn = tail_valid.sum(axis=0)
+    wsum = tail_r.sum(axis=0)
+    wmean = np.divide(wsum, wn, out=np.zeros(n_strats), where=wn > 0)
+    wdev = np.where(tail_valid, tail_r - wmean, 0.0)
+    wvar = np.divide((wdev * wdev).sum(axis=0), wn - 1, out=np.zeros(n_strats), where=wn > 1)
+    wstd = np.sqrt(wvar)
+    rolling_sharpe = np.divide(wmean, wstd, out=np.zeros(n_strats), where=wstd > 0) * annualization
+    downside = np.sqrt(np.divide((np.minimum(tail_r, 0.0) ** 2).sum(axis=0), wn,
+                                 out=np.zeros(n_strats), where=wn > 0))
+    rolling_sortino = np.divide(wmean, downside, out=np.zeros(n_strats), where=downside > 0) * annualization
+
+    # Taux de réussite
+    active = (r0 != 0).sum(axis=0)
+    hit_rate = np.divide((r0 > 0).sum(axis=0), active, out=np.zeros(n_strats), where=active > 0)
+
+    # Turnover et exposition
+    if positions is not None:
+        p = np.nan_to_num(np.asarray(positions, dtype=np.float64))
+        if p.ndim == 1:
+            p = p[:, None]
+        changes = np.abs(np.diff(p, axis=0, prepend=0.0))
+        turnover = changes.sum(axis=0)
+        n_trades = (changes > 0).sum(axis=0)
+        exposure = (p != 0).mean(axis=0) if n_bars else np.zeros(n_strats)
+        avg_gross = np.abs(p).mean(axis=0) if n_bars else np.zeros(n_strats)
+    else:
+        turnover = n_trades = exposure = avg_gross = np.full(n_strats, np.nan)
+
+    result = pd.DataFrame({
+        'equity': final_equity,
+        'cumulative_return': final_equity - 1,
+        'drawdown': drawdowns[-1] if n_bars else np.zeros(n_strats),
+        'max_drawdown': np.minimum(drawdowns.min(axis=0), 0.0) if n_bars else np.zeros(n_strats),
+        'volatility': np.nan_to_num(std) * annualization,
+        'sharpe_ratio': sharpe,
+        'rolling_sharpe': rolling_sharpe,
+        'rolling_sortino': rolling_sortino,
+        'hit_rate': hit_rate,
+        'turnover': turnover,
+        'n_trades': n_trades,
+        'exposure': exposure,
+        'avg_gross_exposure': avg_gross,
+    }, index=columns)
+    return result
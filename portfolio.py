@@ -0,0 +1,71 @@
+# Allocation de portefeuille vectorisée (sizing multi-sous-jacents)
+import numpy as np
+import pandas as pd
+
+# Plafonds par défaut, en fraction du capital
+MAX_POSITION = 1.5   # taille maximale issue du signal (même borne que le clip historique)
+MAX_NAME = 1.5       # exposition maximale par sous-jacent
+MAX_GROSS = 1.5      # exposition brute totale (somme des |poids|)
+MAX_NET = 1.5        # exposition nette totale (|somme des poids|)
+CASH_BUFFER = 0.95   # 95% du capital pour laisser une marge
+
+
+def signal_weights(signals, spread_norms, risk_multiplier=5, max_position=MAX_POSITION):
+    """Poids bruts de la stratégie: signal * clip(spread_norm * risk_multiplier, 0, max_position)"""
+    signals = np.asarray(signals, dtype=np.float64)
+    spread_norms = np.asarray(spread_norms, dtype=np.float64)
+    return np.nan_to_num(signals * np.clip(spread_norms * risk_multiplier, 0, max_position))
+
+
+def allocate(symbols, weights, prices, equity, current_qty=None, volatility=None, target_vol=None,
+             max_name=MAX_NAME, max_gross=MAX_GROSS, max_net=MAX_NET, cash_buffer=CASH_BUFFER):
+    """Calcule les quantités cibles de tous les sous-jacents en une passe NumPy
+
+    weights: poids bruts par symbole (voir signal_weights). Étapes: mise
+    à l'échelle par target_vol / volatility (si fournie), plafond par nom,
+    puis réduction proportionnelle si les expositions nette ou brute
+    dépassent leur plafond. Les quantités sont tronquées vers zéro; un
+    prix invalide donne une cible nulle.
+
+    Retourne un DataFrame indexé par symbole: weight, target_value,
+    target_qty, current_qty et diff_qty (ordre à passer).
+    """
+    symbols = list(symbols)
+    n = len(symbols)
+    weights = np.nan_to_num(np.asarray(weights, dtype=np.float64))
+    prices = np.asarray(prices, dtype=np.float64)
+    current = np.zeros(n) if current_qty is None else np.nan_to_num(np.asarray(current_qty, dtype=np.float64))
+
+    # Volatility scaling: les noms les plus volatils reçoivent moins de capital
+    if target_vol is not None and volatility is not None:
+        vol = np.asarray(volatility, dtype=np.float64)
+        valid = np.isfinite(vol) & (vol > 0)
+        scale = np.divide(target_vol, vol, out=np.ones(n), where=valid)
+        weights = weights * scale
+
+    weights = np.clip(weights, -max_name, max_name)
+
+    net = weights.sum()
+    if abs(net) > max_net:
+        weights = weights * (max_net / abs(net))
+    gross = np.abs(weights).sum()
+    if gross > max_gross:
+        weights = weights * (max_gross / gross)
+
+    target_value = weights * equity * cash_buffer
+    valid_price = np.isfinite(prices) & (prices > 0)
+    target_qty = np.trunc(np.divide(target_value, prices, out=np.zeros(n), where=valid_price))
+
+    return pd.DataFrame({
+        'weight': weights,
+        'target_value': target_value,
+        'target_qty': target_qty.astype(np.int64),
+        'current_qty': current.astype(np.int64),
+        'diff_qty': (target_qty - current).astype(np.int64),
+    }, index=pd.Index(symbols, name='symbol'))
+
+
+def exposure(allocation):
+    """Expositions brute et nette (en fraction du capital) d'une allocation"""
+    weights = allocation['weight'].to_numpy()
+    return {'gross': float(np.abs(weights).sum()), 'net': float(weights.sum())}
@@ -0,0 +1,202 @@
+# Profilage à la demande des cycles de production (échantillonnage de pile)
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+class StackSampler:
+    """Échantillonne périodiquement la pile d'un thread depuis un thread démon
+
+    Les piles sont agrégées au format "folded" (une ligne par pile,
+    frames séparées par ';' puis le nombre d'échantillons), lisible par
+    flamegraph.pl, speedscope ou inferno. get_stage permet de préfixer
+    chaque pile par l'étape du cycle en cours. pause() et resume()
+    suspendent l'échantillonnage sans arrêter le thread (attente entre
+    deux cycles profilés). Le thread d'échantillonnage
+    a besoin du GIL: le code Python pur est sous-échantillonné par rapport
+    aux attentes réseau (pas au-delà de sys.getswitchinterval()).
+    """
+
+    def __init__(self, thread_id, interval=0.005, get_stage=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.get_stage = get_stage
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_time = 0.0
+        self._stop = threading.Event()
+        self._sampling = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._sampling.set()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def pause(self):
+        self._sampling.clear()
+
+    def resume(self):
+        self._sampling.set()
+
+    def stop(self):
+        self._stop.set()
+        self._sampling.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            self._sampling.wait()
+            if self._stop.wait(self.interval):
+                break
+            if not self._sampling.is_set():
+                continue
+            start = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._fold(frame)] += 1
+                self.samples += 1
+            self.sampling_time += time.perf_counter() - start
+
+    def _fold(self, frame):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.reverse()
+        if self.get_stage is not None:
+            frames.insert(0, f"stage:{self.get_stage()}")
+        return ';'.join(frames)
+
+    def function_stats(self):
+        """Échantillons par fonction: (fonction, propre, cumulé), triés par temps cumulé"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return sorted(((name, own[name], total[name]) for name in total), key=lambda r: -r[2])
+
+
+class CycleProfiler:
+    """Profile les N prochains cycles de la boucle principale, sur demande
+
+    Activé par request(n), par la variable PROFILE_CYCLES au démarrage ou
+    par le signal SIGUSR2. Seuls les cycles sont échantillonnés:
+    l'échantillonneur est suspendu entre end_cycle et le begin_cycle
+    suivant (attente du planificateur), et la durée profilée est la somme
+    des durées de cycle. Désactivé, le coût par cycle se limite à trois
+    tests de booléen. À la fin des N cycles, la pile repliée
+    (profile-*.folded) et les statistiques par fonction (profile-*.txt)
+    sont écrites dans output_dir.
+    """
+
+    def __init__(self, output_dir='.', interval=0.005, get_stage=None, default_cycles=5):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.get_stage = get_stage
+        self.default_cycles = default_cycles
+        self.remaining = 0
+        self.active = False
+        self.last_dump = None
+        self._sampler = None
+        self._cycle_start = None
+        self._profiled = 0.0
+        # Positionné par le gestionnaire de signal, traité par begin_cycle
+        self._requested = False
+
+    def request(self, cycles=None):
+        """Demande le profilage des prochains cycles"""
+        self.remaining = cycles or self.default_cycles
+        logging.info(f"Profilage demandé pour {self.remaining} cycle(s)")
+
+    def install_signal(self, signum=getattr(signal, 'SIGUSR2', None)):
+        """kill -USR2 <pid> déclenche le profilage des prochains cycles
+
+        Le gestionnaire ne fait que lever un drapeau (ni log ni verrou dans
+        un gestionnaire de signal): la demande est traitée au cycle suivant.
+        """
+        if signum is None:
+            return False
+        signal.signal(signum, self._on_signal)
+        return True
+
+    def _on_signal(self, signum, frame):
+        self._requested = True
+
+    def begin_cycle(self):
+        if self._requested:
+            self._requested = False
+            self.request()
+        if not self.remaining:
+            return
+        if self.active:
+            self._sampler.resume()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), self.interval, self.get_stage)
+            self._profiled = 0.0
+            self.active = True
+            self._sampler.start()
+        self._cycle_start = time.perf_counter()
+
+    def end_cycle(self):
+        if not self.active:
+            return
+        self._sampler.pause()
+        self._profiled += time.perf_counter() - self._cycle_start
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self._sampler.stop()
+            self.active = False
+            self.remaining = 0
+            self.last_dump = self.dump()
+
+    def dump(self):
+        """Écrit les fichiers folded et texte, retourne leurs chemins"""
+        sampler = self._sampler
+        wall = self._profiled
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        folded_path = os.path.join(self.output_dir, f"profile-{stamp}.folded")
+        stats_path = os.path.join(self.output_dir, f"profile-{stamp}.txt")
+        try:
+            with open(folded_path, 'w') as f:
+                for stack, count in sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(stats_path, 'w') as f:
+                overhead = sampler.sampling_time / wall if wall else 0.0
+                f.write(f"Durée profilée: {wall:.2f}s, {sampler.samples} échantillons "
+                        f"(intervalle {self.interval * 1000:.1f} ms), surcoût échantillonneur {overhead:.2%}\n\n")
+                f.write(f"{'propre':>8} {'cumulé':>8} {'cumulé %':>9}  fonction\n")
+                for name, own, total in sampler.function_stats():
+                    share = total / sampler.samples if sampler.samples else 0.0
+                    f.write(f"{own:>8} {total:>8} {share:>9.1%}  {name}\n")
+        except OSError as e:
+            logging.error(f"Erreur écriture du profil: {e}")
+            return None
+        logging.info(f"Profil écrit: {folded_path} ({sampler.samples} échantillons)")
+        return folded_path, stats_path
+
+
+def measure_disabled_overhead(iterations=1_000_000):
+    """Coût moyen (ns) de begin_cycle + end_cycle quand le profilage est désactivé"""
+    profiler = CycleProfiler()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        profiler.begin_cycle()
+        profiler.end_cycle()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+if __name__ == "__main__":
+    print(f"Surcoût désactivé: {measure_disabled_overhead():.0f} ns/cycle")
@@ -0,0 +1,106 @@
+# Filtrage vectorisé de la qualité des quotes d'une chaîne d'options
+import logging
+import time
+
+import numpy as np
+
+# Motifs de rejet (bits combinables)
+REJECT_NO_QUOTE = 1
+REJECT_ZERO_BID = 2
+REJECT_CROSSED = 4
+REJECT_LOCKED = 8
+REJECT_WIDE = 16
+REJECT_STALE = 32
+
+REJECT_REASONS = {
+    'no_quote': REJECT_NO_QUOTE,
+    'zero_bid': REJECT_ZERO_BID,
+    'crossed': REJECT_CROSSED,
+    'locked': REJECT_LOCKED,
+    'wide_spread': REJECT_WIDE,
+    'stale': REJECT_STALE,
+}
+
+
+class QuoteFilter:
+    """Score et masque toutes les quotes d'une chaîne en une passe NumPy
+
+    Une quote est rejetée si bid/ask manquent, si le bid est inférieur à
+    min_bid, si le marché est croisé (bid > ask) ou bloqué (bid == ask,
+    sauf allow_locked), si l'écart relatif (ask - bid) / mid dépasse
+    max_spread_pct, ou si son horodatage a plus de max_age secondes. Le
+    score d'une quote valide vaut 1 - spread / max_spread_pct (0 si rejetée).
+    """
+
+    def __init__(self, max_spread_pct=0.5, max_age=120.0, min_bid=0.01, allow_locked=False):
+        self.max_spread_pct = max_spread_pct
+        self.max_age = max_age
+        self.min_bid = min_bid
+        self.allow_locked = allow_locked
+        self.evaluated = 0
+        self.counters = dict.fromkeys(REJECT_REASONS, 0)
+        self.last_counts = dict.fromkeys(REJECT_REASONS, 0)
+
+    def evaluate(self, chain, now=None, record=True):
+        """Retourne (valid, score, reasons) pour toutes les quotes de la chaîne
+
+        reasons est un tableau uint8 des motifs de rejet combinés (0 = valide).
+        Si record, les rejets des contrats cotés sont comptés (voir record).
+        """
+        now = time.time() if now is None else now
+        bid = chain.bid
+        ask = chain.ask
+        reasons = np.zeros(len(bid), dtype=np.uint8)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            missing = np.isnan(bid) | np.isnan(ask)
+            reasons[missing] |= REJECT_NO_QUOTE
+            reasons[bid < self.min_bid] |= REJECT_ZERO_BID
+            reasons[bid > ask] |= REJECT_CROSSED
+            if not self.allow_locked:
+                reasons[bid == ask] |= REJECT_LOCKED
+            spread_pct = (ask - bid) / ((ask + bid) * 0.5)
+            reasons[spread_pct > self.max_spread_pct] |= REJECT_WIDE
+            if self.max_age is not None:
+                # Horodatage inconnu (NaN): la quote n'est pas considérée périmée
+                reasons[now - chain.quote_ts > self.max_age] |= REJECT_STALE
+
+            valid = reasons == 0
+            score = np.where(valid, 1 - spread_pct / self.max_spread_pct, 0.0)
+
+        if record:
+            self.record(chain, reasons)
+        return valid, score, reasons
+
+    def record(self, chain, reasons):
+        """Compte les rejets des seuls contrats cotés (horodatage ou bid/ask présents)
+
+        Les contrats jamais interrogés n'ont pas de quote: les compter en
+        no_quote gonflerait le compteur de la taille de la chaîne à chaque cycle.
+        """
+        quoted = ~np.isnan(chain.quote_ts) | ~(np.isnan(chain.bid) & np.isnan(chain.ask))
+        reasons = reasons[quoted]
+        self.evaluated += len(reasons)
+        for name, bit in REJECT_REASONS.items():
+            count = int(np.count_nonzero(reasons & bit))
+            self.last_counts[name] = count
+            self.counters[name] += count
+
+    def nearest_valid(self, chain, i, valid):
+        """Contrat valide le plus proche en strike du contrat i (même type et échéance)
+
+        Retourne i lui-même s'il est valide, None si aucun voisin n'est valide.
+        """
+        if valid[i]:
+            return i
+        candidates = valid & (chain.type == chain.type[i]) & (chain.expiry == chain.expiry[i])
+        if not candidates.any():
+            return None
+        distance = np.where(candidates, np.abs(chain.strike - chain.strike[i]), np.inf)
+        j = int(np.argmin(distance))
+        logging.info(f"Quote {chain.symbol(i)} rejetée, repli sur {chain.symbol(j)}")
+        return j
+
+    def stats(self):
+        """Compteurs cumulés de rejets par motif"""
+        return {'evaluated': self.evaluated, 'rejected': dict(self.counters)}
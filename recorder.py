@@ -0,0 +1,351 @@
+# Enregistrement et rejeu des réponses API de chaque cycle
+import gzip
+import importlib
+import json
+import logging
+import time
+from collections import deque
+from datetime import date, datetime
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+
+from circuit_breaker import CircuitOpenError, EndpointUnavailable
+
+# Exceptions du projet recréées sous leur type au rejeu (les appelants les distinguent)
+PROJECT_EXCEPTIONS = {cls.__name__: cls for cls in (CircuitOpenError, EndpointUnavailable)}
+
+
+def _json_default(obj):
+    """Sérialisation des types non JSON natifs"""
+    if isinstance(obj, (datetime, date, pd.Timestamp)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+def _class_path(obj):
+    cls = type(obj)
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _load_class(path):
+    module, _, name = path.rpartition('.')
+    return getattr(importlib.import_module(module), name)
+
+
+def encode_response(obj):
+    """Convertit une réponse API en structure JSON reconstructible"""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, pd.DataFrame):
+        return {'__frame__': json.loads(obj.to_json(orient='split', date_format='iso'))}
+    if hasattr(obj, 'model_dump'):  # modèles pydantic (alpaca-py)
+        return {'__model__': _class_path(obj), 'data': obj.model_dump(mode='json')}
+    if hasattr(obj, '_raw'):  # entités alpaca_trade_api (y compris BarsV2)
+        return {'__entity__': _class_path(obj), 'raw': obj._raw}
+    if isinstance(obj, (list, tuple)):
+        return [encode_response(o) for o in obj]
+    if isinstance(obj, dict):
+        return {str(k): encode_response(v) for k, v in obj.items()}
+    return {'__repr__': repr(obj)}
+
+
+def decode_response(obj):
+    """Reconstruit une réponse enregistrée (mêmes classes que l'API si possible)"""
+    if isinstance(obj, list):
+        return [decode_response(o) for o in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if '__frame__' in obj:
+        split = obj['__frame__']
+        df = pd.DataFrame(split['data'], index=split['index'], columns=split['columns'])
+        try:
+            df.index = pd.DatetimeIndex(df.index)
+        except (TypeError, ValueError):
+            pass
+        return df
+    if '__model__' in obj:
+        try:
+            return _load_class(obj['__model__']).model_validate(obj['data'])
+        except Exception:
+            return obj['data']
+    if '__entity__' in obj:
+        try:
+            return _load_class(obj['__entity__'])(obj['raw'])
+        except Exception:
+            return obj['raw']
+    if '__repr__' in obj:
+        return obj['__repr__']
+    return {k: decode_response(v) for k, v in obj.items()}
+
+
+class Recorder:
+    """Journal compressé append-only des appels API, un membre gzip par cycle
+
+    Chaque cycle est écrit en JSON lines (un en-tête puis un appel par
+    ligne) dans un nouveau membre gzip, ce qui permet d'ajouter des cycles
+    sans réécrire le fichier et de relire un fichier tronqué par un crash.
+    Un appel lancé pendant un cycle et terminé après sa fin (requête
+    couverte abandonnée) n'est pas attribué au cycle suivant: il est ignoré.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.cycle = None
+        self.timestamp = None
+        self.late_calls = 0
+        self._calls = []
+
+    def begin_cycle(self, cycle, timestamp=None):
+        self.cycle = cycle
+        self.timestamp = (timestamp or datetime.now()).isoformat()
+        self._calls = []
+
+    def record(self, client, method, args, kwargs, result=None, error=None, latency=0.0, cycle=None):
+        """Ajoute un appel au cycle courant (cycle: cycle au lancement de l'appel, None = courant)"""
+        if cycle is not None and cycle != self.cycle:
+            self.late_calls += 1
+            return
+        entry = {
+            'client': client,
+            'method': method,
+            'args': encode_response(list(args)),
+            'kwargs': encode_response(kwargs),
+            'latency': latency,
+        }
+        if error is not None:
+            entry['error'] = {'type': type(error).__name__, 'message': str(error)}
+        else:
+            entry['result'] = encode_response(result)
+        self._calls.append(entry)
+
+    def end_cycle(self, outcome=None):
+        """Écrit le cycle courant sur disque avec son résultat (signal, trade)"""
+        if self.cycle is None:
+            return
+        header = {'cycle': self.cycle, 'timestamp': self.timestamp,
+                  'n_calls': len(self._calls), 'outcome': encode_response(outcome or {})}
+        lines = [json.dumps(header, default=_json_default)]
+        lines.extend(json.dumps(c, default=_json_default) for c in self._calls)
+        try:
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        except Exception as e:
+            logging.error(f"Erreur écriture enregistrement cycle {self.cycle}: {e}")
+        self.cycle = None
+        self._calls = []
+
+
+class RecordingClient:
+    """Proxy d'un client API qui enregistre chaque réponse (ou erreur)"""
+
+    def __init__(self, client, recorder, name):
+        self._client = client
+        self._recorder = recorder
+        self._name = name
+
+    def __getattr__(self, method):
+        try:
+            target = getattr(self._client, method)
+        except AttributeError as e:
+            # Méthode absente du client: l'erreur fait partie du comportement à rejouer
+            self._recorder.record(self._name, method, (), {}, error=e)
+            raise
+        if not callable(target):
+            return target
+
+        def call(*args, **kwargs):
+            cycle = self._recorder.cycle
+            start = time.perf_counter()
+            try:
+                result = target(*args, **kwargs)
+            except Exception as e:
+                self._recorder.record(self._name, method, args, kwargs, error=e,
+                                      latency=time.perf_counter() - start, cycle=cycle)
+                raise
+            self._recorder.record(self._name, method, args, kwargs, result=result,
+                                  latency=time.perf_counter() - start, cycle=cycle)
+            return result
+
+        return call
+
+
+def load_recording(path):
+    """Liste des cycles enregistrés: {'cycle', 'timestamp', 'outcome', 'calls'}"""
+    cycles = []
+    current = None
+    remaining = 0
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                entry = json.loads(line)
+                if remaining == 0:
+                    current = dict(entry, calls=[])
+                    remaining = entry['n_calls']
+                    cycles.append(current)
+                else:
+                    current['calls'].append(entry)
+                    remaining -= 1
+        except (EOFError, OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Enregistrement tronqué ({path}): {e}")
+    return cycles
+
+
+class ReplayError(Exception):
+    """Erreur API rejouée (ou appel absent de l'enregistrement)"""
+
+
+def _call_key(method, args, kwargs):
+    """Clé d'appel (méthode, arguments sérialisés), identique à l'enregistrement et au rejeu"""
+    return method, json.dumps([args, kwargs], default=_json_default, sort_keys=True)
+
+
+class ReplayClient:
+    """Client API qui rejoue les réponses enregistrées d'un cycle
+
+    Les réponses sont retrouvées par (méthode, arguments): l'ordre
+    d'enregistrement des appels concurrents (requêtes couvertes, threads)
+    n'a pas d'importance. Les appels répétés avec les mêmes arguments
+    consomment les réponses dans l'ordre; à défaut d'arguments identiques
+    (horodatage recalculé...), la première réponse restante de la méthode
+    est utilisée. missing compte les appels sans réponse enregistrée
+    (divergence du rejeu).
+    """
+
+    def __init__(self, calls, name):
+        self._name = name
+        self.missing = 0
+        self._by_key = {}
+        self._by_method = {}
+        for entry in calls:
+            if entry['client'] != name:
+                continue
+            # Les arguments enregistrés sont déjà encodés (encode_response)
+            key = _call_key(entry['method'], entry['args'], entry['kwargs'])
+            self._by_key.setdefault(key, deque()).append(entry)
+            self._by_method.setdefault(entry['method'], deque()).append(entry)
+        self._used = set()
+
+    def _take(self, queue):
+        while queue:
+            entry = queue.popleft()
+            if id(entry) not in self._used:
+                self._used.add(id(entry))
+                return entry
+        return None
+
+    def __getattr__(self, method):
+        if method.startswith('__'):
+            raise AttributeError(method)
+
+        def call(*args, **kwargs):
+            key = _call_key(method, encode_response(list(args)), encode_response(kwargs))
+            entry = self._take(self._by_key.get(key)) or self._take(self._by_method.get(method))
+            if entry is None:
+                self.missing += 1
+                raise ReplayError(f"Appel {self._name}.{method} absent de l'enregistrement")
+            if 'error' in entry:
+                raise _replayed_exception(entry['error'])
+            return decode_response(entry['result'])
+
+        return call
+
+
+def _replayed_exception(error):
+    """Recrée l'exception d'origine (exception standard ou du projet)"""
+    import builtins
+    cls = PROJECT_EXCEPTIONS.get(error['type']) or getattr(builtins, error['type'], None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        return cls(error['message'])
+    return ReplayError(f"{error['type']}: {error['message']}")
+
+
+def replay(path, symbol=None, max_cycles=None):
+    """Rejoue un enregistrement à vitesse maximale à travers le chemin live
+
+    Les globales de main sont isolées comme pour le backtest
+    (backtest.live_bindings): état du signal live, contrats, chaînes,
+    bougies, filtre de quotes et récupérateur de prix repartent de zéro,
+    sans hub. Pour chaque cycle, les clients API sont remplacés par des
+    ReplayClient, l'horloge par le timestamp enregistré et le moteur
+    d'exécution par un moteur neuf (positions relues dans l'enregistrement,
+    sans ordres en attente hérités), puis get_data, le signal live (chemin
+    rapide si LIVE_FAST_PATH, comme la boucle du bot) et execute_live_trade
+    sont exécutés. Retourne la liste des décisions rejouées (avec celles
+    enregistrées pour comparaison et le nombre d'appels absents de
+    l'enregistrement).
+    """
+    from backtest import live_bindings
+    from execution import ExecutionEngine, NullLimiter
+
+    results = []
+    with live_bindings(None, quiet=False) as main:
+        symbol = symbol or main.SYMBOL
+        signal_fn = main.get_live_trading_signal_fast if main.LIVE_FAST_PATH else main.get_live_trading_signal
+        for cycle in load_recording(path)[:max_cycles]:
+            timestamp = datetime.fromisoformat(cycle['timestamp'])
+            api = main.api = ReplayClient(cycle['calls'], 'api')
+            trading_client = main.trading_client = ReplayClient(cycle['calls'], 'trading_client')
+            main.clock_now = lambda ts=timestamp: ts
+            main.execution = ExecutionEngine(lambda: api, limiter=NullLimiter(), max_workers=1, positions_ttl=0)
+
+            start = time.perf_counter()
+            data = main.get_data(symbol, limit=10)
+            current_price = data["close"].iloc[-1]
+            signal = signal_fn(symbol, current_price)
+            trade_result = main.execute_live_trade(symbol, signal, current_price)
+
+            results.append({
+                'cycle': cycle['cycle'],
+                'timestamp': cycle['timestamp'],
+                'price': float(current_price),
+                'signal': int(signal['signal']),
+                'position_size': float(signal['position_size']),
+                'spread_iv': float(signal['spread_iv']),
+                'trade_result': trade_result,
+                'recorded': decode_response(cycle.get('outcome', {})),
+                'missing_calls': api.missing + trading_client.missing,
+                'duration': time.perf_counter() - start,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import cProfile
+    import pstats
+
+    parser = argparse.ArgumentParser(description="Rejoue un enregistrement de cycles du bot")
+    parser.add_argument('path', help="fichier d'enregistrement (.jsonl.gz)")
+    parser.add_argument('--symbol', default=None)
+    parser.add_argument('--max-cycles', type=int, default=None)
+    parser.add_argument('--profile', action='store_true', help="profile le rejeu avec cProfile")
+    options = parser.parse_args()
+
+    profiler = cProfile.Profile() if options.profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    replayed = replay(options.path, options.symbol, options.max_cycles)
+    if profiler:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    mismatches = 0
+    for r in replayed:
+        recorded = r['recorded']
+        if recorded and recorded.get('signal') is not None and int(recorded['signal']) != r['signal']:
+            mismatches += 1
+            print(f"⚠️  Cycle #{r['cycle']}: signal rejoué {r['signal']} != enregistré {recorded['signal']}")
+    missing = sum(r['missing_calls'] for r in replayed)
+    print(f"✅ {len(replayed)} cycles rejoués en {elapsed:.3f}s ({mismatches} divergences, "
+          f"{missing} appels absents de l'enregistrement)")
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
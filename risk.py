@@ -0,0 +1,162 @@
+# Greeks Black-Scholes vectorisés et expositions agrégées du portefeuille
+import math
+import re
+import time
+
+import numpy as np
+from scipy.special import ndtr
+
+from option_chain import TYPE_CALL, TYPE_PUT
+
+SECONDS_PER_YEAR = 365.0 * 86400
+# Échéance: clôture du jour d'expiration (16h New York ~ 20h UTC)
+EXPIRY_HOUR_UTC = 20
+# Plancher de maturité (1 heure) pour éviter les divisions par zéro le jour de l'échéance
+MIN_YEARS = 3600 / SECONDS_PER_YEAR
+CONTRACT_MULTIPLIER = 100
+
+_OCC = re.compile(r'^([A-Z.]{1,6})(\d{6})([CP])(\d{8})$')
+
+
+def parse_occ(symbol):
+    """(sous-jacent, échéance datetime64[D], type, strike) d'un symbole OCC, None sinon"""
+    match = _OCC.match(symbol or '')
+    if match is None:
+        return None
+    root, date, kind, strike = match.groups()
+    expiry = np.datetime64(f"20{date[:2]}-{date[2:4]}-{date[4:]}", 'D')
+    return root, expiry, TYPE_CALL if kind == 'C' else TYPE_PUT, int(strike) / 1000
+
+
+def year_fractions(expiry, now):
+    """Maturités en années jusqu'à la clôture des jours d'échéance (plancher MIN_YEARS)"""
+    close = np.asarray(expiry, dtype='datetime64[D]').astype('datetime64[s]') + np.timedelta64(EXPIRY_HOUR_UTC, 'h')
+    seconds = (close - np.datetime64(int(now), 's')).astype(np.float64)
+    return np.maximum(seconds / SECONDS_PER_YEAR, MIN_YEARS)
+
+
+def _pdf(x):
+    return np.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+
+class GreeksBook:
+    """Greeks de tous les contrats suivis en une passe vectorisée
+
+    Les termes qui ne dépendent pas du spot (log strike, σ√t, dérive,
+    facteurs d'actualisation) sont mis en cache: tant que les contrats,
+    les vols et l'heure de valorisation (arrondie à time_step secondes)
+    ne changent pas, un nouveau spot ne recalcule que d1/d2 et les lois
+    normales. Vega par point de vol (0.01), theta par jour calendaire.
+    """
+
+    def __init__(self, rate=0.04, dividend=0.0, time_step=60.0):
+        self.rate = rate
+        self.dividend = dividend
+        self.time_step = time_step
+        self.symbols = []
+        self.qty = np.zeros(0)
+        self.multiplier = np.zeros(0)
+        self.strike = np.zeros(0)
+        self.kind = np.zeros(0, dtype=np.int8)
+        self.expiry = np.zeros(0, dtype='datetime64[D]')
+        self.vol = np.zeros(0)
+        self.rebuilds = 0
+        self.reprices = 0
+        self.last = None
+        self._cache = None
+        self._cache_key = None
+
+    def set_contracts(self, symbols, strike, kind, expiry, vol, qty, multiplier=CONTRACT_MULTIPLIER):
+        """Remplace les contrats suivis (positions et contrats d'intérêt, qty 0)"""
+        self.symbols = list(symbols)
+        self.strike = np.asarray(strike, dtype=np.float64)
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.expiry = np.asarray(expiry, dtype='datetime64[D]')
+        self.qty = np.asarray(qty, dtype=np.float64)
+        self.multiplier = np.broadcast_to(np.asarray(multiplier, dtype=np.float64), self.strike.shape).copy()
+        # Strikes et échéances changent: le cache est toujours invalidé, même à vols égales
+        self.vol = np.asarray(vol, dtype=np.float64).copy()
+        self._cache_key = None
+
+    def set_vols(self, vol):
+        """Met à jour les vols implicites des mêmes contrats (invalide le cache si elles changent)"""
+        vol = np.asarray(vol, dtype=np.float64)
+        if self._cache is None or len(vol) != len(self.vol) or not np.array_equal(vol, self.vol, equal_nan=True):
+            self.vol = vol.copy()
+            self._cache_key = None
+
+    def _intermediates(self, now):
+        key = int(now // self.time_step)
+        if key == self._cache_key:
+            return self._cache
+        t = year_fractions(self.expiry, key * self.time_step)
+        sqrt_t = np.sqrt(t)
+        with np.errstate(invalid='ignore'):
+            vol_sqrt_t = np.where(self.vol > 0, self.vol * sqrt_t, np.nan)
+        disc_r = np.exp(-self.rate * t)
+        disc_q = np.exp(-self.dividend * t)
+        self._cache = {
+            't': t,
+            'sqrt_t': sqrt_t,
+            'log_strike': np.log(self.strike),
+            'vol_sqrt_t': vol_sqrt_t,
+            'drift': (self.rate - self.dividend + 0.5 * self.vol * self.vol) * t,
+            'disc_r': disc_r,
+            'disc_q': disc_q,
+            'strike_disc': self.strike * disc_r,
+        }
+        self._cache_key = key
+        self.rebuilds += 1
+        return self._cache
+
+    def greeks(self, spot, now=None):
+        """Prix, delta, gamma, vega, theta par contrat (unitaires, NaN sans vol)"""
+        c = self._intermediates(time.time() if now is None else now)
+        self.reprices += 1
+        k = self.kind.astype(np.float64)
+        d1 = (math.log(spot) - c['log_strike'] + c['drift']) / c['vol_sqrt_t']
+        d2 = d1 - c['vol_sqrt_t']
+        n1 = ndtr(k * d1)
+        n2 = ndtr(k * d2)
+        pdf = _pdf(d1)
+        spot_q = spot * c['disc_q']
+        theta = (-spot_q * pdf * self.vol / (2 * c['sqrt_t'])
+                 - k * self.rate * c['strike_disc'] * n2
+                 + k * self.dividend * spot_q * n1)
+        return {
+            'price': k * (spot_q * n1 - c['strike_disc'] * n2),
+            'delta': k * c['disc_q'] * n1,
+            'gamma': c['disc_q'] * pdf / (spot * c['vol_sqrt_t']),
+            'vega': spot_q * pdf * c['sqrt_t'] / 100,
+            'theta': theta / 365,
+        }
+
+    def exposures(self, spot, now=None, stock_qty=0.0):
+        """Expositions du portefeuille (options pondérées par qty x multiplicateur, plus actions)
+
+        delta en actions et en dollars, gamma en actions par dollar et en
+        dollars de delta pour 1% de spot, vega en dollars par point de vol,
+        theta en dollars par jour.
+        """
+        g = self.greeks(spot, now)
+        size = self.qty * self.multiplier
+        held = size != 0
+        priced = held & np.isfinite(g['delta'])
+        weights = np.where(priced, size, 0.0)
+        delta = float(np.dot(weights, np.nan_to_num(g['delta']))) + float(stock_qty)
+        gamma = float(np.dot(weights, np.nan_to_num(g['gamma'])))
+        self.last = {
+            'spot': float(spot),
+            'delta': delta,
+            'delta_dollars': delta * spot,
+            'gamma': gamma,
+            'gamma_dollars_1pct': gamma * spot * spot / 100,
+            'vega': float(np.dot(weights, np.nan_to_num(g['vega']))),
+            'theta': float(np.dot(weights, np.nan_to_num(g['theta']))),
+            'option_value': float(np.dot(weights, np.nan_to_num(g['price']))),
+            'positions': int(held.sum()),
+            'unpriced_positions': int((held & ~priced).sum()),
+            'contracts': {s: {name: float(g[name][i]) for name in ('delta', 'gamma', 'vega', 'theta')}
+                          for i, s in enumerate(self.symbols)},
+        }
+        return self.last
@@ -0,0 +1,172 @@
+# Robustesse de la stratégie: block bootstrap et perturbation des IV, en parallèle
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from performance import PERIODS_PER_YEAR
+
+# Mémoire visée par bloc de chemins (tableau chemins x barres et temporaires)
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+METRICS = ('sharpe_ratio', 'max_drawdown', 'cumulative_return')
+
+
+def default_block_length(n):
+    """Longueur de bloc usuelle n^(1/3), au moins 1"""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+def block_bootstrap_indices(n, n_paths, block, rng):
+    """Indices (n_paths x n) d'un moving block bootstrap circulaire
+
+    Chaque chemin est une concaténation de blocs de block barres
+    consécutives tirés au hasard (avec retour au début de la série), ce
+    qui préserve l'autocorrélation à court terme des rendements.
+    """
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    indices = (starts[:, :, None] + np.arange(block)) % n
+    return indices.reshape(n_paths, n_blocks * block)[:, :n]
+
+
+def path_metrics(returns, periods_per_year=PERIODS_PER_YEAR):
+    """Sharpe, drawdown max et rendement cumulé de chaque ligne (chemins x barres)
+
+    Mêmes définitions que batch_performance: NaN ignorés, moments ddof=1,
+    equity cumulée depuis 1, pic initial à 1.
+    """
+    n_paths = len(returns)
+    valid = ~np.isnan(returns)
+    r0 = np.where(valid, returns, 0.0)
+    n = valid.sum(axis=1)
+    mean = np.divide(r0.sum(axis=1), n, out=np.full(n_paths, np.nan), where=n > 0)
+    dev = np.where(valid, returns - mean[:, None], 0.0)
+    var = np.divide((dev * dev).sum(axis=1), n - 1, out=np.full(n_paths, np.nan), where=n > 1)
+    std = np.sqrt(var)
+    sharpe = np.divide(mean, std, out=np.zeros(n_paths), where=std > 0) * math.sqrt(periods_per_year)
+    equity = np.cumprod(1 + r0, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    max_drawdown = np.minimum((equity / peak - 1).min(axis=1), 0.0)
+    return {'sharpe_ratio': sharpe, 'max_drawdown': max_drawdown, 'cumulative_return': equity[:, -1] - 1}
+
+
+def _bootstrap_chunk(returns, seed, n_paths, block, periods_per_year):
+    """Tâche d'un worker: n_paths chemins bootstrap et leurs métriques"""
+    rng = np.random.default_rng(seed)
+    paths = returns[block_bootstrap_indices(len(returns), n_paths, block, rng)]
+    return path_metrics(paths, periods_per_year)
+
+
+def _perturbation_chunk(data, compute, seed, n_paths, noise, periods_per_year):
+    """Tâche d'un worker: IV put/call bruitées (lognormal), stratégie recalculée"""
+    rng = np.random.default_rng(seed)
+    returns = np.empty((n_paths, len(data)))
+    for i in range(n_paths):
+        shocked = data.copy()
+        for column in ('put25_IV', 'call25_IV'):
+            shocked[column] = data[column].to_numpy() * np.exp(noise * rng.standard_normal(len(data)))
+        returns[i] = compute(shocked)['strategy_return'].to_numpy()
+    return path_metrics(returns, periods_per_year)
+
+
+def _chunks(n_paths, paths_per_chunk, seed):
+    """Découpe en blocs de chemins, une graine indépendante par bloc (SeedSequence)
+
+    Les résultats ne dépendent que de seed et paths_per_chunk, pas du
+    nombre de workers.
+    """
+    sizes = [min(paths_per_chunk, n_paths - start) for start in range(0, n_paths, paths_per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(seeds, sizes))
+
+
+def _run(task, args_list, max_workers):
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(args_list) == 1:
+        return [task(*args) for args in args_list]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(args_list))) as executor:
+        return list(executor.map(task, *zip(*args_list)))
+
+
+def _merge(results):
+    return {m: np.concatenate([r[m] for r in results]) for m in METRICS}
+
+
+def confidence_intervals(samples, point=None, confidence=0.95):
+    """Intervalles de confiance (percentiles) par métrique, en DataFrame"""
+    alpha = (1 - confidence) / 2
+    rows = {}
+    for metric, values in samples.items():
+        values = values[np.isfinite(values)]
+        rows[metric] = {
+            'point': (point or {}).get(metric, np.nan),
+            'mean': values.mean() if len(values) else np.nan,
+            'median': np.median(values) if len(values) else np.nan,
+            'low': np.quantile(values, alpha) if len(values) else np.nan,
+            'high': np.quantile(values, 1 - alpha) if len(values) else np.nan,
+            'p_positive': (values > 0).mean() if len(values) else np.nan,
+        }
+    return pd.DataFrame(rows).T
+
+
+def bootstrap_returns(returns, n_paths=5000, block=None, seed=0, max_workers=None,
+                      chunk_bytes=DEFAULT_CHUNK_BYTES, periods_per_year=PERIODS_PER_YEAR):
+    """Métriques de n_paths chemins block bootstrap des rendements (NaN ignorés)
+
+    Les chemins sont générés par blocs 2-D (chemins x barres) dimensionnés
+    pour tenir dans chunk_bytes, répartis sur un pool de process.
+    Retourne {métrique: tableau de n_paths valeurs}.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    r = r[~np.isnan(r)]
+    if len(r) < 2:
+        raise ValueError("Au moins deux rendements sont nécessaires au bootstrap")
+    block = block or default_block_length(len(r))
+    # Indices, chemins et temporaires de path_metrics: ~8 tableaux chemins x barres
+    paths_per_chunk = max(1, min(n_paths, chunk_bytes // (len(r) * 8 * 8)))
+    args = [(r, s, size, block, periods_per_year) for s, size in _chunks(n_paths, paths_per_chunk, seed)]
+    return _merge(_run(_bootstrap_chunk, args, max_workers))
+
+
+def perturb_iv(data, compute, n_paths=200, noise=0.02, seed=0, max_workers=None,
+               paths_per_chunk=25, periods_per_year=PERIODS_PER_YEAR):
+    """Métriques de la stratégie recalculée sur des IV bruitées
+
+    Chaque chemin multiplie put25_IV et call25_IV par exp(noise * N(0, 1))
+    puis rappelle compute (calculate_iv_spread_metrics), qui doit être
+    importable par les workers.
+    """
+    inputs = data[['put25_IV', 'call25_IV', 'underlying']].copy()
+    args = [(inputs, compute, s, size, noise, periods_per_year)
+            for s, size in _chunks(n_paths, paths_per_chunk, seed)]
+    return _merge(_run(_perturbation_chunk, args, max_workers))
+
+
+def robustness_report(data, n_paths=5000, block=None, confidence=0.95, iv_paths=0, iv_noise=0.02,
+                      compute=None, seed=0, max_workers=None):
+    """Intervalles de confiance du Sharpe, du drawdown et du rendement cumulé
+
+    data est le dataset de la stratégie (strategy_return, et les entrées
+    put25_IV/call25_IV/underlying si iv_paths > 0). Retourne un dict de
+    DataFrames ('bootstrap', 'iv_perturbation' optionnel) et les durées.
+    """
+    returns = data['strategy_return'].to_numpy(dtype=np.float64)
+    point = {m: v[0] for m, v in path_metrics(returns[None, :]).items()}
+
+    report = {}
+    start = time.perf_counter()
+    samples = bootstrap_returns(returns, n_paths=n_paths, block=block, seed=seed, max_workers=max_workers)
+    report['bootstrap'] = confidence_intervals(samples, point, confidence)
+    report['bootstrap_seconds'] = time.perf_counter() - start
+
+    if iv_paths:
+        if compute is None:
+            raise ValueError("compute est requis pour la perturbation des IV")
+        start = time.perf_counter()
+        samples = perturb_iv(data, compute, n_paths=iv_paths, noise=iv_noise, seed=seed, max_workers=max_workers)
+        report['iv_perturbation'] = confidence_intervals(samples, point, confidence)
+        report['iv_perturbation_seconds'] = time.perf_counter() - start
+    return report
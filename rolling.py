@@ -0,0 +1,181 @@
+# Noyau de statistiques glissantes multi-fenêtres en une passe
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Taille minimale des blocs de sommes cumulées (voir block_size)
+MIN_BLOCK = 256
+
+# Rapport termes sommés / variance au-delà duquel l'écart-type est recalculé directement
+ILL_CONDITIONED = 1e6
+
+
+def _allocate(out, key, n):
+    """Tableau de sortie préalloué (out[key]) ou nouveau tableau"""
+    if out is not None and key in out and len(out[key]) >= n:
+        return out[key][:n]
+    array = np.empty(n)
+    if out is not None:
+        out[key] = array
+    return array
+
+
+def block_size(windows):
+    """Taille des blocs de sommes cumulées pour ces fenêtres
+
+    Au moins aussi longs que la plus grande fenêtre: une fenêtre couvre au
+    plus deux blocs. Les résultats d'une ligne ne dépendent que des blocs
+    qu'elle couvre: recalculer une série tronquée à une frontière de bloc
+    donne exactement les mêmes valeurs (voir incremental_metrics).
+    """
+    return max([MIN_BLOCK] + [int(w) for w in windows])
+
+
+def _block_sums(x, nan, block):
+    """Sommes cumulées (x - c) et (x - c)² redémarrées à chaque bloc
+
+    c est la moyenne du bloc: les sommes restent de l'ordre de grandeur
+    d'un bloc, quelle que soit la longueur de la série (pas d'erreur
+    d'arrondi accumulée sur tout l'historique).
+    """
+    n = len(x)
+    blocks = -(-n // block)
+    padded = np.zeros(blocks * block)
+    padded[:n] = np.where(nan, 0.0, x)
+    valid = np.zeros(blocks * block)
+    valid[:n] = ~nan
+    padded = padded.reshape(blocks, block)
+    valid = valid.reshape(blocks, block)
+    counts = valid.sum(axis=1)
+    centers = np.divide(padded.sum(axis=1), counts, out=np.zeros(blocks), where=counts > 0)
+    xc = (padded - centers[:, None]) * valid
+    local1 = np.cumsum(xc, axis=1)
+    local2 = np.cumsum(xc * xc, axis=1)
+    return centers, local1.ravel()[:n], local2.ravel()[:n], local1[:, -1], local2[:, -1]
+
+
+def _window_extrema(x, w, is_min):
+    """Min/max glissant en O(n) (van Herk/Gil-Werman)
+
+    Préfixes et suffixes cumulés par blocs de w valeurs: la fenêtre
+    [i-w+1, i] est couverte exactement par le suffixe de son premier bloc
+    et le préfixe de son dernier. Un NaN se propage donc aux seules
+    fenêtres qui le contiennent, comme avec pandas.
+    """
+    n = len(x)
+    blocks = -(-n // w)
+    fill = np.inf if is_min else -np.inf
+    padded = np.full(blocks * w, fill)
+    padded[:n] = x
+    padded = padded.reshape(blocks, w)
+    accumulate = np.minimum.accumulate if is_min else np.maximum.accumulate
+    prefix = accumulate(padded, axis=1).ravel()[:n]
+    suffix = accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    combine = np.minimum if is_min else np.maximum
+    return combine(suffix[:n - w + 1], prefix[w - 1:])
+
+
+def rolling_stats(values, means=(), stds=(), mins=(), maxs=(), out=None):
+    """Moyennes, écarts-types (ddof=1), minima et maxima glissants de plusieurs fenêtres
+
+    Même convention que pandas rolling(w) (min_periods=w): NaN tant que la
+    fenêtre n'est pas pleine ou si elle contient un NaN. Les moyennes et
+    écarts-types de toutes les fenêtres sont tirés des mêmes sommes
+    cumulées, calculées une seule fois par blocs centrés (voir
+    _block_sums). Une fenêtre constante a exactement sa valeur pour
+    moyenne et un écart-type nul.
+
+    Précision: les résultats restent à quelques 1e-14 (relatif) d'un
+    calcul exact en deux passes par fenêtre, et égalent pandas à 1e-10
+    près partout où pandas est lui-même exact. pandas, dont les sommes
+    glissantes sont mises à jour valeur par valeur, peut s'en écarter
+    davantage (écart-type résiduel sur un plateau, dérive jusqu'à ~1e-8
+    après un plateau sur une série de niveau 1e4): la référence de
+    comparaison est alors le calcul exact.
+
+    Retourne un dict {('mean', w): tableau, ('std', w): ..., ('min', w):
+    ..., ('max', w): ...}. Si out est fourni, les tableaux qu'il contient
+    (mêmes clés) sont remplis sur place.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    results = {}
+
+    nan = np.isnan(x)
+    has_nan = bool(nan.any())
+    windows = sorted({int(w) for w in means} | {int(w) for w in stds})
+    windows_ok = [w for w in windows if 0 < w <= n]
+    if windows_ok:
+        block = block_size(windows)
+        centers, local1, local2, total1, total2 = _block_sums(x, nan, block)
+        index = np.arange(n)
+        block_of = index // block
+        # Somme locale avant l'indice (0 en début de bloc)
+        before1 = np.where(index % block == 0, 0.0, np.concatenate(([0.0], local1[:-1])))
+        before2 = np.where(index % block == 0, 0.0, np.concatenate(([0.0], local2[:-1])))
+        nan_count = np.concatenate(([0], np.cumsum(nan))) if has_nan else None
+        # Longueur de la série de valeurs égales qui se termine en i
+        same = np.concatenate(([False], x[1:] == x[:-1]))
+        starts = np.where(~same, index, 0)
+        run = index - np.maximum.accumulate(starts) + 1
+
+    for w in windows:
+        if 0 < w <= n:
+            end = index[w - 1:]
+            start = end - w + 1
+            last, first = block_of[end], block_of[start]
+            center = centers[last]
+            spans = first != last
+            # Partie dans le bloc de fin, relative à son centre
+            sums = local1[end] - np.where(spans, 0.0, before1[start])
+            sumsq = local2[end] - np.where(spans, 0.0, before2[start])
+            # Partie dans le bloc précédent, recentrée sur le centre du bloc de fin
+            head = (last * block - start) * spans
+            head1 = np.where(spans, total1[first] - before1[start], 0.0)
+            head2 = np.where(spans, total2[first] - before2[start], 0.0)
+            shift = centers[first] - center
+            sums = sums + head1 + head * shift
+            # Ordre de grandeur des termes sommés, pour détecter la cancellation
+            magnitude = sumsq + head2 + head * shift * shift
+            sumsq = sumsq + head2 + 2 * shift * head1 + head * shift * shift
+            invalid = (nan_count[w:] - nan_count[:-w]) > 0 if has_nan else None
+        else:
+            sums = None
+
+        if w in means:
+            mean = _allocate(out, ('mean', w), n)
+            mean[:] = np.nan
+            if sums is not None:
+                mean[w - 1:] = sums / w + center
+                constant = run[w - 1:] >= w
+                mean[w - 1:][constant] = x[w - 1:][constant]
+                if invalid is not None:
+                    mean[w - 1:][invalid] = np.nan
+            results[('mean', w)] = mean
+
+        if w in stds:
+            std = _allocate(out, ('std', w), n)
+            std[:] = np.nan
+            if sums is not None and w > 1:
+                var = (sumsq - sums * sums / w) / (w - 1)
+                # Fenêtres mal conditionnées (variance infime devant l'écart au
+                # centre du bloc): recalcul direct en deux passes
+                ill = np.flatnonzero(magnitude > ILL_CONDITIONED * np.maximum(var * (w - 1), 1e-300))
+                if len(ill):
+                    windows_view = sliding_window_view(x, w)[ill]
+                    var[ill] = windows_view.var(axis=1, ddof=1)
+                var = np.maximum(var, 0.0)
+                var[run[w - 1:] >= w] = 0.0
+                std[w - 1:] = np.sqrt(var)
+                if invalid is not None:
+                    std[w - 1:][invalid] = np.nan
+            results[('std', w)] = std
+
+    for kind, windows in (('min', mins), ('max', maxs)):
+        for w in windows:
+            w = int(w)
+            array = _allocate(out, (kind, w), n)
+            array[:] = np.nan
+            if 0 < w <= n:
+                array[w - 1:] = _window_extrema(x, w, kind == 'min')
+            results[(kind, w)] = array
+    return results
@@ -0,0 +1,168 @@
+# Planificateur de cycles aligné sur l'horloge et sur les heures de marché
+import logging
+import math
+import time
+
+import pandas as pd
+
+MARKET_TZ = 'America/New_York'
+
+
+def _epoch(value):
+    """Convertit un horodatage Alpaca (chaîne ISO ou Timestamp) en secondes epoch"""
+    return pd.Timestamp(value).timestamp()
+
+
+class CycleScheduler:
+    """Déclenche les cycles sur des frontières fixes de l'horloge murale
+
+    La période réelle ne dérive pas avec la durée des cycles: on dort
+    jusqu'à la prochaine frontière (multiple de period). Un cycle qui
+    déborde fait sauter les frontières manquées, comptabilisées dans
+    skipped. Hors séance, le planificateur dort jusqu'à la prochaine
+    ouverture (horloge Alpaca mise en cache). Optionnellement, la période
+    est réduite à fast_period autour de l'ouverture et de la clôture.
+    """
+
+    def __init__(self, get_clock=None, get_calendar=None, period=60, fast_period=None, fast_window=900,
+                 clock_ttl=300, market_hours_only=True, max_sleep=300,
+                 time_fn=time.time, sleep_fn=time.sleep, heartbeat=None):
+        self.get_clock = get_clock
+        self.get_calendar = get_calendar
+        self.period = period
+        self.fast_period = fast_period
+        self.fast_window = fast_window
+        self.clock_ttl = clock_ttl
+        self.market_hours_only = market_hours_only and get_clock is not None
+        self.max_sleep = max_sleep
+        self._time = time_fn
+        self._sleep = sleep_fn
+        self.heartbeat = heartbeat
+
+        self._clock = None
+        self._clock_expires = 0.0
+        self._session = None
+        self.cycles = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.last_start = None
+        self.last_duration = None
+        self.last_lateness = None
+        self._deadline = None
+
+    # ---------- Horloge de marché ----------
+    def market_clock(self):
+        """État du marché (is_open, next_open, next_close en epoch), mis en cache"""
+        now = self._time()
+        if self._clock is not None and now < self._clock_expires:
+            return self._clock
+        try:
+            clock = self.get_clock()
+            state = {
+                'is_open': bool(clock.is_open),
+                'next_open': _epoch(clock.next_open),
+                'next_close': _epoch(clock.next_close),
+            }
+        except Exception as e:
+            logging.warning(f"Horloge de marché indisponible: {e}")
+            # Sans horloge on considère le marché ouvert pour ne pas bloquer le bot
+            return {'is_open': True, 'next_open': None, 'next_close': None}
+
+        # Le cache expire au plus tard au prochain changement d'état du marché
+        transition = state['next_close'] if state['is_open'] else state['next_open']
+        self._clock = state
+        self._clock_expires = min(now + self.clock_ttl, transition)
+        return state
+
+    def session_open(self, clock):
+        """Heure d'ouverture (epoch) de la séance en cours, via le calendrier (cache journalier)"""
+        if clock.get('next_close') is None:
+            return None
+        session_day = pd.Timestamp(clock['next_close'], unit='s', tz='UTC').tz_convert(MARKET_TZ).date()
+        if self._session is not None and self._session[0] == session_day:
+            return self._session[1]
+
+        # Séance standard par défaut: 6h30 avant la clôture
+        opened = clock['next_close'] - 6.5 * 3600
+        if self.get_calendar is not None:
+            try:
+                day = session_day.isoformat()
+                calendar = self.get_calendar(start=day, end=day)
+                if calendar:
+                    opened = pd.Timestamp(f"{day} {calendar[0].open}").tz_localize(MARKET_TZ).timestamp()
+            except Exception as e:
+                logging.warning(f"Calendrier de marché indisponible: {e}")
+        self._session = (session_day, opened)
+        return opened
+
+    def current_period(self, clock=None):
+        """Période applicable (réduite autour de l'ouverture/la clôture)"""
+        if not self.fast_period or not clock or not clock.get('is_open'):
+            return self.period
+        now = self._time()
+        near_close = clock['next_close'] is not None and clock['next_close'] - now <= self.fast_window
+        opened = self.session_open(clock)
+        near_open = opened is not None and 0 <= now - opened <= self.fast_window
+        return self.fast_period if near_open or near_close else self.period
+
+    # ---------- Attente ----------
+    def _sleep_until(self, target):
+        while True:
+            remaining = target - self._time()
+            if remaining <= 0:
+                return
+            # Signe de vie pendant les longues attentes (monitoring)
+            if self.heartbeat is not None:
+                self.heartbeat(target)
+            self._sleep(min(remaining, self.max_sleep))
+
+    def _next_boundary(self, now, period):
+        return math.floor(now / period) * period + period
+
+    def wait(self):
+        """Attend le prochain cycle et retourne l'heure de début planifiée"""
+        clock = self.market_clock() if self.market_hours_only else None
+
+        if clock and not clock['is_open'] and clock['next_open'] is not None:
+            logging.info(f"Marché fermé, reprise à l'ouverture ({pd.Timestamp(clock['next_open'], unit='s')} UTC)")
+            self._sleep_until(clock['next_open'])
+            self._deadline = None
+            clock = self.market_clock()
+
+        period = self.current_period(clock)
+        now = self._time()
+        if self._deadline is None:
+            self._deadline = self._next_boundary(now, period) if self.cycles else now
+        elif now > self._deadline + min(1.0, 0.05 * period):
+            # Cycle précédent trop long: on saute les frontières manquées
+            target = self._next_boundary(now, period)
+            missed = max(1, round((target - self._deadline) / period))
+            self.skipped += missed
+            self.overruns += 1
+            logging.warning(f"Dépassement de cycle: {missed} cycle(s) sauté(s)")
+            self._deadline = target
+
+        self._sleep_until(self._deadline)
+        start = self._time()
+        self.last_lateness = start - self._deadline
+        self.last_start = start
+        # Le cycle suivant tombe sur la frontière suivante (réalignée si la période change)
+        self._deadline = self._next_boundary(self._deadline, period)
+        return start
+
+    def cycle_done(self):
+        """Enregistre la durée du cycle qui vient de se terminer"""
+        self.cycles += 1
+        if self.last_start is not None:
+            self.last_duration = self._time() - self.last_start
+        return self.last_duration
+
+    def stats(self):
+        return {
+            'cycles': self.cycles,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'last_duration': self.last_duration,
+            'last_lateness': self.last_lateness,
+            'next_deadline': self._deadline,
+        }
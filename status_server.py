@@ -0,0 +1,191 @@
+# Endpoint HTTP de statut et de santé du bot (thread d'arrière-plan)
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limite Alpaca par défaut: 200 requêtes par minute
+API_BUDGET_PER_MINUTE = 200
+
+
+class ApiBudget:
+    """Compte les appels API sur une fenêtre glissante d'une minute"""
+
+    def __init__(self, limit=API_BUDGET_PER_MINUTE, window=60.0):
+        self.limit = limit
+        self.window = window
+        self.total = 0
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def record(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.total += 1
+            self._calls.append(now)
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._calls and now - self._calls[0] > self.window:
+            self._calls.popleft()
+
+    def used(self):
+        with self._lock:
+            self._trim(time.time())
+            return len(self._calls)
+
+
+class MeteredClient:
+    """Proxy d'un client API qui décompte chaque appel dans un ApiBudget"""
+
+    def __init__(self, client, budget):
+        self._client = client
+        self._budget = budget
+
+    def __getattr__(self, method):
+        target = getattr(self._client, method)
+        if not callable(target):
+            return target
+
+        def call(*args, **kwargs):
+            self._budget.record()
+            return target(*args, **kwargs)
+
+        return call
+
+
+class BotStatus:
+    """État courant du bot partagé entre la boucle principale et le serveur HTTP"""
+
+    def __init__(self, stale_after=300, budget=None):
+        self.stale_after = stale_after
+        self.budget = budget or ApiBudget()
+        self.started_at = time.time()
+        self.stage = 'startup'
+        self._lock = threading.Lock()
+        self._state = {
+            'cycle': 0,
+            'last_cycle_ts': None,
+            'cycle_duration': None,
+            'signal': None,
+            'position_size': None,
+            'spread_iv': None,
+            'trade_result': None,
+        }
+        self._errors = {}
+        self._extra = {}
+        self._heartbeat = None
+        self.waiting_until = None
+
+    def set_stage(self, stage):
+        """Étape en cours du cycle (utilisée pour classer les erreurs)"""
+        self.stage = stage
+
+    def update(self, **values):
+        with self._lock:
+            self._state.update(values)
+
+    def set_extra(self, name, provider):
+        """Ajoute une section calculée à la demande (ex: mémoire, planificateur)"""
+        with self._lock:
+            self._extra[name] = provider
+
+    def heartbeat(self, waiting_until=None):
+        """Signe de vie de la boucle principale pendant une attente"""
+        self._heartbeat = time.time()
+        self.waiting_until = waiting_until
+        self.stage = 'waiting'
+
+    def record_error(self, message, stage=None):
+        stage = stage or self.stage
+        with self._lock:
+            self._errors[stage] = {'ts': time.time(), 'message': str(message)}
+
+    def healthy(self, now=None):
+        """Sain si un cycle ou un signe de vie est récent (ou si le bot vient de démarrer)
+
+        Un cycle bloqué n'émet plus de signe de vie et devient donc non sain
+        après stale_after secondes.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            last = self._state['last_cycle_ts']
+        reference = max(last or self.started_at, self._heartbeat or 0)
+        return now - reference <= self.stale_after
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            state = dict(self._state)
+            errors = {k: dict(v) for k, v in self._errors.items()}
+            extra = dict(self._extra)
+        state.update({
+            'healthy': self.healthy(now),
+            'stage': self.stage,
+            'uptime': now - self.started_at,
+            'seconds_since_cycle': now - state['last_cycle_ts'] if state['last_cycle_ts'] else None,
+            'waiting_until': self.waiting_until if self.stage == 'waiting' else None,
+            'last_errors': errors,
+            'api_calls_last_minute': self.budget.used(),
+            'api_budget_per_minute': self.budget.limit,
+            'api_calls_total': self.budget.total,
+        })
+        for name, provider in extra.items():
+            try:
+                state[name] = provider()
+            except Exception as e:
+                state[name] = {'error': str(e)}
+        return state
+
+
+class StatusLogHandler(logging.Handler):
+    """Handler de logging qui remonte les erreurs dans BotStatus, par étape"""
+
+    def __init__(self, status, level=logging.ERROR):
+        super().__init__(level)
+        self.status = status
+
+    def emit(self, record):
+        try:
+            self.status.record_error(record.getMessage())
+        except Exception:
+            pass
+
+
+def _make_handler(status):
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/health'):
+                healthy = status.healthy()
+                body = {'healthy': healthy}
+                code = 200 if healthy else 503
+            elif self.path.startswith('/status'):
+                body = status.snapshot()
+                code = 200
+            else:
+                body = {'error': 'not found'}
+                code = 404
+            payload = json.dumps(body, default=str).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # Pas de bruit dans les logs pour chaque requête de monitoring
+            pass
+
+    return StatusHandler
+
+
+def start_status_server(status, host='127.0.0.1', port=8765):
+    """Démarre le serveur /status et /health dans un thread démon"""
+    server = ThreadingHTTPServer((host, port), _make_handler(status))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='status-server', daemon=True)
+    thread.start()
+    logging.info(f"Endpoint de statut: http://{host}:{server.server_address[1]}/status")
+    return server
@@ -0,0 +1,231 @@
+# Index de strikes trié et persistant par sous-jacent
+import numpy as np
+
+from memory_monitor import BoundedCache
+from option_chain import SYMBOL_TABLE, TYPE_CALL, TYPE_PUT
+
+
+class _StrikeBucket:
+    """Strikes triés d'un type (et éventuellement d'une échéance) avec leurs symboles"""
+
+    __slots__ = ('strikes', 'symbol_idx', 'expiry')
+
+    def __init__(self):
+        self.strikes = np.empty(0, dtype=np.float64)
+        self.symbol_idx = np.empty(0, dtype=np.int32)
+        self.expiry = np.empty(0, dtype='datetime64[D]')
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def insert(self, strikes, symbol_idx, expiry):
+        """Insère des contrats en conservant l'ordre des strikes (O(n + m))"""
+        order = np.argsort(strikes, kind='stable')
+        strikes, symbol_idx, expiry = strikes[order], symbol_idx[order], expiry[order]
+        pos = np.searchsorted(self.strikes, strikes, side='right')
+        self.strikes = np.insert(self.strikes, pos, strikes)
+        self.symbol_idx = np.insert(self.symbol_idx, pos, symbol_idx)
+        self.expiry = np.insert(self.expiry, pos, expiry)
+
+    def keep(self, mask):
+        """Ne conserve que les contrats du masque"""
+        self.strikes = self.strikes[mask]
+        self.symbol_idx = self.symbol_idx[mask]
+        self.expiry = self.expiry[mask]
+
+    def nearest(self, price):
+        """Position du strike le plus proche (bisection)"""
+        n = len(self.strikes)
+        if n == 0:
+            return None
+        pos = int(np.searchsorted(self.strikes, price))
+        if pos == 0:
+            return 0
+        if pos == n:
+            return n - 1
+        # À égalité de distance, le strike inférieur l'emporte
+        return pos - 1 if price - self.strikes[pos - 1] <= self.strikes[pos] - price else pos
+
+    def between(self, low, high):
+        """Tranche [début, fin) des strikes dans [low, high]"""
+        start = int(np.searchsorted(self.strikes, low, side='left'))
+        stop = int(np.searchsorted(self.strikes, high, side='right'))
+        return start, stop
+
+    def k_nearest(self, price, k):
+        """Positions des k strikes les plus proches, du plus proche au plus éloigné"""
+        n = len(self.strikes)
+        right = int(np.searchsorted(self.strikes, price))
+        left = right - 1
+        result = []
+        while len(result) < k and (left >= 0 or right < n):
+            if right >= n or (left >= 0 and price - self.strikes[left] <= self.strikes[right] - price):
+                result.append(left)
+                left -= 1
+            else:
+                result.append(right)
+                right += 1
+        return result
+
+
+class StrikeIndex:
+    """Index de strikes d'un sous-jacent, trié par type et par échéance
+
+    Les requêtes (strike le plus proche, bande de moneyness, k plus proches)
+    se font par bisection. L'index est mis à jour incrémentalement: seuls
+    les nouveaux contrats sont insérés, les échéances passées et les
+    contrats disparus de la chaîne retirés.
+    """
+
+    def __init__(self, underlying, symbol_table=None):
+        self.underlying = underlying
+        self.symbol_table = symbol_table if symbol_table is not None else SYMBOL_TABLE
+        # (type, None) = toutes échéances confondues, (type, expiry) = une échéance
+        self._buckets = {}
+        self._known = set()
+        self.generation = self.symbol_table.generation
+
+    def __len__(self):
+        return len(self._known)
+
+    def _bucket(self, contract_type, expiry=None, create=False):
+        key = (contract_type, None if expiry is None else np.datetime64(expiry, 'D'))
+        bucket = self._buckets.get(key)
+        if bucket is None and create:
+            bucket = self._buckets[key] = _StrikeBucket()
+        return bucket
+
+    def _follow(self, chain):
+        """Adopte la table d'internement de la chaîne (table du hub, table vidée)
+
+        Les identifiants stockés ne valent que dans leur table et sa
+        génération: si l'une ou l'autre change, l'index est vidé.
+        """
+        if chain.symbol_table is not self.symbol_table or chain.generation != self.generation:
+            self._buckets.clear()
+            self._known.clear()
+            self.symbol_table = chain.symbol_table
+            self.generation = chain.generation
+
+    def add(self, chain):
+        """Ajoute les contrats de la chaîne absents de l'index, retourne leur nombre"""
+        if chain is None or len(chain) == 0:
+            return 0
+        self._follow(chain)
+        known = np.fromiter(self._known, dtype=np.int32, count=len(self._known))
+        new = ~np.isin(chain.symbol_idx, known)
+        if not new.any():
+            return 0
+
+        for contract_type in (TYPE_CALL, TYPE_PUT):
+            mask = new & (chain.type == contract_type)
+            if not mask.any():
+                continue
+            strikes, symbols, expiries = chain.strike[mask], chain.symbol_idx[mask], chain.expiry[mask]
+            self._bucket(contract_type, create=True).insert(strikes, symbols, expiries)
+            for expiry in np.unique(expiries):
+                sel = expiries == expiry
+                self._bucket(contract_type, expiry, create=True).insert(
+                    strikes[sel], symbols[sel], expiries[sel])
+
+        self._known.update(chain.symbol_idx[new].tolist())
+        return int(new.sum())
+
+    def expire(self, as_of):
+        """Retire les contrats dont l'échéance est antérieure à as_of"""
+        as_of = np.datetime64(as_of, 'D')
+        removed = 0
+        for key in list(self._buckets):
+            contract_type, expiry = key
+            bucket = self._buckets[key]
+            if expiry is None:
+                alive = bucket.expiry >= as_of
+                removed += int((~alive).sum())
+                self._known.difference_update(bucket.symbol_idx[~alive].tolist())
+                bucket.keep(alive)
+            elif expiry < as_of:
+                del self._buckets[key]
+        return removed
+
+    def prune(self, chain):
+        """Retire les contrats absents de la chaîne (retirés de la cote ou hors fenêtre de strikes)"""
+        if chain is None:
+            return 0
+        self._follow(chain)
+        present = np.unique(chain.symbol_idx)
+        removed = 0
+        for key in list(self._buckets):
+            bucket = self._buckets[key]
+            alive = np.isin(bucket.symbol_idx, present)
+            if alive.all():
+                continue
+            if key[1] is None:
+                removed += int((~alive).sum())
+                self._known.difference_update(bucket.symbol_idx[~alive].tolist())
+            bucket.keep(alive)
+            if key[1] is not None and not len(bucket):
+                del self._buckets[key]
+        return removed
+
+    def sync(self, chain, as_of=None):
+        """Met l'index à jour avec une nouvelle récupération de la chaîne
+
+        Les contrats échus ou absents de la chaîne sont retirés, les
+        nouveaux insérés: l'index reflète exactement la dernière chaîne.
+        """
+        if as_of is not None:
+            self.expire(as_of)
+        self.prune(chain)
+        return self.add(chain)
+
+    def expiries(self, contract_type):
+        """Échéances présentes pour un type de contrat"""
+        return sorted(expiry for t, expiry in self._buckets if t == contract_type and expiry is not None)
+
+    def nearest(self, price, contract_type, expiry=None):
+        """(strike, symbole) du contrat le plus proche du prix, ou None"""
+        bucket = self._bucket(contract_type, expiry)
+        if bucket is None:
+            return None
+        pos = bucket.nearest(price)
+        if pos is None:
+            return None
+        return float(bucket.strikes[pos]), self.symbol_table.lookup(bucket.symbol_idx[pos])
+
+    def band(self, price, contract_type, low, high, expiry=None):
+        """Contrats dont la moneyness K/S est dans [low, high]
+
+        Retourne (strikes, symboles) triés par strike.
+        """
+        bucket = self._bucket(contract_type, expiry)
+        if bucket is None:
+            return np.empty(0), []
+        start, stop = bucket.between(price * low, price * high)
+        return (bucket.strikes[start:stop],
+                [self.symbol_table.lookup(i) for i in bucket.symbol_idx[start:stop]])
+
+    def k_nearest(self, price, contract_type, k, expiry=None):
+        """Liste des k contrats (strike, symbole) les plus proches du prix"""
+        bucket = self._bucket(contract_type, expiry)
+        if bucket is None:
+            return []
+        return [(float(bucket.strikes[pos]), self.symbol_table.lookup(bucket.symbol_idx[pos]))
+                for pos in bucket.k_nearest(price, k)]
+
+
+# Index persistants entre les cycles, un par sous-jacent (LRU plafonné)
+MAX_INDEXES = 500
+_indexes = BoundedCache(MAX_INDEXES, name='strike_index')
+
+
+def stats():
+    """Nombre d'index persistants et de contrats indexés"""
+    return {'indexes': len(_indexes), 'contracts': sum(len(index) for index in _indexes.values())}
+
+
+def get_strike_index(underlying):
+    """Retourne l'index persistant du sous-jacent (créé au besoin)"""
+    index = _indexes.get(underlying)
+    if index is None:
+        index = _indexes[underlying] = StrikeIndex(underlying)
+    return index
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test du backtest événementiel du chemin live (courtier simulé)
+"""
+
+import os
+
+# main crée les clients Alpaca à l'import (aucune requête n'est envoyée)
+os.environ.setdefault('ALPACA_API_KEY', 'test')
+os.environ.setdefault('ALPACA_SECRET_KEY', 'test')
+
+import main  # noqa: E402
+from backtest import SimulatedBroker, run_backtest, simulate_ticks  # noqa: E402
+
+
+def test_lowered_threshold_trades():
+    ticks = simulate_ticks(days=3, seed=0)
+    broker = SimulatedBroker(latency=1.0)
+    report = run_backtest(ticks, broker, params={'ACCEL_THRESH': 0.0005})
+    assert report['errors'] == 0
+    assert report['orders'] > 0 and len(report['fills']) > 0
+    assert (report['fills']['delay'] >= 1.0).all()
+    # Paramètre de main restauré après le rejeu
+    assert main.ACCEL_THRESH == 0.001
+
+
+def test_live_defaults_never_trade():
+    report = run_backtest(simulate_ticks(days=1, seed=0))
+    assert report['orders'] == 0
+    assert (report['signal'] == 0).all()
+
+
+def main_tests():
+    print("🧪 Test du backtest")
+    print("=" * 50)
+    for test in (test_lowered_threshold_trades, test_live_defaults_never_trade):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main_tests()
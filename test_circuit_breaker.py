@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test des disjoncteurs par méthode et du cache négatif des endpoints
+"""
+
+from circuit_breaker import (BreakerClient, CircuitOpenError, EndpointUnavailable,
+                             CLOSED, HALF_OPEN, OPEN)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyClient:
+    """Client dont les méthodes échouent tant que errors[méthode] n'est pas vide"""
+
+    def __init__(self):
+        self.errors = {}
+        self.calls = {}
+
+    def _call(self, method):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        queue = self.errors.get(method)
+        if queue:
+            raise queue.pop(0)
+        return method
+
+    def get_latest_trade(self, symbol):
+        return self._call('get_latest_trade')
+
+    def get_bars(self, symbol):
+        return self._call('get_bars')
+
+    def submit_order(self, **order):
+        return self._call('submit_order')
+
+
+def make_client(**options):
+    clock = Clock()
+    raw = FlakyClient()
+    client = BreakerClient(raw, 'api', exempt=('submit_order',), time_fn=clock,
+                           failure_threshold=3, reset_timeout=30.0, max_reset_timeout=100.0,
+                           permanent_ttl=3600.0, **options)
+    return client, raw, clock
+
+
+def call_failing(fn, *args, **kwargs):
+    try:
+        fn(*args, **kwargs)
+    except CircuitOpenError:
+        raise
+    except Exception:
+        return True
+    return False
+
+
+def test_opens_after_threshold_per_method():
+    client, raw, clock = make_client()
+    raw.errors['get_latest_trade'] = [ConnectionError('timeout')] * 3
+    for _ in range(3):
+        assert call_failing(client.get_latest_trade, 'AAPL')
+    breaker = client.breakers['get_latest_trade']
+    assert breaker.state == OPEN
+    try:
+        client.get_latest_trade('AAPL')
+        assert False, "appel passé disjoncteur ouvert"
+    except CircuitOpenError:
+        pass
+    assert raw.calls['get_latest_trade'] == 3
+    assert breaker.short_circuits == 1
+    # Les autres méthodes ont leur propre disjoncteur
+    assert client.get_bars('AAPL') == 'get_bars'
+
+
+def test_half_open_allows_a_single_probe_and_backs_off():
+    client, raw, clock = make_client()
+    raw.errors['get_latest_trade'] = [ConnectionError('timeout')] * 4
+    for _ in range(3):
+        call_failing(client.get_latest_trade, 'AAPL')
+    breaker = client.breakers['get_latest_trade']
+
+    clock.now = 30.0
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    # Test raté: réouverture pour un délai doublé
+    breaker.record_failure(ConnectionError('timeout'))
+    assert breaker.state == OPEN
+    clock.now = 30.0 + 59.0
+    assert not breaker.allow()
+    clock.now = 30.0 + 60.0
+    assert breaker.allow()
+
+
+def test_success_resets_breaker():
+    client, raw, clock = make_client()
+    raw.errors['get_latest_trade'] = [ConnectionError('timeout')] * 4
+    for _ in range(3):
+        call_failing(client.get_latest_trade, 'AAPL')
+    clock.now = 30.0
+    call_failing(client.get_latest_trade, 'AAPL')
+    clock.now = 90.0
+    assert client.get_latest_trade('AAPL') == 'get_latest_trade'
+    breaker = client.breakers['get_latest_trade']
+    assert breaker.state == CLOSED and breaker.failures == 0
+    assert breaker._timeout == 30.0
+    assert client.stats() == {}
+
+
+def test_client_errors_do_not_count():
+    client, raw, clock = make_client()
+
+    class NotFound(Exception):
+        status_code = 404
+
+    raw.errors['get_latest_trade'] = [NotFound('position does not exist')] * 5
+    for _ in range(5):
+        assert call_failing(client.get_latest_trade, 'AAPL')
+    assert client.breakers['get_latest_trade'].state == CLOSED
+
+
+def test_permanent_error_ttl():
+    client, raw, clock = make_client()
+    raw.errors['get_bars'] = [Exception('subscription does not permit querying recent SIP data')]
+    assert call_failing(client.get_bars, 'AAPL')
+    breaker = client.breakers['get_bars']
+    assert breaker.state == OPEN and breaker.permanent
+    clock.now = 3599.0
+    try:
+        client.get_bars('AAPL')
+        assert False, "endpoint permanent rappelé avant la fin du TTL"
+    except CircuitOpenError:
+        pass
+    assert raw.calls['get_bars'] == 1
+    clock.now = 3600.0
+    assert client.get_bars('AAPL') == 'get_bars'
+    assert not breaker.permanent and breaker.state == CLOSED
+
+
+def test_missing_method_is_cached():
+    client, raw, clock = make_client()
+    assert not hasattr(client, 'get_option_quote')
+    try:
+        client.get_option_quote('AAPL')
+        assert False, "méthode absente appelée"
+    except EndpointUnavailable:
+        pass
+    assert client.stats()['get_option_quote']['permanent']
+
+
+def test_order_methods_are_exempt():
+    client, raw, clock = make_client()
+    raw.errors['submit_order'] = [ConnectionError('timeout')] * 5
+    for _ in range(5):
+        assert call_failing(client.submit_order, symbol='AAPL')
+    assert client.submit_order(symbol='AAPL') == 'submit_order'
+    assert raw.calls['submit_order'] == 6
+    assert 'submit_order' not in client.breakers
+
+
+def main():
+    print("🧪 Test des disjoncteurs API")
+    print("=" * 50)
+    for test in (test_opens_after_threshold_per_method, test_half_open_allows_a_single_probe_and_backs_off,
+                 test_success_resets_breaker, test_client_errors_do_not_count, test_permanent_error_ttl,
+                 test_missing_method_is_cached, test_order_methods_are_exempt):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
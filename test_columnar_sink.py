@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test de l'export colonnaire: lignes bufferisées écrites à l'arrêt par SIGTERM
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+from columnar_sink import query
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Même arrêt que le lancement du bot: main() sous try/finally shutdown(), SIGTERM -> SystemExit
+BOT = textwrap.dedent("""
+    import signal, sys, time
+    import main
+    from columnar_sink import ColumnarSink
+
+    signal.signal(signal.SIGTERM, main.handle_sigterm)
+    main.sink = ColumnarSink(sys.argv[1], batch_rows=1000, flush_seconds=3600)
+    try:
+        for cycle in range(1, 4):
+            main.sink.write('cycles', 'AAPL', {'cycle': cycle, 'price': 200.0 + cycle, 'signal': 0})
+        main.sink.write('orders', 'AAPL', {'cycle': 3, 'side': 'buy', 'qty': 10.0, 'order_id': 'o1',
+                                           'status': 'accepted'})
+        print(main.sink.pending(), flush=True)
+        while True:
+            time.sleep(0.1)
+    finally:
+        main.shutdown()
+""")
+
+
+def test_sigterm_flushes_buffered_rows():
+    if not hasattr(signal, 'SIGTERM') or os.name == 'nt':
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'columnar')
+        env = dict(os.environ, ALPACA_API_KEY='test', ALPACA_SECRET_KEY='test',
+                   PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')])))
+        bot = subprocess.Popen([sys.executable, '-c', BOT, root], cwd=tmp, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            assert bot.stdout.readline().strip() == '4', bot.stderr.read()
+            assert not os.path.exists(root)
+            bot.send_signal(signal.SIGTERM)
+            assert bot.wait(timeout=30) == 0, bot.stderr.read()
+        finally:
+            if bot.poll() is None:
+                bot.kill()
+            bot.stdout.close()
+            bot.stderr.close()
+
+        cycles = query(root, 'cycles')
+        assert sorted(cycles['cycle']) == [1, 2, 3]
+        orders = query(root, 'orders')
+        assert list(orders['order_id']) == ['o1']
+
+
+def main():
+    print("🧪 Test de l'export colonnaire")
+    print("=" * 50)
+    test_sigterm_flushes_buffered_rows()
+    print("✅ test_sigterm_flushes_buffered_rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test du moteur d'exécution: diff des positions, limiteur de débit, ordres rejetés puis renvoyés
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from execution import ExecutionEngine, NullLimiter, RateLimiter, diff_orders
+
+
+class FakeBroker:
+    """Courtier minimal: les ordres restent ouverts jusqu'à fill() ou reject()"""
+
+    def __init__(self, positions=None):
+        self.positions = dict(positions or {})
+        self.orders = {}
+        self.submitted = []
+        self.calls = []
+
+    def list_positions(self):
+        self.calls.append('list_positions')
+        return [SimpleNamespace(symbol=s, qty=str(q)) for s, q in self.positions.items() if q]
+
+    def list_orders(self, status='open'):
+        self.calls.append('list_orders')
+        return [o for o in self.orders.values() if o.status == 'accepted']
+
+    def submit_order(self, symbol, qty, side, type, time_in_force):
+        order = SimpleNamespace(id=f"o{len(self.submitted)}", symbol=symbol, qty=qty, side=side, status='accepted')
+        self.orders[order.id] = order
+        self.submitted.append(order)
+        return order
+
+    def close_position(self, symbol):
+        qty = self.positions[symbol]
+        return self.submit_order(symbol, abs(qty), 'sell' if qty > 0 else 'buy', 'market', 'day')
+
+    def fill(self, order_id):
+        order = self.orders[order_id]
+        order.status = 'filled'
+        qty = float(order.qty) if order.side == 'buy' else -float(order.qty)
+        self.positions[order.symbol] = self.positions.get(order.symbol, 0) + qty
+
+    def reject(self, order_id):
+        self.orders[order_id].status = 'rejected'
+
+
+def engine_for(broker):
+    return ExecutionEngine(lambda: broker, limiter=NullLimiter(), max_workers=4, positions_ttl=60)
+
+
+def test_diff_orders_skips_noops():
+    orders = diff_orders({'A': 10, 'B': 0, 'C': -5}, {'A': 10, 'B': 3})
+    assert [(o['symbol'], o['qty']) for o in orders] == [('B', -3), ('C', -5)]
+
+
+def test_rebalance_sends_only_differences():
+    broker = FakeBroker({'A': 10, 'B': 5})
+    engine = engine_for(broker)
+    acks = engine.rebalance({'A': 10, 'B': -5, 'C': 3})
+    sent = sorted((a['symbol'], a['side'], a['qty']) for a in acks)
+    # B change de sens: fermeture puis vente à découvert
+    assert sent == [('B', 'close', 5.0), ('B', 'sell', 5), ('C', 'buy', 3)]
+    assert all(a['error'] is None for a in acks)
+
+
+def test_pending_order_is_not_resent():
+    broker = FakeBroker()
+    engine = engine_for(broker)
+    engine.rebalance({'A': 10})
+    assert engine.rebalance({'A': 10}) == []
+    # Toujours ouvert chez le courtier après relecture: pas de doublon
+    engine.invalidate()
+    assert engine.rebalance({'A': 10}) == []
+    assert len(broker.submitted) == 1
+
+
+def test_filled_order_is_released():
+    broker = FakeBroker()
+    engine = engine_for(broker)
+    engine.rebalance({'A': 10})
+    broker.fill('o0')
+    engine.invalidate()
+    assert engine.positions() == {'A': 10.0}
+    assert engine.open_orders == {}
+    assert broker.calls[-2:] == ['list_orders', 'list_positions']
+
+
+def test_rejected_order_is_retried():
+    broker = FakeBroker()
+    engine = engine_for(broker)
+    engine.rebalance({'A': 10})
+    assert engine.positions() == {'A': 10}
+    broker.reject('o0')
+
+    engine.invalidate()
+    assert engine.positions() == {}
+    assert engine.open_orders == {}
+    acks = engine.rebalance({'A': 10})
+    assert [(a['symbol'], a['side'], a['qty']) for a in acks] == [('A', 'buy', 10)]
+    assert len(broker.submitted) == 2
+
+
+def test_no_order_listing_without_pending_orders():
+    broker = FakeBroker({'A': 1})
+    engine = engine_for(broker)
+    engine.refresh_positions()
+    assert broker.calls == ['list_positions']
+
+
+def test_rate_limiter_waits_for_tokens():
+    clock = {'now': 0.0}
+    sleeps = []
+
+    def sleep(delay):
+        sleeps.append(delay)
+        clock['now'] += delay
+
+    limiter = RateLimiter(rate_per_minute=60, burst=2, time_fn=lambda: clock['now'], sleep_fn=sleep)
+    for _ in range(4):
+        limiter.acquire()
+    # 2 jetons de rafale, puis 1 par seconde
+    assert sleeps == [1.0, 1.0]
+    assert limiter.waited == 2.0
+
+
+def test_rate_limiter_is_thread_safe():
+    limiter = RateLimiter(rate_per_minute=6000, burst=5)
+    threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(5)]) for _ in range(4)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 20 jetons à 100/s dont 5 en rafale: jamais plus de jetons que le débit n'en accorde
+    assert time.monotonic() - start >= 0.149
+
+
+def main():
+    print("🧪 Test du moteur d'exécution")
+    print("=" * 50)
+    for test in (test_diff_orders_skips_noops, test_rebalance_sends_only_differences,
+                 test_pending_order_is_not_resent, test_filled_order_is_released,
+                 test_rejected_order_is_retried, test_no_order_listing_without_pending_orders,
+                 test_rate_limiter_waits_for_tokens, test_rate_limiter_is_thread_safe):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
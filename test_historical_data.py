@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test du partitionnement mensuel des fichiers EOD historiques
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from historical_data import (extract_25_delta, extract_25_delta_parallel, list_partitions,
+                             partition_option_chain, partitions_complete)
+
+ROWS = [
+    # QUOTE_DATE, UNDERLYING_LAST, P_IV, C_IV, P_DELTA, C_DELTA
+    ('2024-01-30', 190.0, 0.30, 0.22, -0.25, 0.25),
+    ('2024-01-30', 190.0, 0.34, 0.20, -0.22, 0.28),
+    ('2024-01-31', 191.0, 0.31, 0.21, -0.26, 0.24),
+    ('2024-02-01', 192.0, 0.29, 0.23, -0.24, 0.26),
+    ('2024-02-01', 192.0, 0.50, 0.50, -0.60, 0.60),
+]
+
+
+def write_eod(path):
+    frame = pd.DataFrame(ROWS, columns=['[QUOTE_DATE]', ' [UNDERLYING_LAST]', ' [P_IV]', ' [C_IV]',
+                                        ' [P_DELTA]', ' [C_DELTA]'])
+    frame.to_csv(path, index=False)
+
+
+def expected():
+    frame = pd.DataFrame(ROWS, columns=['QUOTE_DATE', 'UNDERLYING_LAST', 'P_IV', 'C_IV', 'P_DELTA', 'C_DELTA'])
+    frame['QUOTE_DATE'] = pd.to_datetime(frame['QUOTE_DATE'])
+    return extract_25_delta(frame)
+
+
+def test_rerun_replaces_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'eod.csv')
+        partition_dir = os.path.join(tmp, 'partitions')
+        write_eod(source)
+
+        partition_option_chain(source, partition_dir)
+        partition_option_chain(source, partition_dir)
+        assert partitions_complete(partition_dir)
+        assert len(list_partitions(partition_dir)) == 2
+        assert not os.path.exists(partition_dir + '.tmp')
+
+        data = extract_25_delta_parallel(partition_dir, max_workers=1)
+        reference = expected()
+        assert list(data.index) == list(reference.index)
+        assert (data - reference).abs().max().max() < 1e-6
+
+
+def test_interrupted_run_is_incomplete():
+    with tempfile.TemporaryDirectory() as tmp:
+        partition_dir = os.path.join(tmp, 'partitions')
+        try:
+            partition_option_chain(os.path.join(tmp, 'absent.csv'), partition_dir)
+        except FileNotFoundError:
+            pass
+        assert not partitions_complete(partition_dir)
+        assert not list_partitions(partition_dir)
+
+
+def test_partitions_sorted_numerically():
+    with tempfile.TemporaryDirectory() as tmp:
+        for month, part in (('2024-01', 10), ('2024-01', 2), ('2024-02', 0)):
+            month_dir = os.path.join(tmp, f"month={month}")
+            os.makedirs(month_dir, exist_ok=True)
+            open(os.path.join(month_dir, f"part-{part}.parquet"), 'w').close()
+        names = [os.path.relpath(p, tmp) for p in list_partitions(tmp)]
+        assert names == [os.path.join('month=2024-01', 'part-2.parquet'),
+                         os.path.join('month=2024-01', 'part-10.parquet'),
+                         os.path.join('month=2024-02', 'part-0.parquet')]
+
+
+def main():
+    print("🧪 Test du partitionnement historique")
+    print("=" * 50)
+    for test in (test_rerun_replaces_partitions, test_interrupted_run_is_incomplete,
+                 test_partitions_sorted_numerically):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test du recalcul incrémental des indicateurs: identique au bit près au recalcul complet
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# main crée les clients Alpaca à l'import (aucune requête n'est envoyée)
+os.environ.setdefault('ALPACA_API_KEY', 'test')
+os.environ.setdefault('ALPACA_SECRET_KEY', 'test')
+
+import main  # noqa: E402
+
+
+def spread_dataset(n=900, seed=7):
+    """Dataset put25/call25/underlying journalier avec des plateaux du spread"""
+    rng = np.random.default_rng(seed)
+    put = 0.30 + np.cumsum(rng.normal(0, 0.004, n))
+    call = 0.25 + np.cumsum(rng.normal(0, 0.004, n))
+    # Plateaux: spread constant sur plusieurs lignes (pics indécidables sans la ligne suivante)
+    for start, length in ((200, 6), (451, 3), (700, 12), (n - 4, 4)):
+        put[start:start + length] = put[start]
+        call[start:start + length] = call[start]
+    underlying = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.bdate_range('2020-01-02', periods=n, name='QUOTE_DATE')
+    return pd.DataFrame({'put25_IV': put, 'call25_IV': call, 'underlying': underlying}, index=index)
+
+
+def assert_same(incremental, data):
+    full = main.calculate_iv_spread_metrics(data.copy())
+    frame = incremental.frame()
+    assert list(frame.columns) == list(full.columns)
+    assert frame.index.equals(full.index)
+    for column in full.columns:
+        left, right = frame[column].to_numpy(), full[column].to_numpy()
+        if left.dtype.kind == 'f':
+            same = (left == right) | (np.isnan(left) & np.isnan(right))
+        else:
+            same = left == right
+        assert same.all(), f"{column}: {(~same).sum()} lignes différentes, première {np.argmin(same)}"
+
+
+def test_random_appends_match_full_recompute():
+    data = spread_dataset()
+    rng = np.random.default_rng(1)
+    position = 250
+    incremental = main.incremental_spread_metrics(data.iloc[:position])
+    full_rows = position
+    while position < len(data):
+        size = int(rng.integers(1, 40))
+        incremental.append(data.iloc[position:position + size])
+        position += size
+        full_rows += position
+        assert_same(incremental, data.iloc[:position])
+    # Seule la fin de l'historique est recalculée
+    assert incremental.rows_recomputed < full_rows / 2
+
+
+def test_single_row_appends_through_plateau():
+    data = spread_dataset()
+    incremental = main.incremental_spread_metrics(data.iloc[:695])
+    for position in range(695, 720):
+        incremental.append(data.iloc[position:position + 1])
+        assert_same(incremental, data.iloc[:position + 1])
+
+
+def main_tests():
+    print("🧪 Test des indicateurs incrémentaux")
+    print("=" * 50)
+    for test in (test_random_appends_match_full_recompute, test_single_row_appends_through_plateau):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main_tests()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test du hub de données partagé: chaînes cohérentes côté lecteur, quotes publiées par le hub
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+# main crée les clients Alpaca à l'import (aucune requête n'est envoyée)
+os.environ.setdefault('ALPACA_API_KEY', 'test')
+os.environ.setdefault('ALPACA_SECRET_KEY', 'test')
+
+from backtest import live_bindings  # noqa: E402
+from market_data_hub import HubClient, MarketDataHub  # noqa: E402
+
+SYMBOL = 'AAPL'
+PRICE = 231.0
+
+
+def contract(strike, kind):
+    letter = 'C' if kind == 'call' else 'P'
+    return SimpleNamespace(symbol=f"AAPL261120{letter}{strike * 1000:08d}", strike_price=strike, type=kind,
+                           expiration_date='2026-11-20', open_interest=None, underlying_symbol=SYMBOL)
+
+
+CONTRACTS = [contract(k, 'call') for k in (248, 250, 252)] + [contract(k, 'put') for k in (209, 211, 213)]
+
+
+def hub_name(test):
+    return f"t{os.getpid()}_{test}"
+
+
+class QuoteSelector:
+    """select_quotes du hub: une quote par contrat, IV incrémentée à chaque collecte"""
+
+    def __init__(self):
+        self.polls = 0
+
+    def __call__(self, symbol, chain, price):
+        self.polls += 1
+        now = time.time()
+        self.iv = 0.2 + 0.01 * self.polls
+        return [(chain.symbol(i), 1.0, 1.1, self.iv, now) for i in range(len(chain))]
+
+
+class NoQuoteApi:
+    """Aucune requête de quote ne doit partir d'une stratégie lisant le hub"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            self.calls.append(method)
+            raise AssertionError(f"appel API inattendu: {method}")
+        return call
+
+
+def test_chain_is_not_overwritten_by_later_publishes():
+    selector = QuoteSelector()
+    hub = MarketDataHub(hub_name('copy'), [SYMBOL], lambda s: PRICE, lambda s: CONTRACTS, selector,
+                        chain_every=3600)
+    client = HubClient(hub.name, [SYMBOL])
+    try:
+        hub.poll()
+        chain = client.chain(SYMBOL)
+        assert client.chain(SYMBOL) is chain
+        first_iv = chain.iv.copy()
+        # Deux publications réécrivent le buffer de la première
+        hub.poll()
+        hub.poll()
+        assert (chain.iv == first_iv).all()
+        latest = client.chain(SYMBOL)
+        assert latest is not chain and (latest.iv > first_iv).all()
+        assert [latest.symbol(i) for i in range(len(latest))] == [c.symbol for c in CONTRACTS]
+        # Copie locale modifiable sans toucher la mémoire partagée
+        latest.set_quote(0, iv=0.5)
+        assert client.chains[SYMBOL].read()[0]['iv'][0] != 0.5
+    finally:
+        client.close()
+        hub.close()
+
+
+def test_strategy_uses_hub_quotes_without_api_calls():
+    selector = QuoteSelector()
+    hub = MarketDataHub(hub_name('quotes'), [SYMBOL], lambda s: PRICE, lambda s: CONTRACTS, selector)
+    client = HubClient(hub.name, [SYMBOL])
+    try:
+        hub.poll()
+        api = NoQuoteApi()
+        with live_bindings(None) as main:
+            main.api = main.trading_client = api
+            main.hub = client
+            option_data = main.get_real_option_data(SYMBOL, PRICE)
+        assert api.calls == []
+        assert option_data['call_iv'] == option_data['put_iv'] == selector.iv
+        assert option_data['call_symbol'] in {c.symbol for c in CONTRACTS}
+        # Bindings restaurés: main revient à l'accès API direct
+        import main
+        assert main.hub is None
+    finally:
+        client.close()
+        hub.close()
+
+
+def test_hub_chain_without_quotes_is_not_requoted():
+    # Quotes indisponibles côté hub: IV estimée, la stratégie ne les redemande pas
+    hub = MarketDataHub(hub_name('noquotes'), [SYMBOL], lambda s: PRICE, lambda s: CONTRACTS)
+    client = HubClient(hub.name, [SYMBOL])
+    try:
+        hub.poll()
+        api = NoQuoteApi()
+        with live_bindings(None) as main:
+            main.api = main.trading_client = api
+            main.hub = client
+            option_data = main.get_real_option_data(SYMBOL, PRICE)
+        assert api.calls == []
+        assert option_data is not None and option_data['call_iv'] > 0
+    finally:
+        client.close()
+        hub.close()
+
+
+def main_tests():
+    print("🧪 Test du hub de données partagé")
+    print("=" * 50)
+    for test in (test_chain_is_not_overwritten_by_later_publishes, test_strategy_uses_hub_quotes_without_api_calls,
+                 test_hub_chain_without_quotes_is_not_requoted):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main_tests()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test du profilage des cycles: échantillonnage limité aux cycles, demande par signal
+"""
+
+import os
+import signal
+import tempfile
+import time
+
+from profiler import CycleProfiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_paused_between_cycles():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = CycleProfiler(output_dir=tmp, interval=0.002)
+        profiler.request(2)
+
+        profiler.begin_cycle()
+        busy(0.05)
+        profiler.end_cycle()
+        samples = profiler._sampler.samples
+        assert samples > 0
+
+        # Attente du planificateur: aucun échantillon
+        time.sleep(0.2)
+        assert profiler._sampler.samples == samples
+
+        profiler.begin_cycle()
+        busy(0.05)
+        profiler.end_cycle()
+        assert not profiler.active and profiler.last_dump is not None
+
+        with open(profiler.last_dump[1]) as f:
+            header = f.readline()
+        profiled = float(header.split('Durée profilée: ')[1].split('s')[0])
+        assert 0.09 <= profiled < 0.2, header
+        with open(profiler.last_dump[0]) as f:
+            assert 'busy' in f.read()
+
+
+def test_signal_only_sets_a_flag():
+    if not hasattr(signal, 'SIGUSR2'):
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = CycleProfiler(output_dir=tmp, default_cycles=3)
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            assert profiler.install_signal()
+            os.kill(os.getpid(), signal.SIGUSR2)
+            time.sleep(0.01)
+            assert profiler.remaining == 0 and profiler._requested
+            profiler.begin_cycle()
+            assert profiler.active and profiler.remaining == 3
+            profiler.end_cycle()
+            for _ in range(2):
+                profiler.begin_cycle()
+                profiler.end_cycle()
+            assert not profiler.active and profiler.last_dump is not None
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+
+def main():
+    print("🧪 Test du profilage des cycles")
+    print("=" * 50)
+    for test in (test_sampler_paused_between_cycles, test_signal_only_sets_a_flag):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test de l'enregistrement des cycles et de leur rejeu à travers le chemin live
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+# main crée les clients Alpaca à l'import (aucune requête n'est envoyée)
+os.environ.setdefault('ALPACA_API_KEY', 'test')
+os.environ.setdefault('ALPACA_SECRET_KEY', 'test')
+
+from backtest import live_bindings  # noqa: E402
+from circuit_breaker import CircuitOpenError, EndpointUnavailable  # noqa: E402
+from recorder import (Recorder, RecordingClient, ReplayClient, _replayed_exception,  # noqa: E402
+                      load_recording, replay)
+
+SYMBOL = 'AAPL'
+TIMESTAMPS = [datetime(2026, 10, 19, 15, 30), datetime(2026, 10, 19, 15, 31)]
+
+
+class Entity:
+    """Réponse à la manière des entités alpaca_trade_api (attributs lus dans _raw)"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        try:
+            value = self._raw[name]
+        except KeyError:
+            raise AttributeError(name)
+        if isinstance(value, dict):
+            return Entity(value)
+        if isinstance(value, list):
+            return [Entity(v) if isinstance(v, dict) else v for v in value]
+        return value
+
+
+def contract(strike, kind):
+    letter = 'C' if kind == 'call' else 'P'
+    return {'symbol': f"AAPL261120{letter}{strike * 1000:08d}", 'strike_price': strike, 'type': kind,
+            'expiration_date': '2026-11-20', 'open_interest': None, 'underlying_symbol': SYMBOL}
+
+
+class FakeTradingClient:
+    # Strikes dont le delta estimé par find_25_delta_options est dans les bandes .25 au prix de 231
+    def get_option_contracts(self, request):
+        return Entity({'option_contracts': [contract(k, 'call') for k in (248, 250, 252)]
+                       + [contract(k, 'put') for k in (209, 211, 213)]})
+
+
+class FakeApi:
+    """Marché figé; les quotes d'options passent par un disjoncteur ouvert"""
+
+    def __init__(self):
+        self.quote_calls = 0
+        self.orders = 0
+
+    def get_latest_trade(self, symbol):
+        return Entity({'price': 231.0})
+
+    def get_option_quote(self, symbol):
+        self.quote_calls += 1
+        raise CircuitOpenError("api.get_option_quote indisponible (disjoncteur ouvert)")
+
+    def list_positions(self):
+        return [Entity({'symbol': SYMBOL, 'qty': '10'})] if self.orders else []
+
+    def list_orders(self, status='open'):
+        # Ordres au marché exécutés aussitôt
+        return []
+
+    def get_account(self):
+        return Entity({'equity': '100000', 'cash': '100000'})
+
+    def submit_order(self, **order):
+        self.orders += 1
+        return Entity({'id': f"o{self.orders}", 'status': 'accepted'})
+
+
+def record_cycles(path, params):
+    """Cycles du bot enregistrés comme dans main() (RecordingClient autour des clients)"""
+    recorder = Recorder(path)
+    raw_api = FakeApi()
+    outcomes = []
+    with live_bindings(None, params=params) as main:
+        main.api = RecordingClient(raw_api, recorder, 'api')
+        main.trading_client = RecordingClient(FakeTradingClient(), recorder, 'trading_client')
+        main.execution = main.ExecutionEngine(lambda: main.api, limiter=main.RateLimiter(6000), max_workers=1,
+                                              positions_ttl=0)
+        for cycle, timestamp in enumerate(TIMESTAMPS, 1):
+            main.clock_now = lambda ts=timestamp: ts
+            recorder.begin_cycle(cycle, timestamp)
+            data = main.get_data(SYMBOL, limit=10)
+            price = data['close'].iloc[-1]
+            signal = main.get_live_trading_signal_fast(SYMBOL, price)
+            trade_result = main.execute_live_trade(SYMBOL, signal, price)
+            outcome = {'signal': int(signal['signal']), 'spread_iv': float(signal['spread_iv']),
+                       'trade_result': trade_result}
+            recorder.end_cycle(outcome)
+            outcomes.append(outcome)
+    return outcomes, raw_api
+
+
+def test_record_replay_round_trip():
+    params = {'ACCEL_THRESH': 0.0005}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cycles.jsonl.gz')
+        outcomes, raw_api = record_cycles(path, params)
+        assert outcomes[0]['trade_result'].startswith('ACHAT')
+        assert outcomes[1]['trade_result'] == 'Position déjà ouverte'
+        # Par cycle: quote du call sélectionné, puis quote_candidates s'arrête au premier refus
+        assert raw_api.quote_calls == 2 * 2
+
+        with live_bindings(None, params=params):
+            replayed = replay(path, SYMBOL)
+
+    assert [r['cycle'] for r in replayed] == [1, 2]
+    for result, outcome in zip(replayed, outcomes):
+        assert result['signal'] == outcome['signal']
+        assert result['spread_iv'] == outcome['spread_iv']
+        assert result['trade_result'] == outcome['trade_result']
+        assert result['recorded'] == outcome
+        assert result['missing_calls'] == 0
+
+
+def test_project_exceptions_replayed_with_their_type():
+    assert type(_replayed_exception({'type': 'CircuitOpenError', 'message': 'ouvert'})) is CircuitOpenError
+    assert type(_replayed_exception({'type': 'EndpointUnavailable', 'message': 'absente'})) is EndpointUnavailable
+    assert type(_replayed_exception({'type': 'ValueError', 'message': 'x'})) is ValueError
+
+
+def test_late_calls_are_not_recorded_in_next_cycle():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cycles.jsonl.gz')
+        recorder = Recorder(path)
+        release = threading.Event()
+
+        class SlowApi:
+            def get_latest_quote(self, symbol):
+                release.wait(5)
+                return Entity({'ask_price': 1.0, 'bid_price': 1.0})
+
+            def get_latest_trade(self, symbol):
+                return Entity({'price': 2.0})
+
+        client = RecordingClient(SlowApi(), recorder, 'api')
+        recorder.begin_cycle(1, TIMESTAMPS[0])
+        # Requête couverte abandonnée: se termine pendant le cycle suivant
+        slow = threading.Thread(target=client.get_latest_quote, args=(SYMBOL,))
+        slow.start()
+        client.get_latest_trade(SYMBOL)
+        recorder.end_cycle({})
+        recorder.begin_cycle(2, TIMESTAMPS[1])
+        release.set()
+        slow.join()
+        client.get_latest_trade(SYMBOL)
+        recorder.end_cycle({})
+
+        cycles = load_recording(path)
+        assert [[c['method'] for c in cycle['calls']] for cycle in cycles] == [['get_latest_trade'],
+                                                                               ['get_latest_trade']]
+        assert recorder.late_calls == 1
+        replay_client = ReplayClient(cycles[1]['calls'], 'api')
+        assert replay_client.get_latest_trade(SYMBOL).price == 2.0
+
+
+def main_tests():
+    print("🧪 Test de l'enregistrement et du rejeu")
+    print("=" * 50)
+    for test in (test_record_replay_round_trip, test_project_exceptions_replayed_with_their_type,
+                 test_late_calls_are_not_recorded_in_next_cycle):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main_tests()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test des greeks Black-Scholes du portefeuille (GreeksBook)
+"""
+
+import numpy as np
+
+from option_chain import TYPE_CALL, TYPE_PUT
+from risk import GreeksBook
+
+# 2026-10-19 14:00 UTC
+NOW = 1792418400.0
+
+
+def finite_difference_delta(book, spot, now, h=1e-3):
+    up = book.greeks(spot + h, now)['price']
+    down = book.greeks(spot - h, now)['price']
+    return (up - down) / (2 * h)
+
+
+def test_delta_matches_finite_difference():
+    book = GreeksBook(rate=0.04)
+    book.set_contracts(['C', 'P'], [100.0, 95.0], [TYPE_CALL, TYPE_PUT], ['2026-12-18', '2026-12-18'],
+                       [0.3, 0.35], [1, -2])
+    delta = book.greeks(100.0, NOW)['delta']
+    assert np.allclose(delta, finite_difference_delta(book, 100.0, NOW), atol=1e-6)
+
+
+def test_contract_swap_with_same_vols_reprices():
+    book = GreeksBook(rate=0.04)
+    book.set_contracts(['AAPL261218C00100000'], [100.0], [TYPE_CALL], ['2026-12-18'], [0.3], [1])
+    before = book.greeks(100.0, NOW)['delta'][0]
+
+    # Nouveau contrat (strike et échéance différents), même vol et même nombre de contrats
+    book.set_contracts(['AAPL270618C00150000'], [150.0], [TYPE_CALL], ['2027-06-18'], [0.3], [1])
+    after = book.greeks(100.0, NOW)['delta'][0]
+
+    fresh = GreeksBook(rate=0.04)
+    fresh.set_contracts(['AAPL270618C00150000'], [150.0], [TYPE_CALL], ['2027-06-18'], [0.3], [1])
+    expected = fresh.greeks(100.0, NOW)['delta'][0]
+    assert after == expected, f"delta {after:.4f} != {expected:.4f}"
+    assert abs(after - before) > 0.3
+
+
+def test_unchanged_vols_keep_cache():
+    book = GreeksBook(rate=0.04)
+    book.set_contracts(['C'], [100.0], [TYPE_CALL], ['2026-12-18'], [0.3], [1])
+    book.greeks(100.0, NOW)
+    book.set_vols([0.3])
+    book.greeks(101.0, NOW)
+    assert book.rebuilds == 1
+    book.set_vols([0.31])
+    book.greeks(101.0, NOW)
+    assert book.rebuilds == 2
+
+
+def main():
+    print("🧪 Test des greeks du portefeuille")
+    print("=" * 50)
+    for test in (test_delta_matches_finite_difference, test_contract_swap_with_same_vols_reprices,
+                 test_unchanged_vols_keep_cache):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
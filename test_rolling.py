@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test du noyau de statistiques glissantes contre un calcul exact en deux passes et contre pandas
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from rolling import rolling_stats
+
+WINDOWS = (5, 20, 60, 120)
+# Écart absolu maximal toléré avec le calcul exact et avec pandas rolling(w)
+TOLERANCE = 1e-10
+
+
+def exact_stats(x, w):
+    """Moyenne, écart-type (ddof=1), min et max de chaque fenêtre (math.fsum, deux passes)"""
+    n = len(x)
+    result = {name: np.full(n, np.nan) for name in ('mean', 'std', 'min', 'max')}
+    for i in range(w - 1, n):
+        window = x[i - w + 1:i + 1]
+        if np.isnan(window).any():
+            continue
+        values = window.tolist()
+        mean = math.fsum(values) / w
+        result['mean'][i] = mean
+        result['std'][i] = math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (w - 1))
+        result['min'][i] = min(values)
+        result['max'][i] = max(values)
+    return result
+
+
+def make_series(n, seed=0, offset=0.0):
+    """Série de type spread IV avec NaN isolés et plateau constant"""
+    rng = np.random.default_rng(seed)
+    x = offset + np.cumsum(rng.normal(0, 0.01, n))
+    x[rng.choice(n, size=max(1, n // 50), replace=False)] = np.nan
+    x[n // 3:n // 3 + 150] = x[n // 3 - 1] if not np.isnan(x[n // 3 - 1]) else 0.05
+    return x
+
+
+def check(x):
+    stats = rolling_stats(x, means=WINDOWS, stds=WINDOWS, mins=WINDOWS, maxs=WINDOWS)
+    worst = 0.0
+    for w in WINDOWS:
+        reference = exact_stats(x, w)
+        for name in ('mean', 'std', 'min', 'max'):
+            got = stats[(name, w)]
+            assert np.array_equal(np.isnan(got), np.isnan(reference[name])), f"NaN différents ({name}, {w})"
+            diff = np.nanmax(np.abs(got - reference[name])) if np.isfinite(reference[name]).any() else 0.0
+            assert diff <= TOLERANCE, f"({name}, {w}): écart {diff:.3g}"
+            worst = max(worst, diff)
+        # Plateau constant: écart-type exactement nul
+        plateau = np.flatnonzero(reference['std'] == 0)
+        assert (stats[('std', w)][plateau] == 0).all()
+    return worst
+
+
+def check_pandas(x):
+    """Écart absolu maximal avec pandas rolling(w).mean()/std()/min()/max()
+
+    Le noyau doit égaler pandas à TOLERANCE près partout où pandas est
+    lui-même exact à TOLERANCE près. Ailleurs (écart-type résiduel de
+    pandas sur un plateau, dérive de ses sommes après un plateau à haut
+    niveau), c'est pandas qui s'écarte: le noyau doit alors rester à
+    TOLERANCE du calcul exact. Retourne (écart max avec pandas sur les
+    valeurs comparées, nombre de valeurs où pandas s'écarte du calcul exact).
+    """
+    stats = rolling_stats(x, means=WINDOWS, stds=WINDOWS, mins=WINDOWS, maxs=WINDOWS)
+    series = pd.Series(x)
+    worst, pandas_off = 0.0, 0
+    for w in WINDOWS:
+        rolling = series.rolling(w)
+        reference = exact_stats(x, w)
+        for name in ('mean', 'std', 'min', 'max'):
+            expected = getattr(rolling, name)().to_numpy()
+            got = stats[(name, w)]
+            assert np.array_equal(np.isnan(got), np.isnan(expected)), f"NaN différents de pandas ({name}, {w})"
+            valid = ~np.isnan(expected)
+            pandas_exact = np.abs(expected - reference[name]) <= TOLERANCE
+            diff = np.abs(got - expected)[valid & pandas_exact]
+            worst_here = float(diff.max()) if len(diff) else 0.0
+            assert worst_here <= TOLERANCE, f"({name}, {w}): écart avec pandas {worst_here:.3g}"
+            off = valid & ~pandas_exact
+            assert (np.abs(got - reference[name])[off] <= TOLERANCE).all(), f"({name}, {w}): écart au calcul exact"
+            worst = max(worst, worst_here)
+            pandas_off += int(off.sum())
+    return worst, pandas_off
+
+
+CASES = {
+    'test_short_series_with_nan_and_plateau': lambda: make_series(300),
+    'test_long_series': lambda: make_series(5000, seed=1),
+    # Grand niveau, faible variance: cas mal conditionné des sommes cumulées
+    'test_offset_series': lambda: make_series(2000, seed=2, offset=1e4),
+}
+
+
+def test_short_series_with_nan_and_plateau():
+    check(CASES['test_short_series_with_nan_and_plateau']())
+
+
+def test_long_series():
+    check(CASES['test_long_series']())
+
+
+def test_offset_series():
+    check(CASES['test_offset_series']())
+
+
+def test_matches_pandas():
+    for series in CASES.values():
+        check_pandas(series())
+
+
+def test_matches_pandas_without_plateau():
+    # Sans plateau ni grand niveau, pandas est exact: comparaison directe sur toutes les valeurs
+    rng = np.random.default_rng(3)
+    x = np.cumsum(rng.normal(0, 0.01, 3000))
+    x[rng.choice(3000, size=40, replace=False)] = np.nan
+    worst, pandas_off = check_pandas(x)
+    assert pandas_off == 0
+
+
+def main():
+    print("🧪 Test des statistiques glissantes")
+    print("=" * 50)
+    for name, series in CASES.items():
+        worst = check(series())
+        versus_pandas, pandas_off = check_pandas(series())
+        print(f"✅ {name}: écart max {worst:.2e} au calcul exact, {versus_pandas:.2e} avec pandas "
+              f"({pandas_off} valeurs où pandas s'écarte du calcul exact)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test de la chaîne colonnaire, de la table d'internement et de l'index de strikes
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from option_chain import OptionChain, SymbolTable, TYPE_CALL, TYPE_PUT
+from strike_index import StrikeIndex
+
+
+def contract(strike, kind='call', expiry='2026-11-20'):
+    letter = 'C' if kind == 'call' else 'P'
+    code = expiry[2:4] + expiry[5:7] + expiry[8:10]
+    return SimpleNamespace(symbol=f"AAPL{code}{letter}{int(strike * 1000):08d}", strike_price=strike,
+                           type=kind, expiration_date=expiry, open_interest=None,
+                           underlying_symbol='AAPL')
+
+
+def chain_of(table, strikes, kinds=('call', 'put'), expiry='2026-11-20'):
+    return OptionChain.from_contracts([contract(k, kind, expiry) for k in strikes for kind in kinds],
+                                      symbol_table=table)
+
+
+def test_sync_inserts_only_new_contracts():
+    table = SymbolTable()
+    index = StrikeIndex('AAPL', symbol_table=table)
+    assert index.sync(chain_of(table, [100, 105, 110])) == 6
+    assert index.sync(chain_of(table, [100, 105, 110, 115])) == 2
+    assert len(index) == 8
+    assert index.nearest(113, TYPE_CALL) == (115.0, contract(115).symbol)
+    assert [k for k, _ in index.k_nearest(104, TYPE_PUT, 3)] == [105.0, 100.0, 110.0]
+
+
+def test_sync_prunes_delisted_contracts():
+    table = SymbolTable()
+    index = StrikeIndex('AAPL', symbol_table=table)
+    index.sync(chain_of(table, [100, 105, 110]))
+    index.sync(chain_of(table, [105, 110]))
+    assert len(index) == 4
+    assert index.nearest(99, TYPE_CALL)[0] == 105.0
+    assert index.nearest(99, TYPE_PUT, expiry='2026-11-20')[0] == 105.0
+
+
+def test_prune_drops_empty_expiry_buckets():
+    table = SymbolTable()
+    index = StrikeIndex('AAPL', symbol_table=table)
+    index.add(chain_of(table, [100], expiry='2026-11-20'))
+    index.add(chain_of(table, [100], expiry='2026-12-18'))
+    index.prune(chain_of(table, [100], expiry='2026-12-18'))
+    assert index.expiries(TYPE_CALL) == [np.datetime64('2026-12-18')]
+    assert len(index) == 2
+
+
+def test_expire_removes_past_expiries():
+    table = SymbolTable()
+    index = StrikeIndex('AAPL', symbol_table=table)
+    index.add(chain_of(table, [100, 105], expiry='2026-10-16'))
+    index.add(chain_of(table, [100, 105], expiry='2026-11-20'))
+    assert index.expire('2026-10-19') == 4
+    assert len(index) == 4
+    assert index.nearest(100, TYPE_CALL, expiry='2026-10-16') is None
+    assert index.nearest(100, TYPE_CALL)[1] == contract(100, expiry='2026-11-20').symbol
+
+
+def test_symbol_table_overflow_invalidates_chains_and_index():
+    table = SymbolTable(max_size=8)
+    index = StrikeIndex('AAPL', symbol_table=table)
+    old = chain_of(table, [100, 105, 110])
+    index.sync(old)
+    assert old.index_of(contract(105).symbol) is not None
+
+    # 6 symboles + 4 nouveaux > 8: la table est vidée, la génération avance
+    new = chain_of(table, [120, 125])
+    assert table.generation == 1 and len(table) == 4
+    assert old.stale and not new.stale
+    assert old.index_of(contract(105).symbol) is None
+    try:
+        old.symbol(0)
+        assert False, "symbole lu dans une chaîne périmée"
+    except LookupError:
+        pass
+
+    # L'index suit la nouvelle génération: les anciens identifiants sont oubliés
+    index.sync(new)
+    assert len(index) == 4
+    assert index.nearest(100, TYPE_CALL) == (120.0, contract(120).symbol)
+
+
+def main():
+    print("🧪 Test de l'index de strikes")
+    print("=" * 50)
+    for test in (test_sync_inserts_only_new_contracts, test_sync_prunes_delisted_contracts,
+                 test_prune_drops_empty_expiry_buckets, test_expire_removes_past_expiries,
+                 test_symbol_table_overflow_invalidates_chains_and_index):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()